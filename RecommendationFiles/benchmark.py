@@ -4,8 +4,9 @@ Benchmarking script for the Fashion Recommendation Engine
 This script performs comprehensive benchmarking including:
 - Search speed with different configurations
 - Memory usage analysis
+- Compact (quantized) storage modes with recall against the exact index
 - Accuracy comparison with/without PCA
-- Different index types comparison
+- Different index types comparison (exact, IVF-Flat, IVF-PQ, HNSW)
 """
 
 import time
@@ -15,14 +16,18 @@ import numpy as np
 from recommendation_engine import (
     FashionRecommendationEngine,
     analyze_memory_usage,
-    benchmark_search_speed
+    benchmark_search_speed,
+    compare_compact_index,
+    evaluate_recall
 )
+from reference_store import open_reference_store
 
 
 def load_data():
     """Load embeddings and labels."""
-    embeddings = np.load('../ComputerVisionFiles/fashion_mnist_resnet50_embeddings.npy')
-    labels = np.load('../ComputerVisionFiles/fashion_mnist_labels.npy')
+    store = open_reference_store('../ComputerVisionFiles/fashion_mnist_resnet50_embeddings.npy',
+                                 '../ComputerVisionFiles/fashion_mnist_labels.npy')
+    embeddings, labels = store.embeddings, store.labels
 
     with open('../ComputerVisionFiles/fashion_mnist_classes.txt', 'r',
               encoding='utf-8') as f:
@@ -98,16 +103,34 @@ def benchmark_pca_components(embeddings, labels, class_names, n_components_list)
     return results
 
 
-def benchmark_index_types(embeddings, labels, class_names):
-    """Benchmark different index types."""
+def benchmark_index_types(embeddings, labels, class_names, index_configs=None, k=10):
+    """
+    Benchmark different index types.
+
+    Approximate indexes (IVF-Flat, IVF-PQ, HNSW) report recall@k against the
+    exact L2 index so speed can be traded against accuracy.
+    """
     print("\n" + "=" * 60)
     print("Benchmarking Different Index Types")
     print("=" * 60)
 
+    if index_configs is None:
+        index_configs = [
+            {'index_type': "L2"},
+            {'index_type': "cosine"},
+            {'index_type': "ivf_flat", 'index_params': {'nlist': 256, 'nprobe': 8}},
+            {'index_type': "ivf_pq", 'index_params': {'nlist': 256, 'nprobe': 8, 'pq_m': 16}},
+            {'index_type': "hnsw", 'index_params': {'M': 32, 'efSearch': 64}},
+        ]
+
     results = []
     query_embedding = embeddings[0]
+    recall_queries = embeddings[np.random.RandomState(0).choice(len(embeddings), 200,
+                                                                replace=False)]
+    reference = None
 
-    for index_type in ["L2", "cosine"]:
+    for config in index_configs:
+        index_type = config['index_type']
         print(f"\nTesting {index_type} index...")
 
         engine = FashionRecommendationEngine(
@@ -116,20 +139,30 @@ def benchmark_index_types(embeddings, labels, class_names):
             class_names=class_names,
             n_components=128,
             use_pca=True,
-            index_type=index_type
+            **config
         )
         engine.build_index()
+        if reference is None and index_type == "L2":
+            reference = engine
 
         # Benchmark search speed
-        bench_results = benchmark_search_speed(engine, n_queries=100, k=10)
+        bench_results = benchmark_search_speed(engine, n_queries=100, k=k)
 
         # Get recommendations
-        recommendations = engine.recommend(query_embedding, k=10)
+        recommendations = engine.recommend(query_embedding, k=k)
+
+        # Recall against the exact index with the same metric
+        if reference is not None and engine.metric == reference.metric:
+            recall = evaluate_recall(engine, reference, recall_queries, k=k)
+        else:
+            recall = float('nan')
 
         results.append({
             'index_type': index_type,
+            'index_params': config.get('index_params', {}),
             'search_speed': bench_results['queries_per_second'],
             'avg_time_ms': bench_results['avg_time_per_query'] * 1000,
+            'recall': recall,
             'recommendations': recommendations
         })
 
@@ -137,12 +170,58 @@ def benchmark_index_types(embeddings, labels, class_names):
     print("\n" + "-" * 60)
     print("Index Type Comparison:")
     print("-" * 60)
-    print(f"{'Index Type':<15} {'Speed (q/s)':<15} {'Time (ms)':<12}")
+    print(f"{'Index Type':<15} {'Speed (q/s)':<15} {'Time (ms)':<12} {f'Recall@{k}':<10}")
     print("-" * 60)
 
     for r in results:
         print(f"{r['index_type']:<15} {r['search_speed']:<15.2f} "
-              f"{r['avg_time_ms']:<12.2f}")
+              f"{r['avg_time_ms']:<12.2f} {r['recall']:<10.3f}")
+
+    return results
+
+
+def benchmark_compact_modes(embeddings, labels, class_names, k=10):
+    """Benchmark compact (quantized) storage modes against the exact flat index."""
+    print("\n" + "=" * 60)
+    print("Benchmarking Compact Storage Modes")
+    print("=" * 60)
+
+    reference = FashionRecommendationEngine(
+        embeddings=embeddings,
+        labels=labels,
+        class_names=class_names,
+        n_components=128,
+        use_pca=True,
+        index_type="L2"
+    )
+    reference.build_index()
+    queries = embeddings[np.random.RandomState(0).choice(len(embeddings), 200, replace=False)]
+
+    results = []
+    for index_type in ["sq_fp16", "sq8", "opq", "ivf_pq"]:
+        print(f"\nTesting compact {index_type} index...")
+        engine = FashionRecommendationEngine(
+            embeddings=embeddings,
+            labels=labels,
+            class_names=class_names,
+            n_components=128,
+            use_pca=True,
+            index_type=index_type,
+            store_reduced="float16"
+        )
+        engine.build_index()
+        comparison = compare_compact_index(engine, reference, queries, k=k)
+        comparison['index_type'] = index_type
+        results.append(comparison)
+
+    print("\n" + "-" * 60)
+    print("Compact Mode Comparison:")
+    print("-" * 60)
+    print(f"{'Index Type':<12} {'Index (MB)':<12} {'Saved (MB)':<12} {f'Recall@{k}':<10}")
+    print("-" * 60)
+    for r in results:
+        print(f"{r['index_type']:<12} {r['index_size_mb']:<12.2f} "
+              f"{r['memory_saved_mb']:<12.2f} {r['recall_at_k']:<10.3f}")
 
     return results
 
@@ -181,6 +260,22 @@ def benchmark_filtering_overhead(engine):
           f"(overhead: {(time_exclude / time_no_filter - 1) * 100:.1f}%)")
 
 
+def benchmark_batch_search(engine, n_queries=1000, k=10):
+    """Compare one search() call per query against a single search_batch() call."""
+    print("\n" + "=" * 60)
+    print("Benchmarking Sequential vs Batched Queries")
+    print("=" * 60)
+
+    sequential = benchmark_search_speed(engine, n_queries=n_queries, k=k)
+    batched = benchmark_search_speed(engine, n_queries=n_queries, k=k, batched=True)
+
+    speedup = batched['queries_per_second'] / sequential['queries_per_second']
+    print(f"Sequential: {sequential['queries_per_second']:.2f} q/s")
+    print(f"Batched:    {batched['queries_per_second']:.2f} q/s ({speedup:.1f}x)")
+
+    return {'sequential': sequential, 'batched': batched, 'speedup': speedup}
+
+
 def main():
     """Run all benchmarks."""
     print("=" * 60)
@@ -198,7 +293,10 @@ def main():
     # Benchmark 2: Different index types
     benchmark_index_types(embeddings, labels, class_names)
 
-    # Benchmark 3: Filtering overhead
+    # Benchmark 3: Compact storage modes
+    benchmark_compact_modes(embeddings, labels, class_names)
+
+    # Benchmark 4: Filtering overhead
     engine = FashionRecommendationEngine(
         embeddings=embeddings,
         labels=labels,
@@ -210,13 +308,18 @@ def main():
     engine.build_index()
     benchmark_filtering_overhead(engine)
 
+    # Benchmark 5: Sequential vs batched queries
+    benchmark_batch_search(engine)
+
     # Summary
     print("\n" + "=" * 60)
     print("Benchmark Summary")
     print("=" * 60)
     print("PCA component count comparison completed")
-    print("Index type comparison completed")
+    print("Index type comparison completed (see recall@k for approximate indexes)")
+    print("Compact storage mode comparison completed")
     print("Filtering overhead analysis completed")
+    print("Batched query comparison completed")
     print("\nRecommendation: Use 128 components with L2 index for optimal")
     print("balance between speed, memory, and accuracy.")
 
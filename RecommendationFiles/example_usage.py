@@ -15,18 +15,20 @@ from RecommendationFiles.recommendation_engine import (
     benchmark_search_speed,
     analyze_memory_usage
 )
+from RecommendationFiles.reference_store import open_reference_store
 
 
 def load_data():
     """Load embeddings and labels from the CV team's output files."""
     print("Loading embeddings and labels...")
 
-    # Load embeddings
-    embeddings = np.load('../ComputerVisionFiles/fashion_mnist_resnet50_embeddings.npy')
+    # Memory-map embeddings and labels (shared with other processes)
+    store = open_reference_store('../ComputerVisionFiles/fashion_mnist_resnet50_embeddings.npy',
+                                 '../ComputerVisionFiles/fashion_mnist_labels.npy')
+    embeddings = store.embeddings
     print(f"Loaded embeddings: {embeddings.shape}")
 
-    # Load labels
-    labels = np.load('../ComputerVisionFiles/fashion_mnist_labels.npy')
+    labels = store.labels
     print(f"Loaded labels: {labels.shape}")
 
     # Load class names
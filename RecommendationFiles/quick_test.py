@@ -70,11 +70,13 @@ def run_quick_test():
     try:
         import numpy as np
         from recommendation_engine import FashionRecommendationEngine
+        from reference_store import open_reference_store
 
         # Load data
         print("   Loading embeddings and labels...")
-        embeddings = np.load('../ComputerVisionFiles/fashion_mnist_resnet50_embeddings.npy')
-        labels = np.load('../ComputerVisionFiles/fashion_mnist_labels.npy')
+        store = open_reference_store('../ComputerVisionFiles/fashion_mnist_resnet50_embeddings.npy',
+                                     '../ComputerVisionFiles/fashion_mnist_labels.npy')
+        embeddings, labels = store.embeddings, store.labels
 
         with open('../ComputerVisionFiles/fashion_mnist_classes.txt', 'r') as f:
             class_names = [line.strip() for line in f.readlines()]
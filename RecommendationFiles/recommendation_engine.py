@@ -7,7 +7,10 @@ This module implements a recommendation engine for fashion items using:
 - Ranking and filtering logic
 """
 
+import json
+import os
 import pickle
+import threading
 import time
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -15,6 +18,109 @@ import faiss
 import numpy as np
 from sklearn.decomposition import PCA
 
+# Exact (flat) index types; "cosine" implies the cosine metric
+FLAT_INDEX_TYPES = ("L2", "cosine")
+# Approximate index types; their metric comes from the ``metric`` argument
+ANN_INDEX_TYPES = ("ivf_flat", "ivf_pq", "hnsw")
+# Compact exhaustive index types storing quantized codes instead of float32
+# vectors: 8-bit / fp16 scalar quantization and OPQ-rotated product quantization
+COMPACT_INDEX_TYPES = ("sq8", "sq_fp16", "opq")
+
+# How build_index() keeps the PCA-reduced embeddings in memory
+STORE_REDUCED_OPTIONS = ("full", "float16", "none")
+
+# On-disk artifact format written by save_artifact()
+ARTIFACT_FORMAT = "fashion-recommendation-engine"
+# Version 2 added the item id array for ID-mapped indexes
+ARTIFACT_VERSION = 2
+MANIFEST_FILENAME = "manifest.json"
+
+
+class PCAProjection:
+    """
+    Fitted PCA projection as plain arrays.
+
+    Stands in for sklearn's PCA at query time so loaded engines need neither
+    pickle nor sklearn; arrays may be read-only memory maps.
+    """
+
+    def __init__(
+        self,
+        mean: np.ndarray,
+        components: np.ndarray,
+        explained_variance: Optional[np.ndarray] = None,
+        whiten: bool = False
+    ):
+        self.mean_ = mean
+        self.components_ = components
+        self.explained_variance_ = explained_variance
+        self.whiten = whiten
+
+    @classmethod
+    def from_sklearn(cls, pca: PCA) -> "PCAProjection":
+        return cls(pca.mean_, pca.components_, pca.explained_variance_, pca.whiten)
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """Project X onto the principal components (same result as PCA.transform)."""
+        projected = (np.asarray(X) - self.mean_) @ self.components_.T
+        if self.whiten:
+            projected /= np.sqrt(self.explained_variance_)
+        return projected
+
+
+class _RowBuffer:
+    """
+    Array rows with spare capacity at the end, so appending k rows copies
+    k rows (amortized) instead of the whole array. Callers keep using the
+    plain ndarray view(); earlier views stay valid, since appends only write
+    past them or into a new, larger array.
+    """
+
+    def __init__(self, rows: np.ndarray):
+        self.data = np.asarray(rows)
+        self.n = len(self.data)
+        self.view = self.data
+
+    def append(self, rows: np.ndarray) -> np.ndarray:
+        end = self.n + len(rows)
+        if end > len(self.data) or not self.data.flags.writeable:
+            capacity = max(end, 2 * len(self.data), 16)
+            grown = np.empty((capacity,) + self.data.shape[1:], dtype=self.data.dtype)
+            grown[:self.n] = self.data[:self.n]
+            self.data = grown
+        self.data[self.n:end] = rows
+        self.n = end
+        self.view = self.data[:end]
+        return self.view
+
+
+def _json_default(value):
+    """Make numpy values in item metadata JSON serializable."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Build/search parameters for the approximate index types
+DEFAULT_INDEX_PARAMS = {
+    'nlist': 100,          # IVF: number of coarse clusters
+    'nprobe': 10,          # IVF: clusters visited per query
+    'pq_m': 16,            # IVF-PQ/OPQ: sub-quantizers (must divide the index dimension)
+    'pq_nbits': 8,         # IVF-PQ/OPQ: bits per sub-quantizer code
+    'M': 32,               # HNSW: neighbours per node
+    'efConstruction': 40,  # HNSW: build-time search depth
+    'efSearch': 64,        # HNSW: query-time search depth
+}
+
+# When needs_refit() reports that the fitted PCA/quantizers have gone stale
+DEFAULT_DRIFT_THRESHOLDS = {
+    'max_churn': 0.3,           # (added + removed) / items at fit time
+    'max_residual_ratio': 1.25,  # PCA residual of added items vs fit-time residual
+    'min_added': 50,            # added items before the residual ratio counts
+}
+
 
 class FashionRecommendationEngine:
     """
@@ -29,7 +135,10 @@ class FashionRecommendationEngine:
         class_names: List[str],
         n_components: int = 128,
         use_pca: bool = True,
-        index_type: str = "L2"
+        index_type: str = "L2",
+        metric: Optional[str] = None,
+        index_params: Optional[Dict[str, int]] = None,
+        store_reduced: str = "full"
     ):
         """
         Initialize the recommendation engine.
@@ -40,7 +149,14 @@ class FashionRecommendationEngine:
             class_names: List of class name strings
             n_components: Number of dimensions after PCA reduction
             use_pca: Whether to apply PCA dimensionality reduction
-            index_type: Type of FAISS index ("L2" or "cosine")
+            index_type: Type of FAISS index: exact "L2" or "cosine", approximate
+                "ivf_flat", "ivf_pq" or "hnsw", or compact "sq8", "sq_fp16" or "opq"
+            metric: Distance for non-flat indexes, "L2" or "cosine"
+                (defaults to "cosine" for index_type="cosine", else "L2")
+            index_params: Overrides for DEFAULT_INDEX_PARAMS
+                (nlist, nprobe, pq_m, pq_nbits, M, efConstruction, efSearch)
+            store_reduced: Keep the PCA-reduced embeddings as computed ("full"),
+                as float16 ("float16"), or drop them after indexing ("none")
         """
         self.embeddings = embeddings
         self.labels = labels
@@ -48,6 +164,9 @@ class FashionRecommendationEngine:
         self.n_components = n_components
         self.use_pca = use_pca
         self.index_type = index_type
+        self.metric = metric or ("cosine" if index_type == "cosine" else "L2")
+        self.index_params = {**DEFAULT_INDEX_PARAMS, **(index_params or {})}
+        self.store_reduced = store_reduced
 
         # Components to be initialized
         self.pca = None
@@ -55,6 +174,13 @@ class FashionRecommendationEngine:
         self.reduced_embeddings = None
         self.index = None
         self.item_metadata = None
+        self.ids = None
+        self.drift = None
+        self._id_lookup = None
+        self._mmap_index_path = None
+        self._row_buffers = {}
+        # Serializes add_items()/remove_ids()/refit()
+        self._update_lock = threading.RLock()
 
         # Statistics
         self.original_dim = embeddings.shape[1]
@@ -83,6 +209,33 @@ class FashionRecommendationEngine:
 
         return reduced
 
+    def _project(self, embeddings: np.ndarray) -> np.ndarray:
+        """Apply the already-fitted PCA (if any) without refitting it."""
+        if self.use_pca and self.pca is not None:
+            return self.pca.transform(embeddings)
+        return embeddings
+
+    def _pca_residual(self, embeddings: np.ndarray, chunk_size: int = 4096) -> np.ndarray:
+        """
+        Fraction of each item's centered energy the fitted PCA discards.
+
+        Args:
+            embeddings: Original embeddings
+            chunk_size: Rows processed at a time to bound temporary memory
+
+        Returns:
+            Array of shape (n_items,) with values in [0, 1]
+        """
+        residuals = []
+        for start in range(0, len(embeddings), chunk_size):
+            chunk = np.asarray(embeddings[start:start + chunk_size], dtype=np.float32)
+            centered = chunk - self.pca.mean_
+            projected = centered @ np.asarray(self.pca.components_, dtype=np.float32).T
+            total = np.einsum('ij,ij->i', centered, centered)
+            kept = np.einsum('ij,ij->i', projected, projected)
+            residuals.append(1 - kept / np.maximum(total, 1e-12))
+        return np.concatenate(residuals) if residuals else np.empty(0, dtype=np.float32)
+
     def _normalize_embeddings(self, embeddings: np.ndarray) -> np.ndarray:
         """
         Normalize embeddings for cosine similarity (if needed).
@@ -93,19 +246,132 @@ class FashionRecommendationEngine:
         Returns:
             Normalized embeddings
         """
-        if self.index_type == "cosine":
+        if self.metric == "cosine":
             # L2 normalize for cosine similarity
             norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
             norms[norms == 0] = 1  # Avoid division by zero
             return embeddings / norms
         return embeddings
 
-    def build_index(self, metadata: Optional[Dict[str, Any]] = None):
+    def _create_index(self, dim: int, n_items: int) -> faiss.Index:
+        """
+        Create an empty FAISS index for the configured index type and metric.
+
+        Args:
+            dim: Index dimension (after PCA)
+            n_items: Number of items that will be added (caps IVF nlist)
+
+        Returns:
+            Untrained FAISS index
+        """
+        if self.index_type not in FLAT_INDEX_TYPES + ANN_INDEX_TYPES + COMPACT_INDEX_TYPES:
+            raise ValueError(f"Unknown index_type: {self.index_type}")
+        if self.metric not in ("L2", "cosine"):
+            raise ValueError(f"Unknown metric: {self.metric}")
+
+        # For normalized vectors, inner product = cosine similarity
+        faiss_metric = (faiss.METRIC_INNER_PRODUCT if self.metric == "cosine"
+                        else faiss.METRIC_L2)
+        params = self.index_params
+
+        if self.index_type in FLAT_INDEX_TYPES:
+            if self.metric == "cosine":
+                return faiss.IndexFlatIP(dim)
+            return faiss.IndexFlatL2(dim)
+
+        if self.index_type in ("sq8", "sq_fp16"):
+            qtype = (faiss.ScalarQuantizer.QT_8bit if self.index_type == "sq8"
+                     else faiss.ScalarQuantizer.QT_fp16)
+            return faiss.IndexScalarQuantizer(dim, qtype, faiss_metric)
+
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dim, params['M'], faiss_metric)
+            index.hnsw.efConstruction = params['efConstruction']
+            return index
+
+        nlist = max(1, min(params['nlist'], n_items))
+        quantizer = faiss.IndexFlat(dim, faiss_metric)
+        if self.index_type == "ivf_flat":
+            return faiss.IndexIVFFlat(quantizer, dim, nlist, faiss_metric)
+
+        if dim % params['pq_m'] != 0:
+            raise ValueError(
+                f"pq_m={params['pq_m']} must divide the index dimension {dim}"
+            )
+        if self.index_type == "opq":
+            return faiss.index_factory(
+                dim, f"OPQ{params['pq_m']},PQ{params['pq_m']}x{params['pq_nbits']}", faiss_metric
+            )
+        return faiss.IndexIVFPQ(
+            quantizer, dim, nlist, params['pq_m'], params['pq_nbits'], faiss_metric
+        )
+
+    def set_search_params(self, nprobe: Optional[int] = None, efSearch: Optional[int] = None):
+        """
+        Apply query-time parameters to the index (recall vs latency trade-off).
+
+        Args:
+            nprobe: IVF clusters visited per query
+            efSearch: HNSW search depth
+        """
+        if nprobe is not None:
+            self.index_params['nprobe'] = nprobe
+        if efSearch is not None:
+            self.index_params['efSearch'] = efSearch
+
+        if self.index is None:
+            return
+        ivf = faiss.try_extract_index_ivf(self.index)
+        if ivf is not None:
+            ivf.nprobe = self.index_params['nprobe']
+        base = self._base_index()
+        if isinstance(base, faiss.IndexHNSW):
+            base.hnsw.efSearch = self.index_params['efSearch']
+
+    def _base_index(self) -> faiss.Index:
+        """The index wrapped by the IndexIDMap2, or the index itself."""
+        if isinstance(self.index, faiss.IndexIDMap):
+            return faiss.downcast_index(self.index.index)
+        return self.index
+
+    def _has_id_map(self) -> bool:
+        """Whether the index stores item ids (and so supports add_with_ids)."""
+        return (isinstance(self.index, faiss.IndexIDMap)
+                or faiss.try_extract_index_ivf(self.index) is not None)
+
+    def _rows_for_ids(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Map item ids (as returned by search) to row positions in labels,
+        reduced_embeddings and item_metadata.
+
+        Returns:
+            Array of rows with the same shape as ids; -1 for unknown ids
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(self.ids) == 0:
+            return np.full(ids.shape, -1, dtype=np.int64)
+        if self._id_lookup is None:
+            order = np.argsort(self.ids, kind='stable')
+            self._id_lookup = (np.asarray(self.ids)[order], order)
+        sorted_ids, order = self._id_lookup
+        pos = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+        return np.where(sorted_ids[pos] == ids, order[pos], -1)
+
+    def build_index(
+        self,
+        metadata: Optional[Dict[str, Any]] = None,
+        ids: Optional[np.ndarray] = None
+    ):
         """
         Build the FAISS index for similarity search.
 
+        The index is ID-mapped (IndexIDMap2, or the ids stored in IVF lists),
+        so search returns item ids and add_items()/remove_ids() can update it
+        without a rebuild.
+
         Args:
             metadata: Optional dictionary with item metadata (e.g., item IDs, categories)
+            ids: Optional int64 item ids, one per embedding (defaults to row positions)
         """
         print("Building recommendation index...")
         start_time = time.time()
@@ -120,28 +386,197 @@ class FashionRecommendationEngine:
         # Convert to float32 for FAISS
         embeddings_f32 = normalized_embeddings.astype('float32')
 
-        # Create FAISS index
-        if self.index_type == "L2":
-            # L2 distance index
-            self.index = faiss.IndexFlatL2(reduced_dim)
-        elif self.index_type == "cosine":
-            # Inner product index (for normalized vectors,
-            # inner product = cosine similarity)
-            self.index = faiss.IndexFlatIP(reduced_dim)
-        else:
-            raise ValueError(f"Unknown index_type: {self.index_type}")
+        if ids is None:
+            ids = np.arange(len(embeddings_f32), dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) != len(embeddings_f32):
+            raise ValueError(f"Got {len(ids)} ids for {len(embeddings_f32)} embeddings")
+        if len(np.unique(ids)) != len(ids):
+            raise ValueError("ids must be unique")
+
+        # Create FAISS index; IVF indexes store item ids in their inverted
+        # lists, everything else gets an IndexIDMap2 wrapper
+        self.index = self._create_index(reduced_dim, len(embeddings_f32))
+        if faiss.try_extract_index_ivf(self.index) is None:
+            self.index = faiss.IndexIDMap2(self.index)
+
+        # Approximate indexes learn their coarse/product quantizers first
+        if not self.index.is_trained:
+            self.index.train(embeddings_f32)
 
         # Add embeddings to index
-        self.index.add(embeddings_f32)
+        self.index.add_with_ids(embeddings_f32, ids)
+        self.set_search_params()
+        self.ids = ids
+        self._id_lookup = None
+        self._mmap_index_path = None
+        self.n_samples = self.index.ntotal
+
+        # Baseline for drift_stats(): how much of the data the fitted PCA keeps
+        self.drift = {
+            'n_fit': int(self.index.ntotal),
+            'n_added': 0,
+            'n_removed': 0,
+            'fit_residual': (
+                float(self._pca_residual(self.embeddings).mean())
+                if self.pca is not None and len(self.embeddings) else None
+            ),
+            'added_residual_sum': 0.0,
+        }
 
-        # Store metadata if provided
-        self.item_metadata = metadata
+        # The index holds everything search needs; optionally shrink or drop
+        # the reduced copy to save memory
+        if self.store_reduced == "float16":
+            self.reduced_embeddings = self.reduced_embeddings.astype(np.float16)
+        elif self.store_reduced == "none":
+            self.reduced_embeddings = None
+        elif self.store_reduced != "full":
+            raise ValueError(f"Unknown store_reduced: {self.store_reduced}")
+
+        # Store metadata if provided (copied, since add_items() extends it)
+        self.item_metadata = (
+            {key: list(values) for key, values in metadata.items()} if metadata else metadata
+        )
+        self._row_buffers = {}
 
         build_time = time.time() - start_time
         print(f"Index built in {build_time:.4f} seconds")
         print(f"Index contains {self.index.ntotal} items")
         print(f"Embedding dimension: {reduced_dim}")
 
+    def _prepare_queries(self, query_embeddings: np.ndarray) -> np.ndarray:
+        """
+        Project queries into index space.
+
+        Args:
+            query_embeddings: Array of shape (n_queries, original_dim)
+
+        Returns:
+            float32 array of shape (n_queries, index_dim)
+        """
+        # Apply PCA if used
+        query_reduced = self._project(query_embeddings)
+
+        # Normalize if using cosine similarity
+        query_normalized = self._normalize_embeddings(query_reduced)
+        return np.ascontiguousarray(query_normalized, dtype='float32')
+
+    def _allowed_mask(
+        self,
+        filter_by_class: Optional[List[int]],
+        exclude_indices: Optional[List[int]]
+    ) -> Optional[np.ndarray]:
+        """
+        Boolean mask over item rows that pass the filters.
+
+        Returns None when no filter is set.
+        """
+        if not filter_by_class and not exclude_indices:
+            return None
+
+        n_items = len(self.ids)
+        if filter_by_class:
+            allowed = np.isin(np.asarray(self.labels)[:n_items], filter_by_class)
+        else:
+            allowed = np.ones(n_items, dtype=bool)
+
+        if exclude_indices:
+            excluded = self._rows_for_ids(np.asarray(exclude_indices, dtype=np.int64))
+            allowed[excluded[excluded >= 0]] = False
+
+        return allowed
+
+    def _filtered_search(
+        self,
+        query_f32: np.ndarray,
+        k: int,
+        allowed: np.ndarray
+    ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """
+        Search with filters, over-fetching adaptively until every query has
+        k allowed hits (or every allowed item has been returned).
+        """
+        n_queries = query_f32.shape[0]
+        n_items = self.index.ntotal
+        n_allowed = int(allowed.sum())
+        target = min(k, n_allowed)
+
+        if n_allowed == 0:
+            empty = [np.empty(0, dtype='float32')] * n_queries
+            return empty, [np.empty(0, dtype='int64')] * n_queries
+
+        out_distances: List[Optional[np.ndarray]] = [None] * n_queries
+        out_indices: List[Optional[np.ndarray]] = [None] * n_queries
+
+        # Start from the expected over-fetch for this filter's selectivity
+        search_k = min(n_items, max(2 * k, int(np.ceil(1.2 * k * n_items / n_allowed))))
+        pending = np.arange(n_queries)
+
+        while len(pending):
+            distances, indices = self.index.search(query_f32[pending], search_k)
+
+            # FAISS pads missing results with -1
+            rows = self._rows_for_ids(indices)
+            valid = rows >= 0
+            keep = valid & allowed[np.where(valid, rows, 0)]
+
+            still_pending = []
+            for row, query_pos in enumerate(pending):
+                hits = np.flatnonzero(keep[row])[:k]
+                if len(hits) < target and search_k < n_items:
+                    still_pending.append(query_pos)
+                    continue
+                out_distances[query_pos] = distances[row, hits]
+                out_indices[query_pos] = indices[row, hits]
+
+            pending = np.asarray(still_pending, dtype=np.int64)
+            search_k = min(n_items, search_k * 2)
+
+        return out_distances, out_indices
+
+    def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        k: int = 10,
+        filter_by_class: Optional[List[int]] = None,
+        exclude_indices: Optional[List[int]] = None
+    ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """
+        Search for similar items for many queries at once.
+
+        Runs one PCA projection and one FAISS search over all queries. With
+        filters, hits are masked with a precomputed allowed-items array and
+        queries that come up short are re-searched with a larger over-fetch,
+        so each query gets k results whenever k allowed items exist.
+
+        Args:
+            query_embeddings: Query matrix of shape (n_queries, original_dim)
+            k: Number of results to return per query
+            filter_by_class: Optional list of class indices to filter by
+            exclude_indices: Optional list of indices to exclude from results
+
+        Returns:
+            Tuple of (distances, indices), each a list with one array of
+            up to k results per query
+        """
+        if self.index is None:
+            raise ValueError("Index not built. Call build_index() first.")
+
+        query_f32 = self._prepare_queries(np.atleast_2d(query_embeddings))
+
+        # Apply filters inside the search
+        allowed = self._allowed_mask(filter_by_class, exclude_indices)
+        if allowed is not None:
+            return self._filtered_search(query_f32, k, allowed)
+
+        distances, indices = self.index.search(query_f32, k)
+        # IVF/HNSW pad result slots they could not fill with id -1
+        found = indices >= 0
+        return (
+            [row[mask] for row, mask in zip(distances, found)],
+            [row[mask] for row, mask in zip(indices, found)],
+        )
+
     def search(
         self,
         query_embedding: np.ndarray,
@@ -161,44 +596,40 @@ class FashionRecommendationEngine:
         Returns:
             Tuple of (distances, indices) for top-k results
         """
-        if self.index is None:
-            raise ValueError("Index not built. Call build_index() first.")
-
-        # Transform query embedding
-        query_reshaped = query_embedding.reshape(1, -1)
-
-        # Apply PCA if used
-        if self.use_pca and self.pca is not None:
-            query_reduced = self.pca.transform(query_reshaped)
-        else:
-            query_reduced = query_reshaped
-
-        # Normalize if using cosine similarity
-        query_normalized = self._normalize_embeddings(query_reduced)
-        query_f32 = query_normalized.astype('float32')
-
-        # Search
-        search_k = k * 10 if filter_by_class or exclude_indices else k
-        distances, indices = self.index.search(query_f32, search_k)
+        distances, indices = self.search_batch(
+            query_embedding.reshape(1, -1), k, filter_by_class, exclude_indices
+        )
+        return np.array([distances[0]]), np.array([indices[0]])
 
-        # Apply filters
-        if filter_by_class is not None or exclude_indices is not None:
-            filtered_indices = []
-            filtered_distances = []
+    def _format_recommendations(
+        self,
+        distances: np.ndarray,
+        indices: np.ndarray,
+        return_metadata: bool
+    ) -> List[Dict[str, Any]]:
+        """Turn one query's hits into recommendation dictionaries."""
+        recommendations = []
+        rows = self._rows_for_ids(indices)
+        # Skip padding (-1) and ids no longer in the engine; labels[-1] would
+        # silently return the last item's label
+        found = rows >= 0
+        distances, indices, rows = distances[found], indices[found], rows[found]
+        for i, (dist, idx, row) in enumerate(zip(distances, indices, rows)):
+            rec = {
+                'index': int(idx),
+                'distance': float(dist),
+                'label': int(self.labels[row]),
+                'class_name': self.class_names[self.labels[row]],
+                'rank': i + 1
+            }
 
-            for i, idx in enumerate(indices[0]):
-                if exclude_indices and idx in exclude_indices:
-                    continue
-                if filter_by_class and self.labels[idx] not in filter_by_class:
-                    continue
-                filtered_indices.append(idx)
-                filtered_distances.append(distances[0][i])
-                if len(filtered_indices) >= k:
-                    break
+            if return_metadata and self.item_metadata:
+                for key, values in self.item_metadata.items():
+                    rec[key] = values[row]
 
-            return np.array([filtered_distances]), np.array([filtered_indices])
+            recommendations.append(rec)
 
-        return distances, indices
+        return recommendations
 
     def recommend(
         self,
@@ -224,24 +655,289 @@ class FashionRecommendationEngine:
         distances, indices = self.search(
             query_embedding, k, filter_by_class, exclude_indices
         )
+        return self._format_recommendations(distances[0], indices[0], return_metadata)
 
-        recommendations = []
-        for i, (dist, idx) in enumerate(zip(distances[0], indices[0])):
-            rec = {
-                'index': int(idx),
-                'distance': float(dist),
-                'label': int(self.labels[idx]),
-                'class_name': self.class_names[self.labels[idx]],
-                'rank': i + 1
-            }
+    def recommend_batch(
+        self,
+        query_embeddings: np.ndarray,
+        k: int = 10,
+        filter_by_class: Optional[List[int]] = None,
+        exclude_indices: Optional[List[int]] = None,
+        return_metadata: bool = False
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Get recommendations for many queries with a single batched search.
 
-            if return_metadata and self.item_metadata:
-                for key, values in self.item_metadata.items():
-                    rec[key] = values[idx]
+        Args:
+            query_embeddings: Query matrix of shape (n_queries, original_dim)
+            k: Number of recommendations per query
+            filter_by_class: Optional list of class indices to filter by
+            exclude_indices: Optional list of indices to exclude
+            return_metadata: Whether to include metadata in results
 
-            recommendations.append(rec)
+        Returns:
+            One list of recommendation dictionaries per query
+        """
+        distances, indices = self.search_batch(
+            query_embeddings, k, filter_by_class, exclude_indices
+        )
+        return [
+            self._format_recommendations(d, i, return_metadata)
+            for d, i in zip(distances, indices)
+        ]
 
-        return recommendations
+    def _check_updatable(self):
+        if self.index is None:
+            raise ValueError("Index not built. Call build_index() first.")
+        if not self._has_id_map():
+            raise ValueError(
+                "Index has no ID map (saved by an older version); "
+                "rebuild it with build_index() to enable incremental updates"
+            )
+        if self._mmap_index_path is not None:
+            # Memory-mapped indexes are read-only; load a private copy first
+            self.index = faiss.read_index(self._mmap_index_path)
+            self._mmap_index_path = None
+            self.set_search_params()
+
+    def add_items(
+        self,
+        embeddings: np.ndarray,
+        ids: np.ndarray,
+        labels: np.ndarray,
+        metadata: Optional[Dict[str, List[Any]]] = None
+    ):
+        """
+        Add items to the index using the already-fitted PCA and quantizers.
+
+        Only records drift statistics; refitting is left to refit_if_needed()
+        (e.g. start_background_refit()). Item arrays grow with spare capacity,
+        so an add copies only the new rows.
+
+        Args:
+            embeddings: Array of shape (n_new, original_dim)
+            ids: int64 item ids, one per embedding, not already in the index
+            labels: Class label for each new item
+            metadata: Optional values for the new items, keyed like item_metadata
+        """
+        with self._update_lock:
+            self._add_items(embeddings, ids, labels, metadata)
+
+    def _append_rows(self, name: str, rows: np.ndarray) -> np.ndarray:
+        """Append rows to the item array attribute name through its _RowBuffer."""
+        buffer = self._row_buffers.get(name)
+        if buffer is None or buffer.view is not getattr(self, name):
+            # First append, or the array was replaced (remove_ids, refit, load)
+            buffer = self._row_buffers[name] = _RowBuffer(getattr(self, name))
+        setattr(self, name, buffer.append(rows))
+        return buffer.view
+
+    def _add_items(self, embeddings, ids, labels, metadata):
+        self._check_updatable()
+        embeddings = np.atleast_2d(embeddings)
+        ids = np.asarray(ids, dtype=np.int64).ravel()
+        labels = np.asarray(labels).ravel()
+        if not len(embeddings) == len(ids) == len(labels):
+            raise ValueError(
+                f"Got {len(embeddings)} embeddings, {len(ids)} ids and {len(labels)} labels"
+            )
+        if len(np.unique(ids)) != len(ids) or np.isin(ids, self.ids).any():
+            raise ValueError("ids must be unique and not already in the index")
+
+        reduced = self._project(embeddings)
+        vectors = np.ascontiguousarray(self._normalize_embeddings(reduced), dtype='float32')
+        self.index.add_with_ids(vectors, ids)
+
+        self._append_rows('ids', ids)
+        self._append_rows('labels', labels)
+        if self.reduced_embeddings is not None:
+            self._append_rows('reduced_embeddings', reduced)
+        if getattr(self, 'embeddings', None) is not None:
+            self._append_rows('embeddings', embeddings)
+        if self.item_metadata:
+            for key, values in self.item_metadata.items():
+                values.extend((metadata or {}).get(key, [None] * len(ids)))
+
+        self._id_lookup = None
+        self.n_samples = self.index.ntotal
+        if self.drift is not None:
+            self.drift['n_added'] += len(ids)
+            if self.drift['fit_residual'] is not None:
+                self.drift['added_residual_sum'] += float(self._pca_residual(embeddings).sum())
+
+    def remove_ids(self, ids: np.ndarray) -> int:
+        """
+        Remove items from the index.
+
+        Args:
+            ids: Item ids to remove; ids not in the index are ignored
+
+        Returns:
+            Number of items removed
+        """
+        with self._update_lock:
+            return self._remove_ids(ids)
+
+    def _remove_ids(self, ids: np.ndarray) -> int:
+        self._check_updatable()
+        if isinstance(self._base_index(), faiss.IndexHNSW):
+            raise ValueError("HNSW indexes do not support removal; rebuild with build_index()")
+
+        rows = self._rows_for_ids(np.asarray(ids, dtype=np.int64).ravel())
+        rows = np.unique(rows[rows >= 0])
+        if len(rows) == 0:
+            return 0
+        self.index.remove_ids(np.asarray(self.ids)[rows])
+
+        keep = np.ones(len(self.ids), dtype=bool)
+        keep[rows] = False
+        self.ids = np.asarray(self.ids)[keep]
+        self.labels = np.asarray(self.labels)[keep]
+        if self.reduced_embeddings is not None:
+            self.reduced_embeddings = self.reduced_embeddings[keep]
+        if getattr(self, 'embeddings', None) is not None:
+            self.embeddings = self.embeddings[keep]
+        if self.item_metadata:
+            for key, values in self.item_metadata.items():
+                self.item_metadata[key] = [v for v, k in zip(values, keep) if k]
+
+        self._id_lookup = None
+        self.n_samples = self.index.ntotal
+        if self.drift is not None:
+            self.drift['n_removed'] += len(rows)
+        return len(rows)
+
+    def drift_stats(self) -> Dict[str, Any]:
+        """
+        How far the index has moved from the data its PCA and quantizers were fit on.
+
+        Returns:
+            Dictionary with item counts, churn ((added + removed) / fitted items),
+            mean PCA residual of the fitted and added items and their ratio
+        """
+        drift = self.drift or {
+            'n_fit': self.n_samples, 'n_added': 0, 'n_removed': 0,
+            'fit_residual': None, 'added_residual_sum': 0.0
+        }
+        stats = {
+            'n_fit': drift['n_fit'],
+            'n_added': drift['n_added'],
+            'n_removed': drift['n_removed'],
+            'churn': (drift['n_added'] + drift['n_removed']) / max(drift['n_fit'], 1),
+            'fit_residual': drift['fit_residual'],
+            'added_residual': None,
+            'residual_ratio': None,
+        }
+        if drift['fit_residual'] is not None and drift['n_added']:
+            stats['added_residual'] = drift['added_residual_sum'] / drift['n_added']
+            stats['residual_ratio'] = stats['added_residual'] / max(drift['fit_residual'], 1e-12)
+        return stats
+
+    def needs_refit(
+        self,
+        max_churn: float = DEFAULT_DRIFT_THRESHOLDS['max_churn'],
+        max_residual_ratio: float = DEFAULT_DRIFT_THRESHOLDS['max_residual_ratio'],
+        min_added: int = DEFAULT_DRIFT_THRESHOLDS['min_added']
+    ) -> bool:
+        """
+        Whether incremental updates have drifted enough to warrant refit().
+
+        Args:
+            max_churn: Refit once this fraction of the fitted items changed
+            max_residual_ratio: Refit once added items lose this much more
+                energy to the PCA projection than the fitted items did
+            min_added: Items that must have been added before the residual
+                ratio counts, so a few outliers do not force a refit
+
+        Returns:
+            True if either threshold is exceeded
+        """
+        stats = self.drift_stats()
+        if stats['churn'] > max_churn:
+            return True
+        if stats['n_added'] < min_added or stats['residual_ratio'] is None:
+            return False
+        return stats['residual_ratio'] > max_residual_ratio
+
+    def refit(self, embeddings: Optional[np.ndarray] = None):
+        """
+        Refit PCA and rebuild the index over the current items.
+
+        The new state is built on the side and swapped in at the end, so
+        searches from other threads keep using the old index meanwhile.
+        add_items()/remove_ids() from other threads wait until it is done.
+
+        Args:
+            embeddings: Original embeddings aligned with self.ids; defaults to
+                the embeddings kept since build_index() (loaded engines do not
+                keep them)
+        """
+        with self._update_lock:
+            if embeddings is None:
+                embeddings = getattr(self, 'embeddings', None)
+            if embeddings is None:
+                raise ValueError("Original embeddings are required to refit a loaded engine")
+            if len(embeddings) != len(self.ids):
+                raise ValueError(f"Got {len(embeddings)} embeddings for {len(self.ids)} items")
+
+            fresh = FashionRecommendationEngine(
+                embeddings, np.asarray(self.labels), self.class_names,
+                n_components=self.n_components, use_pca=self.use_pca,
+                index_type=self.index_type, metric=self.metric,
+                index_params=self.index_params, store_reduced=self.store_reduced
+            )
+            fresh.build_index(metadata=self.item_metadata, ids=self.ids)
+            # Keep our lock: other threads may be waiting on it
+            del fresh.__dict__['_update_lock']
+            self.__dict__.update(fresh.__dict__)
+
+    def refit_if_needed(self, embeddings: Optional[np.ndarray] = None, **thresholds) -> bool:
+        """
+        Periodic maintenance hook: refit only when needs_refit() says so.
+        Run it from a scheduled job or start_background_refit(), not per update.
+
+        Args:
+            embeddings: Passed to refit()
+            **thresholds: Passed to needs_refit()
+
+        Returns:
+            True if the engine was refit
+        """
+        with self._update_lock:
+            if not self.needs_refit(**thresholds):
+                return False
+            print(f"Refitting recommendation engine: {self.drift_stats()}")
+            self.refit(embeddings)
+            return True
+
+    def start_background_refit(
+        self,
+        interval: float = 300.0,
+        embeddings: Optional[np.ndarray] = None,
+        **thresholds
+    ) -> threading.Event:
+        """
+        Call refit_if_needed() every interval seconds on a daemon thread.
+
+        Args:
+            interval: Seconds between drift checks
+            embeddings: Passed to refit_if_needed()
+            **thresholds: Passed to needs_refit()
+
+        Returns:
+            Event that stops the thread when set
+        """
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.refit_if_needed(embeddings, **thresholds)
+                except Exception as e:
+                    print(f"Background refit failed: {e}")
+
+        threading.Thread(target=run, name="recommendation-refit", daemon=True).start()
+        return stop
 
     def save(self, filepath: str):
         """Save the recommendation engine to disk."""
@@ -252,9 +948,14 @@ class FashionRecommendationEngine:
             'n_components': self.n_components,
             'use_pca': self.use_pca,
             'index_type': self.index_type,
+            'metric': self.metric,
+            'index_params': self.index_params,
+            'store_reduced': self.store_reduced,
             'pca': self.pca,
             'item_metadata': self.item_metadata,
-            'original_dim': self.original_dim
+            'original_dim': self.original_dim,
+            'ids': self.ids,
+            'drift': self.drift
         }
 
         # Save FAISS index separately
@@ -268,9 +969,159 @@ class FashionRecommendationEngine:
         print(f"Saved recommendation engine to {filepath}")
         print(f"Saved FAISS index to {index_path}")
 
+    def save_artifact(self, directory: str):
+        """
+        Save the engine as a versioned, pickle-free artifact directory.
+
+        Layout: manifest.json (settings, class names, file list), raw .npy
+        arrays (labels, reduced embeddings, PCA mean/components) and the FAISS
+        index. load_artifact() memory-maps the arrays and the index, so
+        worker processes share one copy through the page cache.
+
+        Args:
+            directory: Output directory (created if needed)
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        arrays = {'labels': np.asarray(self.labels), 'ids': np.asarray(self.ids)}
+        if self.reduced_embeddings is not None:
+            arrays['reduced_embeddings'] = self.reduced_embeddings
+        pca = None
+        if self.pca is not None:
+            projection = (self.pca if isinstance(self.pca, PCAProjection)
+                          else PCAProjection.from_sklearn(self.pca))
+            arrays['pca_mean'] = projection.mean_
+            arrays['pca_components'] = projection.components_
+            if projection.whiten:
+                arrays['pca_explained_variance'] = projection.explained_variance_
+            pca = {'whiten': bool(projection.whiten)}
+
+        files = {}
+        for name, array in arrays.items():
+            files[name] = f"{name}.npy"
+            np.save(os.path.join(directory, files[name]), np.ascontiguousarray(array))
+
+        files['index'] = "index.faiss"
+        faiss.write_index(self.index, os.path.join(directory, files['index']))
+
+        manifest = {
+            'format': ARTIFACT_FORMAT,
+            'version': ARTIFACT_VERSION,
+            'files': files,
+            'class_names': list(self.class_names),
+            'n_components': self.n_components,
+            'use_pca': self.use_pca,
+            'index_type': self.index_type,
+            'metric': self.metric,
+            'index_params': self.index_params,
+            'store_reduced': self.store_reduced,
+            'original_dim': self.original_dim,
+            'n_samples': int(self.index.ntotal),
+            'pca': pca,
+            'item_metadata': self.item_metadata,
+            'drift': self.drift,
+        }
+        # Write the manifest last so a partially written artifact never loads
+        manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+        with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, default=_json_default)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+        print(f"Saved recommendation engine artifact to {directory}")
+
+    @classmethod
+    def load_artifact(cls, directory: str, mmap: bool = True):
+        """
+        Load an engine saved with save_artifact().
+
+        Args:
+            directory: Artifact directory
+            mmap: Memory-map the arrays and FAISS index instead of reading
+                them into private memory
+
+        Returns:
+            Loaded engine
+        """
+        with open(os.path.join(directory, MANIFEST_FILENAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        if manifest.get('format') != ARTIFACT_FORMAT:
+            raise ValueError(f"{directory} is not a recommendation engine artifact")
+        if manifest.get('version', 0) > ARTIFACT_VERSION:
+            raise ValueError(
+                f"Artifact version {manifest['version']} is newer than supported "
+                f"version {ARTIFACT_VERSION}"
+            )
+
+        files = manifest['files']
+        mmap_mode = 'r' if mmap else None
+
+        def load_array(name):
+            if name not in files:
+                return None
+            return np.load(os.path.join(directory, files[name]), mmap_mode=mmap_mode)
+
+        index_path = os.path.join(directory, files['index'])
+        if mmap:
+            # IVF lists are mapped by IO_FLAG_MMAP, flat codes by IO_FLAG_MMAP_IFC;
+            # FAISS rejects the two combined for IVF indexes
+            ivf = manifest['index_type'] in ("ivf_flat", "ivf_pq")
+            if ivf or not hasattr(faiss, 'IO_FLAG_MMAP_IFC'):
+                io_flags = faiss.IO_FLAG_MMAP
+            else:
+                io_flags = faiss.IO_FLAG_MMAP_IFC
+            index = faiss.read_index(index_path, io_flags)
+        else:
+            index = faiss.read_index(index_path)
+
+        engine = cls.__new__(cls)
+        engine.reduced_embeddings = load_array('reduced_embeddings')
+        engine.labels = load_array('labels')
+        engine.class_names = manifest['class_names']
+        engine.n_components = manifest['n_components']
+        engine.use_pca = manifest['use_pca']
+        engine.index_type = manifest['index_type']
+        engine.metric = manifest['metric']
+        engine.index_params = {**DEFAULT_INDEX_PARAMS, **manifest['index_params']}
+        engine.store_reduced = manifest['store_reduced']
+        engine.pca = None
+        if manifest['pca'] is not None:
+            engine.pca = PCAProjection(
+                load_array('pca_mean'),
+                load_array('pca_components'),
+                load_array('pca_explained_variance'),
+                manifest['pca']['whiten']
+            )
+        engine.scaler = None
+        engine.item_metadata = manifest['item_metadata']
+        engine.original_dim = manifest['original_dim']
+        engine.index = index
+        engine.set_search_params()
+        engine.n_samples = index.ntotal
+        # Version 1 artifacts have no ID map; their ids are the row positions
+        engine.ids = load_array('ids')
+        if engine.ids is None:
+            engine.ids = np.arange(index.ntotal, dtype=np.int64)
+        engine.drift = manifest.get('drift')
+        engine._id_lookup = None
+        engine._mmap_index_path = index_path if mmap else None
+        engine._row_buffers = {}
+        engine._update_lock = threading.RLock()
+
+        print(f"Loaded recommendation engine artifact from {directory}")
+        return engine
+
     @classmethod
     def load(cls, filepath: str):
-        """Load the recommendation engine from disk."""
+        """
+        Load the recommendation engine from disk.
+
+        Accepts a pickle saved with save() or an artifact directory saved
+        with save_artifact().
+        """
+        if os.path.isdir(filepath):
+            return cls.load_artifact(filepath)
+
         index_path = filepath.replace('.pkl', '_index.faiss')
 
         # Load components
@@ -290,11 +1141,27 @@ class FashionRecommendationEngine:
         engine.n_components = save_dict['n_components']
         engine.use_pca = save_dict['use_pca']
         engine.index_type = save_dict['index_type']
+        # Engines saved before approximate indexes existed are flat
+        engine.metric = save_dict.get(
+            'metric', "cosine" if engine.index_type == "cosine" else "L2"
+        )
+        engine.index_params = {**DEFAULT_INDEX_PARAMS, **save_dict.get('index_params', {})}
+        engine.store_reduced = save_dict.get('store_reduced', "full")
         engine.pca = save_dict['pca']
         engine.item_metadata = save_dict['item_metadata']
         engine.original_dim = save_dict['original_dim']
         engine.index = index
-        engine.n_samples = engine.reduced_embeddings.shape[0]
+        engine.set_search_params()
+        engine.n_samples = index.ntotal
+        # Older pickles have no ID map; their ids are the row positions
+        engine.ids = save_dict.get('ids')
+        if engine.ids is None:
+            engine.ids = np.arange(index.ntotal, dtype=np.int64)
+        engine.drift = save_dict.get('drift')
+        engine._row_buffers = {}
+        engine._update_lock = threading.RLock()
+        engine._id_lookup = None
+        engine._mmap_index_path = None
 
         print(f"Loaded recommendation engine from {filepath}")
         return engine
@@ -303,7 +1170,8 @@ class FashionRecommendationEngine:
 def benchmark_search_speed(
     engine: FashionRecommendationEngine,
     n_queries: int = 100,
-    k: int = 10
+    k: int = 10,
+    batched: bool = False
 ) -> Dict[str, float]:
     """
     Benchmark search speed of the recommendation engine.
@@ -312,11 +1180,14 @@ def benchmark_search_speed(
         engine: The recommendation engine
         n_queries: Number of queries to test
         k: Number of results per query
+        batched: Issue all queries in one search_batch() call instead of
+            one search() call per query
 
     Returns:
         Dictionary with benchmark results
     """
-    print(f"Benchmarking search speed with {n_queries} queries...")
+    mode = "batched" if batched else "sequential"
+    print(f"Benchmarking {mode} search speed with {n_queries} queries...")
 
     # Generate random query embeddings
     query_dim = engine.original_dim
@@ -327,8 +1198,11 @@ def benchmark_search_speed(
 
     # Benchmark
     start_time = time.time()
-    for query in queries:
-        _ = engine.search(query, k=k)
+    if batched:
+        _ = engine.search_batch(queries, k=k)
+    else:
+        for query in queries:
+            _ = engine.search(query, k=k)
     total_time = time.time() - start_time
 
     avg_time = total_time / n_queries
@@ -339,7 +1213,8 @@ def benchmark_search_speed(
         'avg_time_per_query': avg_time,
         'queries_per_second': queries_per_sec,
         'n_queries': n_queries,
-        'k': k
+        'k': k,
+        'batched': batched
     }
 
     print(f"Average time per query: {avg_time * 1000:.2f} ms")
@@ -348,6 +1223,32 @@ def benchmark_search_speed(
     return results
 
 
+def evaluate_recall(
+    engine: FashionRecommendationEngine,
+    reference: FashionRecommendationEngine,
+    queries: np.ndarray,
+    k: int = 10
+) -> float:
+    """
+    Measure recall@k of an engine against a reference (usually exact flat) engine.
+
+    Args:
+        engine: Engine under test (e.g. IVF or HNSW index)
+        reference: Engine whose results are treated as ground truth
+        queries: Query matrix of shape (n_queries, original_dim)
+        k: Number of results per query
+
+    Returns:
+        Fraction of the reference top-k found in the engine's top-k
+    """
+    _, approx = engine.search_batch(queries, k=k)
+    _, exact = reference.search_batch(queries, k=k)
+
+    # Ignore -1 padding, which would otherwise match padding in the reference
+    found = sum(len(np.intersect1d(a[a >= 0], e[e >= 0])) for a, e in zip(approx, exact))
+    return found / (len(queries) * k)
+
+
 def analyze_memory_usage(engine: FashionRecommendationEngine) -> Dict[str, Any]:
     """
     Analyze memory usage of the recommendation engine.
@@ -359,12 +1260,18 @@ def analyze_memory_usage(engine: FashionRecommendationEngine) -> Dict[str, Any]:
         Dictionary with memory usage information
     """
     mb_divisor = 1024 ** 2
-    reduced_dim = (engine.reduced_embeddings.shape[1]
-                   if engine.reduced_embeddings is not None
-                   else engine.original_dim)
+    if engine.reduced_embeddings is not None:
+        reduced_dim = engine.reduced_embeddings.shape[1]
+    elif engine.index is not None:
+        reduced_dim = engine.index.d
+    else:
+        reduced_dim = engine.original_dim
+
+    # Loaded engines don't keep the original embeddings
+    original = getattr(engine, 'embeddings', None)
 
     memory_info = {
-        'original_embeddings_size_mb': engine.embeddings.nbytes / mb_divisor,
+        'original_embeddings_size_mb': original.nbytes / mb_divisor if original is not None else 0,
         'reduced_embeddings_size_mb': (
             engine.reduced_embeddings.nbytes / mb_divisor
             if engine.reduced_embeddings is not None else 0
@@ -377,13 +1284,18 @@ def analyze_memory_usage(engine: FashionRecommendationEngine) -> Dict[str, Any]:
     }
 
     if engine.index is not None:
-        # float32 = 4 bytes per element
+        # Serialized size covers quantized codes as well as float32 vectors
         memory_info['index_size_mb'] = (
+            faiss.serialize_index(engine.index).nbytes / mb_divisor
+        )
+        # What an exact float32 flat index over the same vectors would take
+        memory_info['flat_index_size_mb'] = (
             engine.index.ntotal * engine.index.d * 4 / mb_divisor
         )
 
     print("Memory Usage Analysis:")
-    print(f"  Original embeddings: {memory_info['original_embeddings_size_mb']:.2f} MB")
+    if original is not None:
+        print(f"  Original embeddings: {memory_info['original_embeddings_size_mb']:.2f} MB")
     if engine.reduced_embeddings is not None:
         print(f"  Reduced embeddings: {memory_info['reduced_embeddings_size_mb']:.2f} MB")
         print(f"  Compression ratio: {memory_info['compression_ratio']:.2f}x")
@@ -391,3 +1303,43 @@ def analyze_memory_usage(engine: FashionRecommendationEngine) -> Dict[str, Any]:
         print(f"  FAISS index: {memory_info['index_size_mb']:.2f} MB")
 
     return memory_info
+
+
+def compare_compact_index(
+    engine: FashionRecommendationEngine,
+    reference: FashionRecommendationEngine,
+    queries: np.ndarray,
+    k: int = 10
+) -> Dict[str, float]:
+    """
+    Report memory saved and recall@k of a compact engine against an exact one.
+
+    Args:
+        engine: Compact engine (e.g. index_type="sq8", store_reduced="float16")
+        reference: Exact flat engine built from the same embeddings
+        queries: Query matrix of shape (n_queries, original_dim)
+        k: Number of results per query
+
+    Returns:
+        Dictionary with index/reduced-embedding sizes, MB saved and recall@k
+    """
+    compact = analyze_memory_usage(engine)
+    exact = analyze_memory_usage(reference)
+
+    def resident_mb(info):
+        return info['index_size_mb'] + info['reduced_embeddings_size_mb']
+
+    results = {
+        'index_size_mb': compact['index_size_mb'],
+        'reference_index_size_mb': exact['index_size_mb'],
+        'reduced_embeddings_size_mb': compact['reduced_embeddings_size_mb'],
+        'memory_saved_mb': resident_mb(exact) - resident_mb(compact),
+        'recall_at_k': evaluate_recall(engine, reference, queries, k=k),
+        'k': k
+    }
+
+    print(f"Compact index ({engine.index_type}, reduced={engine.store_reduced}): "
+          f"{results['index_size_mb']:.2f} MB vs {results['reference_index_size_mb']:.2f} MB, "
+          f"saved {results['memory_saved_mb']:.2f} MB, recall@{k}: {results['recall_at_k']:.3f}")
+
+    return results
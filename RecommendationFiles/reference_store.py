@@ -0,0 +1,134 @@
+"""
+Shared, memory-mapped reference embeddings.
+
+The precomputed Fashion-MNIST ResNet50 embeddings are read by the backend
+classifier, the ClassificationEngine and the recommendation engine scripts.
+Loading them with a plain np.load gives every process its own private copy;
+opening them through this store maps the file read-only instead, so every
+worker on the host shares the same physical pages.
+
+The L2-normalized matrix used for cosine search is built once, written next
+to the source file ("<name>.unit-<dtype>.npy") and memory-mapped from there
+on, so no process re-normalizes it at startup. The cache is rebuilt whenever
+the source file is newer than it.
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_EMBEDDING_PATH = "ComputerVisionFiles/fashion_mnist_resnet50_embeddings.npy"
+DEFAULT_LABEL_PATH = "ComputerVisionFiles/fashion_mnist_labels.npy"
+
+UNIT_DTYPES = ("float32", "float16")
+
+# Rows normalized at a time, so building never needs a second full-size array
+_CHUNK_ROWS = 4096
+
+
+def normalize_rows(matrix: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    L2-normalize the rows of matrix into out (in place when out is matrix),
+    a chunk at a time. Zero rows stay zero.
+    """
+    if out is None:
+        out = np.empty(matrix.shape, dtype=np.float32)
+    for start in range(0, len(matrix), _CHUNK_ROWS):
+        chunk = np.asarray(matrix[start:start + _CHUNK_ROWS], dtype=np.float32)
+        norms = np.sqrt(np.einsum("ij,ij->i", chunk, chunk))
+        norms[norms == 0] = 1
+        out[start:start + len(chunk)] = chunk / norms[:, None]
+    return out
+
+
+def unit_cache_path(embedding_path: str, dtype: str = "float32") -> str:
+    """Where the normalized copy of embedding_path is cached."""
+    stem, _ = os.path.splitext(embedding_path)
+    return f"{stem}.unit-{dtype}.npy"
+
+
+def _load_mapped(path: str) -> np.ndarray:
+    """Memory-map a .npy file read-only (object arrays cannot be mapped)."""
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        return np.load(path, allow_pickle=True)
+
+
+class ReferenceStore:
+    """Read-only reference embeddings and labels, plus their normalized copy."""
+
+    def __init__(self, embedding_path: str, label_path: str):
+        self.embedding_path = embedding_path
+        self.label_path = label_path
+
+        self.embeddings = _load_mapped(embedding_path)  # shape: (N, D)
+        self.labels = _load_mapped(label_path)  # shape: (N,)
+        if self.embeddings.shape[0] != self.labels.shape[0]:
+            raise ValueError(
+                f"Mismatch: {self.embeddings.shape[0]} embeddings vs "
+                f"{self.labels.shape[0]} labels"
+            )
+
+        self._unit: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def unit(self, dtype: str = "float32") -> np.ndarray:
+        """L2-normalized embeddings, built and cached on disk on first use."""
+        if dtype not in UNIT_DTYPES:
+            raise ValueError(f"Unknown reference embedding dtype: {dtype}")
+        with self._lock:
+            if dtype not in self._unit:
+                self._unit[dtype] = self._open_unit(dtype)
+            return self._unit[dtype]
+
+    def _open_unit(self, dtype: str) -> np.ndarray:
+        path = unit_cache_path(self.embedding_path, dtype)
+        if self._cache_is_fresh(path):
+            return np.load(path, mmap_mode="r")
+
+        # Build into a temporary file and rename it into place, so concurrent
+        # workers never map a half-written cache
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            out = np.lib.format.open_memmap(
+                tmp_path, mode="w+", dtype=dtype, shape=self.embeddings.shape
+            )
+            normalize_rows(self.embeddings, out=out)
+            out.flush()
+            del out
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # Read-only checkout: fall back to a private normalized copy
+            print(f"[REFERENCE STORE] Could not cache {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return normalize_rows(self.embeddings).astype(dtype, copy=False)
+        return np.load(path, mmap_mode="r")
+
+    def _cache_is_fresh(self, path: str) -> bool:
+        try:
+            if os.path.getmtime(path) < os.path.getmtime(self.embedding_path):
+                return False
+            cached = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return False
+        return cached.shape == self.embeddings.shape
+
+
+_stores: Dict[Tuple[str, str], ReferenceStore] = {}
+_stores_lock = threading.Lock()
+
+
+def open_reference_store(
+    embedding_path: str = DEFAULT_EMBEDDING_PATH,
+    label_path: str = DEFAULT_LABEL_PATH,
+) -> ReferenceStore:
+    """The process-wide ReferenceStore for these files, opened on first use."""
+    key = (os.path.abspath(embedding_path), os.path.abspath(label_path))
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ReferenceStore(embedding_path, label_path)
+        return _stores[key]
@@ -6,16 +6,25 @@ Run with:
     pytest tests/ -v -m "not integration"  # Skip integration tests
 """
 
+import json
+
+import faiss
 import numpy as np
 import pytest
 import os
 import sys
 import tempfile
+from unittest.mock import patch
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from recommendation_engine import FashionRecommendationEngine
+from recommendation_engine import (
+    FashionRecommendationEngine,
+    PCAProjection,
+    analyze_memory_usage,
+    compare_compact_index
+)
 
 
 # =============================================================================
@@ -143,6 +152,87 @@ class TestBuildIndex:
 
         assert engine.item_metadata == metadata
 
+    @pytest.mark.parametrize("index_type,index_params", [
+        ("ivf_flat", {'nlist': 4, 'nprobe': 4}),
+        ("ivf_pq", {'nlist': 2, 'nprobe': 2, 'pq_m': 8, 'pq_nbits': 4}),
+        ("hnsw", {'M': 8, 'efSearch': 32}),
+    ])
+    def test_build_approximate_index(self, sample_embeddings, sample_labels, sample_class_names,
+                                     index_type, index_params):
+        """Test building IVF and HNSW indexes and searching them."""
+        engine = FashionRecommendationEngine(
+            embeddings=sample_embeddings,
+            labels=sample_labels,
+            class_names=sample_class_names,
+            n_components=64,
+            index_type=index_type,
+            index_params=index_params
+        )
+        engine.build_index()
+
+        assert engine.index.ntotal == 100
+        _, indices = engine.search(sample_embeddings[0], k=5)
+        assert len(indices[0]) == 5
+        if index_type != "ivf_pq":  # PQ distances are approximate
+            assert indices[0][0] == 0
+
+    @pytest.mark.parametrize("index_type,n_items", [("sq8", 100), ("sq_fp16", 100), ("opq", 300)])
+    def test_build_compact_index(self, sample_class_names, index_type, n_items):
+        """Test compact indexes store less than a flat float32 index."""
+        # OPQ trains its rotation with 256 centroids per sub-quantizer
+        rng = np.random.RandomState(0)
+        sample_embeddings = rng.randn(n_items, 512).astype('float32')
+        engine = FashionRecommendationEngine(
+            embeddings=sample_embeddings,
+            labels=rng.randint(0, 10, size=n_items),
+            class_names=sample_class_names,
+            n_components=64,
+            index_type=index_type,
+            index_params={'pq_m': 8, 'pq_nbits': 4},
+            store_reduced="float16"
+        )
+        engine.build_index()
+
+        memory_info = analyze_memory_usage(engine)
+        assert engine.reduced_embeddings.dtype == np.float16
+        assert memory_info['index_size_mb'] < memory_info['flat_index_size_mb']
+        _, indices = engine.search(sample_embeddings[0], k=5)
+        assert len(indices[0]) == 5
+
+    def test_compare_compact_index_reports_recall(self, engine_with_index, sample_embeddings,
+                                                  sample_labels, sample_class_names):
+        """Test compact comparison reports memory saved and recall@k."""
+        engine = FashionRecommendationEngine(
+            embeddings=sample_embeddings,
+            labels=sample_labels,
+            class_names=sample_class_names,
+            n_components=64,
+            index_type="sq_fp16",
+            store_reduced="none"
+        )
+        engine.build_index()
+
+        results = compare_compact_index(engine, engine_with_index, sample_embeddings[:10], k=5)
+
+        assert engine.reduced_embeddings is None
+        assert results['memory_saved_mb'] > 0
+        assert results['recall_at_k'] > 0.9
+
+    def test_ivf_pq_requires_divisible_dimension(self, sample_embeddings, sample_labels,
+                                                 sample_class_names):
+        """Test that pq_m must divide the index dimension."""
+        engine = FashionRecommendationEngine(
+            embeddings=sample_embeddings,
+            labels=sample_labels,
+            class_names=sample_class_names,
+            n_components=64,
+            index_type="ivf_pq",
+            index_params={'pq_m': 7}
+        )
+
+        with pytest.raises(ValueError, match="must divide"):
+            engine.build_index()
+
     def test_invalid_index_type_raises_error(self, sample_embeddings, sample_labels, sample_class_names):
         """Test that invalid index type raises error."""
         engine = FashionRecommendationEngine(
@@ -188,6 +278,43 @@ class TestSearch:
         assert distances[0][0] < 0.001
 
 
+class TestSearchBatch:
+    """Tests for batched search."""
+
+    def test_search_batch_matches_single_queries(self, engine_with_index, sample_embeddings):
+        """Test batched search returns the same hits as one search per query."""
+        queries = sample_embeddings[:8]
+        distances, indices = engine_with_index.search_batch(queries, k=5)
+
+        assert len(indices) == 8
+        for query, batch_d, batch_i in zip(queries, distances, indices):
+            single_d, single_i = engine_with_index.search(query, k=5)
+            np.testing.assert_array_equal(batch_i, single_i[0])
+            np.testing.assert_allclose(batch_d, single_d[0], rtol=1e-4, atol=1e-3)
+
+    def test_search_batch_applies_filters_per_query(self, engine_with_index, sample_embeddings,
+                                                    sample_labels):
+        """Test filters are applied to every query in the batch."""
+        _, indices = engine_with_index.search_batch(
+            sample_embeddings[:4], k=5, filter_by_class=[0, 1], exclude_indices=[0, 1, 2]
+        )
+
+        for query_indices in indices:
+            for idx in query_indices:
+                assert sample_labels[idx] in [0, 1]
+                assert idx not in [0, 1, 2]
+
+    def test_recommend_batch_returns_one_list_per_query(self, engine_with_index, sample_embeddings):
+        """Test recommend_batch formats results per query."""
+        results = engine_with_index.recommend_batch(sample_embeddings[:3], k=4)
+
+        assert len(results) == 3
+        for i, recs in enumerate(results):
+            assert len(recs) == 4
+            assert recs[0]['index'] == i
+            assert [r['rank'] for r in recs] == [1, 2, 3, 4]
+
+
 class TestFiltering:
     """Tests for filtering functionality."""
 
@@ -211,6 +338,28 @@ class TestFiltering:
         for idx in indices[0]:
             assert idx not in exclude
 
+    def test_filtered_search_returns_k_when_available(self, engine_with_index, sample_embeddings):
+        """Test a very selective filter still returns k results."""
+        exclude = list(range(95))
+
+        _, indices = engine_with_index.search(sample_embeddings[0], k=5, exclude_indices=exclude)
+
+        assert sorted(indices[0].tolist()) == [95, 96, 97, 98, 99]
+
+    def test_filtered_search_matches_brute_force(self, engine_with_index, sample_embeddings,
+                                                 sample_labels):
+        """Test filtered hits are the nearest allowed items in order."""
+        filter_classes = [3]
+        query = sample_embeddings[7]
+        n_allowed = int(np.isin(sample_labels, filter_classes).sum())
+
+        _, all_indices = engine_with_index.search(query, k=100)
+        expected = [idx for idx in all_indices[0] if sample_labels[idx] in filter_classes]
+
+        _, indices = engine_with_index.search(query, k=n_allowed, filter_by_class=filter_classes)
+
+        assert indices[0].tolist() == expected
+
 
 class TestRecommend:
     """Tests for the recommend method."""
@@ -248,9 +397,207 @@ class TestRecommend:
             assert 'item_ids' in rec
 
 
+    def test_recommend_drops_unfilled_ivf_slots(self, sample_embeddings, sample_labels, sample_class_names):
+        """Test that -1 padding from a partially probed IVF index never becomes a result."""
+        engine = FashionRecommendationEngine(
+            embeddings=sample_embeddings,
+            labels=sample_labels,
+            class_names=sample_class_names,
+            n_components=64,
+            index_type="ivf_flat",
+            index_params={'nlist': 4, 'nprobe': 1}
+        )
+        engine.build_index()
+
+        # One probed list holds far fewer than 90 items
+        _, indices = engine.search_batch(sample_embeddings[:3], k=90)
+        assert all(len(row) < 90 and np.all(row >= 0) for row in indices)
+
+        recommendations = engine.recommend(sample_embeddings[0], k=90)
+        assert recommendations and len(recommendations) < 90
+        for rank, rec in enumerate(recommendations, start=1):
+            assert rec['index'] >= 0
+            assert rec['label'] == sample_labels[rec['index']]
+            assert rec['rank'] == rank
+
+    def test_evaluate_recall_ignores_padding(self, sample_embeddings, sample_labels, sample_class_names):
+        """Test that -1 padding in both engines is not counted as a hit."""
+        from recommendation_engine import evaluate_recall
+
+        def engine(index_type, index_params=None):
+            built = FashionRecommendationEngine(
+                embeddings=sample_embeddings,
+                labels=sample_labels,
+                class_names=sample_class_names,
+                n_components=64,
+                index_type=index_type,
+                index_params=index_params
+            )
+            built.build_index()
+            return built
+
+        sparse = engine("ivf_flat", {'nlist': 4, 'nprobe': 1})
+        queries = sample_embeddings[:5]
+        found = sum(len(row) for row in sparse.search_batch(queries, k=90)[1])
+
+        # Against itself, recall is the share of slots actually filled
+        assert evaluate_recall(sparse, sparse, queries, k=90) == pytest.approx(found / (5 * 90))
+        assert evaluate_recall(engine("L2"), engine("L2"), queries, k=10) == 1.0
+
+
+class TestIncrementalUpdates:
+    """Tests for add_items/remove_ids and drift-triggered refits."""
+
+    @pytest.mark.parametrize("index_type", ["L2", "cosine", "ivf_flat", "sq8"])
+    def test_add_and_remove_items(self, sample_embeddings, sample_labels, sample_class_names,
+                                  index_type):
+        """Test that added items are found under their ids and removed ones are gone."""
+        engine = FashionRecommendationEngine(
+            embeddings=sample_embeddings[:90],
+            labels=sample_labels[:90],
+            class_names=sample_class_names,
+            n_components=32,
+            index_type=index_type,
+            index_params={'nlist': 4, 'nprobe': 4}
+        )
+        engine.build_index(metadata={'item_id': list(range(90))})
+
+        new_ids = np.arange(1000, 1010)
+        engine.add_items(sample_embeddings[90:], new_ids, sample_labels[90:],
+                         metadata={'item_id': list(new_ids)})
+
+        assert engine.index.ntotal == 100
+        recs = engine.recommend(sample_embeddings[95], k=1, return_metadata=True)
+        assert recs[0]['index'] == 1005
+        assert recs[0]['item_id'] == 1005
+        assert recs[0]['label'] == sample_labels[95]
+
+        assert engine.remove_ids([1005, 3, 99999]) == 2
+        assert engine.index.ntotal == 98
+
+        _, indices = engine.search_batch(sample_embeddings, k=98)
+        assert not np.isin([1005, 3], np.concatenate(indices)).any()
+        _, indices = engine.search(sample_embeddings[10], k=1)
+        assert indices[0][0] == 10
+
+    def test_add_items_rejects_existing_ids(self, engine_with_index, sample_embeddings,
+                                            sample_labels):
+        """Test that ids already in the index cannot be added again."""
+        with pytest.raises(ValueError, match="unique"):
+            engine_with_index.add_items(sample_embeddings[:1], [0], sample_labels[:1])
+
+    def test_drift_triggers_refit(self, engine_with_index, sample_embeddings, sample_labels):
+        """Test that heavy churn triggers a refit that resets drift statistics."""
+        assert not engine_with_index.needs_refit()
+        assert not engine_with_index.refit_if_needed()
+
+        engine_with_index.remove_ids(np.arange(35))
+        stats = engine_with_index.drift_stats()
+        assert stats['churn'] == pytest.approx(0.35)
+        assert engine_with_index.needs_refit()
+
+        assert engine_with_index.refit_if_needed()
+        assert engine_with_index.drift_stats()['churn'] == 0
+        assert engine_with_index.index.ntotal == 65
+        _, indices = engine_with_index.search(sample_embeddings[50], k=1)
+        assert indices[0][0] == 50
+
+    def test_updates_only_record_drift(self, engine_with_index, sample_embeddings,
+                                       sample_labels):
+        """Test that add_items/remove_ids never refit, even past the thresholds."""
+        with patch.object(engine_with_index, 'refit') as refit:
+            engine_with_index.remove_ids(np.arange(20))
+            engine_with_index.add_items(sample_embeddings[:15] + 0.01, np.arange(500, 515),
+                                        sample_labels[:15])
+
+        refit.assert_not_called()
+        assert engine_with_index.needs_refit()
+        assert engine_with_index.drift_stats()['churn'] == pytest.approx(0.35)
+
+    def test_residual_ratio_needs_min_added(self, engine_with_index, sample_embeddings,
+                                            sample_labels):
+        """Test that a single out-of-distribution item does not call for a refit."""
+        outlier = np.random.default_rng(3).standard_normal((1, sample_embeddings.shape[1])) * 100
+        engine_with_index.add_items(outlier, [500], sample_labels[:1])
+
+        assert engine_with_index.drift_stats()['residual_ratio'] > 1.25
+        assert not engine_with_index.needs_refit()
+        assert engine_with_index.needs_refit(min_added=1)
+
+    def test_background_refit(self, engine_with_index):
+        """Test that the background hook refits once drift crosses the thresholds."""
+        import time
+
+        engine_with_index.remove_ids(np.arange(35))
+        stop = engine_with_index.start_background_refit(interval=0.01)
+        try:
+            deadline = time.time() + 10
+            while engine_with_index.drift_stats()['churn'] and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            stop.set()
+
+        assert engine_with_index.drift_stats()['churn'] == 0
+        assert engine_with_index.index.ntotal == 65
+
+    def test_add_items_appends_without_copying_all_rows(self, engine_with_index,
+                                                        sample_embeddings, sample_labels):
+        """Test that item arrays grow with spare capacity instead of being re-concatenated."""
+        engine_with_index.add_items(sample_embeddings[:1] + 0.01, [500], sample_labels[:1])
+        buffer = engine_with_index._row_buffers['embeddings'].data
+        engine_with_index.add_items(sample_embeddings[1:3] + 0.01, [501, 502], sample_labels[1:3])
+
+        assert engine_with_index._row_buffers['embeddings'].data is buffer
+        assert engine_with_index.embeddings.shape == (103, sample_embeddings.shape[1])
+        np.testing.assert_array_equal(engine_with_index.ids[-3:], [500, 501, 502])
+        np.testing.assert_array_equal(engine_with_index.labels[-3:], sample_labels[:3])
+        np.testing.assert_allclose(engine_with_index.embeddings[-2:], sample_embeddings[1:3] + 0.01)
+        _, indices = engine_with_index.search(sample_embeddings[2] + 0.01, k=1)
+        assert indices[0][0] == 502
+
+    def test_update_memory_mapped_artifact(self, engine_with_index, sample_embeddings,
+                                           sample_labels):
+        """Test that updates on an mmapped artifact work on a private copy."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine_with_index.save_artifact(tmpdir)
+            loaded_engine = FashionRecommendationEngine.load(tmpdir)
+
+            loaded_engine.add_items(sample_embeddings[:1] + 0.01, [500], sample_labels[:1])
+            loaded_engine.remove_ids([0])
+
+            _, indices = loaded_engine.search(sample_embeddings[0], k=1)
+            assert indices[0][0] == 500
+            # The artifact on disk is untouched
+            assert FashionRecommendationEngine.load(tmpdir).index.ntotal == 100
+
+
 class TestSaveLoad:
     """Tests for save and load functionality."""
 
+    def test_save_and_load_keeps_index_params(self, sample_embeddings, sample_labels,
+                                              sample_class_names):
+        """Test that index type and search params survive save/load."""
+        engine = FashionRecommendationEngine(
+            embeddings=sample_embeddings,
+            labels=sample_labels,
+            class_names=sample_class_names,
+            n_components=64,
+            index_type="ivf_flat",
+            metric="cosine",
+            index_params={'nlist': 4, 'nprobe': 3}
+        )
+        engine.build_index()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            save_path = os.path.join(tmpdir, 'test_engine.pkl')
+            engine.save(save_path)
+            loaded_engine = FashionRecommendationEngine.load(save_path)
+
+        assert loaded_engine.index_type == "ivf_flat"
+        assert loaded_engine.metric == "cosine"
+        assert loaded_engine.index_params['nprobe'] == 3
+        assert faiss.extract_index_ivf(loaded_engine.index).nprobe == 3
+
     def test_save_and_load(self, engine_with_index, sample_embeddings):
         """Test saving and loading the engine."""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -272,6 +619,48 @@ class TestSaveLoad:
                 assert orig['index'] == loaded['index']
 
 
+class TestArtifact:
+    """Tests for the pickle-free, memory-mapped artifact format."""
+
+    def test_save_and_load_artifact(self, engine_with_index, sample_embeddings):
+        """Test artifact round trip gives the same results from mmapped arrays."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            artifact_dir = os.path.join(tmpdir, 'engine')
+            engine_with_index.save_artifact(artifact_dir)
+
+            assert os.path.exists(os.path.join(artifact_dir, 'manifest.json'))
+            assert not any(name.endswith('.pkl') for name in os.listdir(artifact_dir))
+
+            loaded_engine = FashionRecommendationEngine.load(artifact_dir)
+
+            assert isinstance(loaded_engine.labels, np.memmap)
+            assert isinstance(loaded_engine.pca, PCAProjection)
+
+            queries = sample_embeddings[:5]
+            original_d, original_i = engine_with_index.search_batch(queries, k=5)
+            loaded_d, loaded_i = loaded_engine.search_batch(queries, k=5)
+            for od, oi, ld, li in zip(original_d, original_i, loaded_d, loaded_i):
+                np.testing.assert_array_equal(oi, li)
+                np.testing.assert_allclose(od, ld, rtol=1e-4, atol=1e-3)
+
+            recs = loaded_engine.recommend(sample_embeddings[0], k=3, filter_by_class=[1])
+            assert all(rec['label'] == 1 for rec in recs)
+
+    def test_load_artifact_rejects_newer_version(self, engine_with_index):
+        """Test that artifacts from a newer format version are refused."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine_with_index.save_artifact(tmpdir)
+            manifest_path = os.path.join(tmpdir, 'manifest.json')
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            manifest['version'] += 1
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+
+            with pytest.raises(ValueError, match="newer than supported"):
+                FashionRecommendationEngine.load_artifact(tmpdir)
+
+
 # =============================================================================
 # Integration Test
 # =============================================================================
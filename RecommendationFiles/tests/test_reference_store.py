@@ -0,0 +1,108 @@
+"""
+Pytest tests for the shared, memory-mapped reference embedding store.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reference_store import (
+    ReferenceStore,
+    normalize_rows,
+    open_reference_store,
+    unit_cache_path
+)
+
+
+@pytest.fixture
+def reference_files(tmp_path):
+    """Write small embedding and label .npy files."""
+    np.random.seed(42)
+    embeddings = np.random.randn(300, 64).astype('float32')
+    embeddings[5] = 0
+    labels = np.random.randint(0, 10, size=300)
+    embedding_path = str(tmp_path / "embeddings.npy")
+    label_path = str(tmp_path / "labels.npy")
+    np.save(embedding_path, embeddings)
+    np.save(label_path, labels)
+    return embedding_path, label_path, embeddings, labels
+
+
+class TestReferenceStore:
+    """Test opening and normalizing the reference embeddings."""
+
+    def test_arrays_are_read_only_memory_maps(self, reference_files):
+        """Test that embeddings and labels are mapped, not copied."""
+        embedding_path, label_path, embeddings, labels = reference_files
+        store = ReferenceStore(embedding_path, label_path)
+
+        assert isinstance(store.embeddings, np.memmap)
+        assert not store.embeddings.flags.writeable
+        np.testing.assert_array_equal(store.embeddings, embeddings)
+        np.testing.assert_array_equal(store.labels, labels)
+
+    @pytest.mark.parametrize("dtype,atol", [("float32", 1e-6), ("float16", 1e-3)])
+    def test_unit_is_normalized_and_cached(self, reference_files, dtype, atol):
+        """Test that the normalized matrix is written next to the source and mapped."""
+        embedding_path, label_path, embeddings, _ = reference_files
+        store = ReferenceStore(embedding_path, label_path)
+
+        unit = store.unit(dtype)
+
+        assert os.path.exists(unit_cache_path(embedding_path, dtype))
+        assert isinstance(unit, np.memmap)
+        assert unit.dtype == dtype
+        expected = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True).clip(1e-12)
+        np.testing.assert_allclose(unit, expected, atol=atol)
+        assert np.all(unit[5] == 0)
+        assert store.unit(dtype) is unit
+
+    def test_stale_cache_is_rebuilt(self, reference_files):
+        """Test that a cache older than the source embeddings is replaced."""
+        embedding_path, label_path, embeddings, _ = reference_files
+        ReferenceStore(embedding_path, label_path).unit()
+        cache_path = unit_cache_path(embedding_path)
+        os.utime(cache_path, (0, 0))
+        np.save(embedding_path, -embeddings)
+
+        unit = ReferenceStore(embedding_path, label_path).unit()
+
+        np.testing.assert_allclose(unit, normalize_rows(-embeddings), atol=1e-6)
+
+    def test_fresh_cache_is_reused(self, reference_files):
+        """Test that a second store maps the existing cache instead of rebuilding it."""
+        embedding_path, label_path, _, _ = reference_files
+        ReferenceStore(embedding_path, label_path).unit()
+        mtime = os.path.getmtime(unit_cache_path(embedding_path))
+
+        ReferenceStore(embedding_path, label_path).unit()
+
+        assert os.path.getmtime(unit_cache_path(embedding_path)) == mtime
+
+    def test_open_returns_shared_instance(self, reference_files):
+        """Test that one store is opened per file pair per process."""
+        embedding_path, label_path, _, _ = reference_files
+
+        assert open_reference_store(embedding_path, label_path) is \
+            open_reference_store(embedding_path, label_path)
+
+    def test_mismatched_labels_raise_error(self, reference_files, tmp_path):
+        """Test that the embedding and label counts must match."""
+        embedding_path, _, _, labels = reference_files
+        short_path = str(tmp_path / "short.npy")
+        np.save(short_path, labels[:-1])
+
+        with pytest.raises(ValueError, match="Mismatch"):
+            ReferenceStore(embedding_path, short_path)
+
+    def test_unknown_dtype_raises_error(self, reference_files):
+        """Test that only float32 and float16 caches are supported."""
+        embedding_path, label_path, _, _ = reference_files
+
+        with pytest.raises(ValueError, match="Unknown reference embedding dtype"):
+            ReferenceStore(embedding_path, label_path).unit("int8")
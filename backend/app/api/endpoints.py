@@ -1,3 +1,4 @@
+import asyncio
 import io
 import json
 import logging
@@ -6,25 +7,38 @@ import traceback
 from typing import List, Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+import numpy as np
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from PIL import Image
 from pydantic import BaseModel
 
 from backend.app.config import settings
+from backend.app.database import queries
 from backend.app.database.connection import get_db
-from backend.app.services.s3_service import get_presigned_url, upload_file_to_s3
+from backend.app.metrics import WARDROBE_UPLOAD_STEP_TIME
+from backend.app.services.executors import run_cpu, run_io
+from backend.app.services.image_preprocessing import decode_image
+from backend.app.services.s3_service import (
+    cached_presigned_url,
+    delete_files_from_s3,
+    get_presigned_url,
+    upload_file_to_s3,
+)
 
 logger = logging.getLogger("wardrobe")
 logger.setLevel(logging.INFO)
 
 
 from backend.app.services.embedding_service import (
-    classify_image,
-    compute_embedding,
+    class_name,
+    classify_image_async,
+    classify_images_async,
+    compute_embedding_async,
     find_similar_items
 )
 
 from backend.app.recommendations.recommender import OutfitRecommender
+from backend.app.recommendations.snapshot import wardrobe_cache
 
 router = APIRouter()
 recommender = OutfitRecommender()
@@ -40,11 +54,29 @@ async def read_image_bytes(file: UploadFile) -> bytes:
 
 def load_pil_image(contents: bytes) -> Image.Image:
     try:
-        return Image.open(io.BytesIO(contents)).convert("RGB")
+        # Reduced-size JPEG decode: only the 224x224 model input is needed
+        return decode_image(contents)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid image file.")
 
 
+# Utility: Convert S3 URIs to presigned URLs; cache misses run concurrently on the io pool
+async def presign_urls(uris: List[Optional[str]]) -> List[Optional[str]]:
+    async def presign(uri):
+        if not uri or not uri.startswith("s3://"):
+            return uri
+        cached = cached_presigned_url(uri)
+        if cached is not None:
+            return cached
+        try:
+            return await run_io(get_presigned_url, uri)
+        except Exception as e:
+            logger.error(f"Failed to generate presigned URL for {uri}: {e}")
+            return uri  # Keep original S3 URI if conversion fails
+
+    return await asyncio.gather(*(presign(uri) for uri in uris))
+
+
 # Request Models
 class OutfitRequest(BaseModel):
     occasion: str
@@ -73,6 +105,15 @@ class RateOutfitRequest(BaseModel):
 
 
 # Upload Wardrobe Item
+async def delete_orphaned_objects(request_id: str, s3_uris: List[str]):
+    """Delete S3 objects of items that were not stored; failures are only logged."""
+    try:
+        await delete_files_from_s3(s3_uris)
+        logger.info(f"[{request_id}] Deleted {len(s3_uris)} S3 objects of items that were not stored")
+    except Exception as e:
+        logger.error(f"[{request_id}] Failed to delete orphaned S3 objects {s3_uris}: {e}")
+
+
 @router.post("/wardrobe/upload")
 async def upload_wardrobe_item(
     category: str,
@@ -82,59 +123,63 @@ async def upload_wardrobe_item(
     request_id = str(uuid4())
     logger.info(f"[{request_id}] Upload started: category={category}, filename={file.filename}")
 
+    async def timed(step: str, awaitable):
+        start = time.time()
+        result = await awaitable
+        elapsed = time.time() - start
+        WARDROBE_UPLOAD_STEP_TIME.labels(endpoint="single", step=step).observe(elapsed)
+        return result, elapsed
+
+    # Set once the S3 put succeeded / the row is stored, for cleanup on failure
+    image_url = None
+    item_id = None
     try:
         # Read UploadFile contents
         t0 = time.time()
-        contents = await file.read()
-        logger.info(f"[{request_id}] Step1: read file ({len(contents)} bytes) in {time.time() - t0:.3f}s")
+        contents, elapsed = await timed("read", file.read())
+        logger.info(f"[{request_id}] Step1: read file ({len(contents)} bytes) in {elapsed:.3f}s")
 
         if not contents:
             raise HTTPException(status_code=400, detail="Uploaded file is empty.")
 
-        # Upload to S3
-        t1 = time.time()
-        s3_key = f"wardrobe/{uuid4()}/{file.filename}"
-
-        file_stream = io.BytesIO(contents)
-        file_stream.seek(0)
+        image, elapsed = await timed("decode", run_cpu(load_pil_image, contents))
+        logger.info(f"[{request_id}] Step2: decoded image in {elapsed:.3f}s")
 
-        image_url = await upload_file_to_s3(
-            file=file_stream,
-            bucket=settings.S3_BUCKET_IMAGES,
-            key=s3_key
+        # The S3 upload and the embedding are independent, so run them together
+        s3_key = f"wardrobe/{uuid4()}/{file.filename}"
+        uploaded, embedded = await asyncio.gather(
+            timed("s3_upload", upload_file_to_s3(
+                file=io.BytesIO(contents),
+                bucket=settings.S3_BUCKET_IMAGES,
+                key=s3_key
+            )),
+            timed("embedding", compute_embedding_async(image)),
+            return_exceptions=True,
         )
-        logger.info(f"[{request_id}] Step2: S3 upload completed in {time.time() - t1:.3f}s")
-
-        # Insert wardrobe row (db is a CONNECTION now)
-        t2 = time.time()
-        item_id = await db.fetchval(
-            """
-            INSERT INTO wardrobe_items (image_url, category)
-            VALUES ($1, $2)
-            RETURNING item_id
-            """,
-            image_url, category
+        if not isinstance(uploaded, BaseException):
+            image_url, upload_time = uploaded
+        for outcome in (uploaded, embedded):
+            if isinstance(outcome, BaseException):
+                raise outcome
+        vector, embed_time = embedded
+        vector = vector.tolist()
+        logger.info(
+            f"[{request_id}] Step3: S3 upload ({upload_time:.3f}s) and "
+            f"embedding ({embed_time:.3f}s) completed concurrently"
         )
-        logger.info(f"[{request_id}] Step3: DB insert wardrobe → item_id={item_id} ({time.time() - t2:.3f}s)")
-
-        # Compute embedding
-        t3 = time.time()
-        image = Image.open(io.BytesIO(contents)).convert("RGB")
-        vector = compute_embedding(image).tolist()
-        logger.info(f"[{request_id}] Step4: embedding computed ({time.time() - t3:.3f}s)")
-
-        # Insert embedding row
-        t4 = time.time()
-        await db.execute(
-            """
-            INSERT INTO embeddings (item_id, embedding)
-            VALUES ($1, $2)
-            """,
-            item_id, vector
+
+        # Insert the wardrobe row and its embedding in one statement (atomic,
+        # one round trip)
+        item_id, elapsed = await timed(
+            "db_insert", queries.insert_wardrobe_item_with_embedding(db, image_url, category, vector)
         )
-        logger.info(f"[{request_id}] Step5: DB insert embedding ({time.time() - t4:.3f}s)")
+        logger.info(f"[{request_id}] Step4: DB insert wardrobe + embedding → item_id={item_id} ({elapsed:.3f}s)")
+
+        # Make the new item available to outfit generation without a reload
+        wardrobe_cache.upsert_item(item_id, category, vector)
 
         total = time.time() - t0
+        WARDROBE_UPLOAD_STEP_TIME.labels(endpoint="single", step="total").observe(total)
         logger.info(f"[{request_id}] ✔ Upload completed in {total:.3f}s")
 
         return {
@@ -145,60 +190,272 @@ async def upload_wardrobe_item(
 
     except Exception as e:
         logger.error(f"[{request_id}] Upload failed: {str(e)}\n{traceback.format_exc()}")
+        if image_url is not None and item_id is None:
+            await delete_orphaned_objects(request_id, [image_url])
         raise HTTPException(status_code=500, detail=f"Wardrobe upload failed: {str(e)}")
 
 
+# Wardrobe categories for the classifier's (Fashion-MNIST) class names, used
+# when a batch upload has no category. The engine predicts label indices,
+# which class_name resolves first. Unknown labels are stored as UNCLASSIFIED
+CLASSIFIER_CATEGORIES = {
+    "T-shirt/top": "Tops",
+    "Pullover": "Tops",
+    "Shirt": "Tops",
+    "Trouser": "Bottoms",
+    "Dress": "Dresses",
+    "Coat": "Outerwear",
+    "Sandal": "Shoes",
+    "Sneaker": "Shoes",
+    "Ankle boot": "Shoes",
+    "Bag": "Accessories",
+}
+UNCLASSIFIED = "Unclassified"
+
+
+def wardrobe_category(label: str) -> str:
+    return CLASSIFIER_CATEGORIES.get(class_name(label), UNCLASSIFIED)
+
+
+# Upload Many Wardrobe Items
+@router.post("/wardrobe/upload/batch")
+async def upload_wardrobe_items(
+    files: List[UploadFile] = File(...),
+    category: Optional[str] = None,
+    db=Depends(get_db)
+):
+    """
+    Upload up to BATCH_MAX_FILES images in one request.
+
+    Files are decoded concurrently. Then the S3 uploads run concurrently with
+    embedding, which goes through the batching queue so the images share
+    forward passes. Every successful item is inserted in one transaction.
+    Without a category, each item is stored under the wardrobe category of
+    its predicted label (CLASSIFIER_CATEGORIES). S3 objects of items that
+    are not stored (failed embedding or insert) are deleted again.
+    Returns a status per file, in upload order; a file that fails does not
+    fail the others.
+    """
+    if len(files) > settings.BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BATCH_MAX_FILES} files per request."
+        )
+
+    request_id = str(uuid4())
+    logger.info(f"[{request_id}] Batch upload started: {len(files)} files, category={category}")
+    t0 = time.time()
+
+    results = [{"filename": file.filename, "status": "pending"} for file in files]
+
+    def fail(i: int, error: str):
+        results[i]["status"] = "error"
+        results[i]["error"] = error
+
+    # Read and decode
+    contents = [await file.read() for file in files]
+    decoded = await asyncio.gather(
+        *(run_cpu(load_pil_image, data) for data in contents if data),
+        return_exceptions=True,
+    )
+    decoded = iter(decoded)
+    images = {}
+    for i, data in enumerate(contents):
+        if not data:
+            fail(i, "Uploaded file is empty.")
+            continue
+        image = next(decoded)
+        if isinstance(image, Exception):
+            fail(i, "Invalid image file.")
+        else:
+            images[i] = image
+    WARDROBE_UPLOAD_STEP_TIME.labels(endpoint="batch", step="decode").observe(time.time() - t0)
+    logger.info(f"[{request_id}] Step1: read and decoded {len(images)} images ({time.time() - t0:.3f}s)")
+
+    # S3 uploads and embedding/classification run at the same time
+    t1 = time.time()
+    indices = list(images)
+
+    async def upload(i: int):
+        return await upload_file_to_s3(
+            file=io.BytesIO(contents[i]),
+            bucket=settings.S3_BUCKET_IMAGES,
+            key=f"wardrobe/{uuid4()}/{files[i].filename}"
+        )
+
+    async def embed():
+        batch = [images[i] for i in indices]
+        if category is None:
+            return await classify_images_async(batch)
+        vectors = await asyncio.gather(*(compute_embedding_async(image) for image in batch))
+        return [{"embedding": vector} for vector in vectors]
+
+    uploads, embedded = await asyncio.gather(
+        asyncio.gather(*(upload(i) for i in indices), return_exceptions=True),
+        embed(),
+        return_exceptions=True,
+    )
+    # Objects uploaded for items that end up not being stored
+    orphaned = []
+    if isinstance(embedded, Exception):
+        logger.error(f"[{request_id}] Batch embedding failed: {embedded}")
+        for i, image_url in zip(indices, uploads):
+            fail(i, f"Embedding failed: {embedded}")
+            if not isinstance(image_url, Exception):
+                orphaned.append(image_url)
+        embedded = []
+
+    rows = []
+    for i, image_url, item in zip(indices, uploads, embedded):
+        if isinstance(image_url, Exception):
+            fail(i, f"S3 upload failed: {image_url}")
+            continue
+        if category is None:
+            results[i]["predicted_label"] = class_name(item["label"])
+        item_category = category or wardrobe_category(item["label"])
+        rows.append((i, image_url, item_category, np.asarray(item["embedding"]).tolist()))
+    WARDROBE_UPLOAD_STEP_TIME.labels(endpoint="batch", step="s3_upload_and_embedding").observe(time.time() - t1)
+    logger.info(f"[{request_id}] Step2: S3 uploads and embeddings ({time.time() - t1:.3f}s)")
+
+    # Insert every stored item and its embedding in one transaction
+    t2 = time.time()
+    if rows:
+        try:
+            async with db.transaction():
+                inserted = await queries.insert_wardrobe_items(
+                    db,
+                    [image_url for _, image_url, _, _ in rows],
+                    [item_category for _, _, item_category, _ in rows],
+                )
+                item_ids = {row["image_url"]: row["item_id"] for row in inserted}
+                await queries.insert_embeddings(
+                    db, [(item_ids[image_url], vector) for _, image_url, _, vector in rows]
+                )
+        except Exception as e:
+            logger.error(f"[{request_id}] Batch insert failed: {e}\n{traceback.format_exc()}")
+            for i, image_url, _, _ in rows:
+                fail(i, f"Database insert failed: {e}")
+                orphaned.append(image_url)
+        else:
+            for i, image_url, item_category, vector in rows:
+                item_id = item_ids[image_url]
+                # Make the new items available to outfit generation without a reload
+                wardrobe_cache.upsert_item(item_id, item_category, vector)
+                results[i].update(
+                    status="success", item_id=item_id, image_url=image_url, category=item_category
+                )
+    WARDROBE_UPLOAD_STEP_TIME.labels(endpoint="batch", step="db_insert").observe(time.time() - t2)
+    logger.info(f"[{request_id}] Step3: DB insert {len(rows)} items ({time.time() - t2:.3f}s)")
+
+    if orphaned:
+        await delete_orphaned_objects(request_id, orphaned)
+
+    uploaded = sum(result["status"] == "success" for result in results)
+    WARDROBE_UPLOAD_STEP_TIME.labels(endpoint="batch", step="total").observe(time.time() - t0)
+    logger.info(
+        f"[{request_id}] ✔ Batch upload completed in {time.time() - t0:.3f}s: "
+        f"{uploaded} uploaded, {len(results) - uploaded} failed"
+    )
+    return {"uploaded": uploaded, "failed": len(results) - uploaded, "items": results}
+
+
 # Get All Wardrobe Items
+# Fields returned by /wardrobe/items; all but the first three live in metadata
+WARDROBE_ITEM_FIELDS = (
+    "item_id", "image_url", "category",
+    "subcategory", "brand", "colors", "occasions", "season", "notes",
+)
+_METADATA_LIST_FIELDS = ("colors", "occasions")
+
+
+def parse_metadata(metadata) -> dict:
+    # Handle metadata - it might be None, dict, or JSON string
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except ValueError:
+            return {}
+    return metadata if isinstance(metadata, dict) else {}
+
+
 @router.get("/wardrobe/items")
-async def get_wardrobe_items(db=Depends(get_db)):
-    # Fetch all wardrobe items from database
-    # db is already a connection from get_db() dependency
-    items = await db.fetch(
-        """
-        SELECT item_id, image_url, category, metadata
-        FROM wardrobe_items
-        ORDER BY item_id DESC
-        """
+async def get_wardrobe_items(
+    after_item_id: Optional[int] = None,
+    limit: int = Query(settings.WARDROBE_PAGE_SIZE, ge=1, le=settings.WARDROBE_MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    category: Optional[str] = None,
+    occasion: Optional[List[str]] = Query(None),
+    season: Optional[List[str]] = Query(None),
+    color: Optional[List[str]] = Query(None),
+    db=Depends(get_db),
+):
+    """
+    One page of wardrobe items, newest first.
+
+    Pass the returned next_after_item_id as after_item_id to get the next
+    page (null when there are no more). fields is a comma-separated subset
+    of WARDROBE_ITEM_FIELDS; only what is requested is selected, parsed and
+    presigned. Filters are exact matches evaluated in SQL; occasion, season
+    and color match an element of the item's metadata list, and may be
+    repeated to match any of several values (e.g. "Summer" or "All-Season").
+    """
+    if fields:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = sorted(set(selected) - set(WARDROBE_ITEM_FIELDS))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        selected = [field for field in WARDROBE_ITEM_FIELDS if field in selected]
+    else:
+        selected = list(WARDROBE_ITEM_FIELDS)
+    metadata_fields = [field for field in selected if field not in ("item_id", "image_url", "category")]
+
+    # item_id is always selected: it is the pagination cursor
+    columns = ["item_id"]
+    columns += [column for column in ("image_url", "category") if column in selected]
+    if metadata_fields:
+        columns.append("metadata")
+
+    # One value: a single containment test; several: any of them
+    contains, any_of = {}, {}
+    for key, values in (("occasions", occasion), ("season", season), ("colors", color)):
+        if values and len(values) == 1:
+            contains[key] = values
+        elif values:
+            any_of[key] = values
+    # Fetch one extra row to know whether another page follows
+    rows = await queries.list_wardrobe_items(
+        db, columns, limit + 1,
+        after_item_id=after_item_id, category=category,
+        metadata_contains=contains, metadata_any=any_of,
     )
-    
-    # Convert to list of dicts
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # Convert S3 URIs to presigned URLs for frontend display
+    if "image_url" in selected:
+        image_urls = await presign_urls([row["image_url"] for row in rows])
+    else:
+        image_urls = [None] * len(rows)
+
     response = []
-    for row in items:
-        # Handle metadata - it might be None, dict, or JSON string
-        metadata = row.get("metadata")
-        if metadata is None:
-            metadata = {}
-        elif isinstance(metadata, str):
-            try:
-                metadata = json.loads(metadata)
-            except:
-                metadata = {}
-        elif not isinstance(metadata, dict):
-            metadata = {}
-        
-        # Convert S3 URI to presigned URL for frontend display
-        image_url = row["image_url"]
-        if image_url and image_url.startswith("s3://"):
-            try:
-                image_url = get_presigned_url(image_url)
-                logger.info(f"Converted S3 URI to presigned URL for item {row['item_id']}")
-            except Exception as e:
-                logger.error(f"Failed to generate presigned URL for item {row['item_id']}: {e}")
-                # Keep original S3 URI if conversion fails
-        
-        response.append({
-            "item_id": row["item_id"],
-            "image_url": image_url,
-            "category": row["category"],
-            "subcategory": metadata.get("subcategory"),
-            "brand": metadata.get("brand"),
-            "colors": metadata.get("colors", []),
-            "occasions": metadata.get("occasions", []),
-            "season": metadata.get("season"),
-            "notes": metadata.get("notes"),
-        })
-    
-    return {"items": response}
+    for row, image_url in zip(rows, image_urls):
+        item = {"item_id": row["item_id"]}
+        if "image_url" in selected:
+            item["image_url"] = image_url
+        if "category" in selected:
+            item["category"] = row["category"]
+        if metadata_fields:
+            metadata = parse_metadata(row.get("metadata"))
+            for field in metadata_fields:
+                item[field] = metadata.get(field, [] if field in _METADATA_LIST_FIELDS else None)
+        if "item_id" not in selected:
+            del item["item_id"]
+        response.append(item)
+
+    return {
+        "items": response,
+        "next_after_item_id": rows[-1]["item_id"] if has_more else None,
+    }
 
 
 # Predict + Similar Items
@@ -209,9 +466,9 @@ async def predict_image(
 ):
     try:
         contents = await read_image_bytes(file)
-        image = load_pil_image(contents)
+        image = await run_cpu(load_pil_image, contents)
 
-        classified = classify_image(image)
+        classified = await classify_image_async(image)
 
         if "embedding" not in classified:
             raise HTTPException(
@@ -247,6 +504,42 @@ async def predict_image(
         )
 
 
+# Bulk Predict (wardrobe imports)
+@router.post("/predict/batch")
+async def predict_images(
+    files: List[UploadFile] = File(...),
+    top_k: int = 1,
+):
+    if len(files) > settings.BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BATCH_MAX_FILES} files per request."
+        )
+
+    contents = [await read_image_bytes(file) for file in files]
+    images = await asyncio.gather(*(run_cpu(load_pil_image, data) for data in contents))
+
+    try:
+        classified = await classify_images_async(list(images), top_k=top_k)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Prediction failed: {str(e)}"
+        )
+
+    return {
+        "predictions": [
+            {
+                "filename": file.filename,
+                "predicted_label": result["label"],
+                "confidence": result["confidence"],
+                **({"top_k": result["top_k"]} if "top_k" in result else {}),
+            }
+            for file, result in zip(files, classified)
+        ]
+    }
+
+
 # Generate Outfits
 @router.post("/outfits/generate")
 async def generate_outfits(req: OutfitRequest, db=Depends(get_db)):
@@ -265,17 +558,7 @@ async def save_outfit(req: SaveOutfitRequest, db=Depends(get_db)):
     try:
         outfit_id = str(uuid4())
 
-        await db.execute(
-            """
-            INSERT INTO saved_outfits (outfit_id, items, occasion, season, name)
-            VALUES ($1, $2, $3, $4, $5)
-            """,
-            outfit_id,
-            req.items,
-            req.occasion,
-            req.season,
-            req.name,
-        )
+        await queries.insert_saved_outfit(db, outfit_id, req.items, req.occasion, req.season, req.name)
 
         return {"status": "success", "outfit_id": outfit_id}
 
@@ -287,32 +570,15 @@ async def save_outfit(req: SaveOutfitRequest, db=Depends(get_db)):
 @router.get("/outfits/saved")
 async def get_saved_outfits(db=Depends(get_db)):
 
-    outfits = await db.fetch(
-        """
-        SELECT outfit_id, items, occasion, season, name, created_at
-        FROM saved_outfits
-        ORDER BY created_at DESC
-        """
-    )
-
-    wardrobe = await db.fetch(
-        """
-        SELECT item_id, image_url, category, metadata
-        FROM wardrobe_items
-        """
-    )
+    outfits = await queries.saved_outfits(db)
+    wardrobe = await queries.all_wardrobe_items(db)
 
     # Build lookup and convert S3 URIs to presigned URLs
+    image_urls = await presign_urls([wrow.get("image_url") for wrow in wardrobe])
     wardrobe_lookup = {}
-    for wrow in wardrobe:
+    for wrow, image_url in zip(wardrobe, image_urls):
         item_data = dict(wrow)
-        # Convert S3 URI to presigned URL
-        image_url = item_data.get("image_url")
-        if image_url and image_url.startswith("s3://"):
-            try:
-                item_data["image_url"] = get_presigned_url(image_url)
-            except Exception as e:
-                logger.error(f"Failed to generate presigned URL: {e}")
+        item_data["image_url"] = image_url
         wardrobe_lookup[wrow["item_id"]] = item_data
 
     response = []
@@ -345,7 +611,7 @@ async def get_saved_outfits(db=Depends(get_db)):
 @router.delete("/outfits/{outfit_id}")
 async def delete_outfit(outfit_id: str, db=Depends(get_db)):
     try:
-        await db.execute("DELETE FROM saved_outfits WHERE outfit_id = $1", outfit_id)
+        await queries.delete_saved_outfit(db, outfit_id)
         return {"status": "success", "deleted_outfit_id": outfit_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Delete outfit failed: {str(e)}")
@@ -361,40 +627,12 @@ class UpdateOutfitRequest(BaseModel):
 @router.patch("/outfits/{outfit_id}")
 async def update_outfit(outfit_id: str, req: UpdateOutfitRequest, db=Depends(get_db)):
     try:
-        # Build dynamic update query based on provided fields
-        updates = []
-        values = []
-        param_num = 1
-        
-        if req.name is not None:
-            updates.append(f"name = ${param_num}")
-            values.append(req.name)
-            param_num += 1
-        
-        if req.occasion is not None:
-            updates.append(f"occasion = ${param_num}")
-            values.append(req.occasion)
-            param_num += 1
-        
-        if req.season is not None:
-            updates.append(f"season = ${param_num}")
-            values.append(req.season)
-            param_num += 1
-        
-        if req.items is not None:
-            updates.append(f"items = ${param_num}")
-            values.append(req.items)
-            param_num += 1
-        
-        if not updates:
+        updated = await queries.update_saved_outfit(
+            db, outfit_id, name=req.name, occasion=req.occasion, season=req.season, items=req.items
+        )
+        if not updated:
             return {"status": "success", "message": "No updates provided", "outfit_id": outfit_id}
-        
-        # Add outfit_id as the last parameter
-        values.append(outfit_id)
-        
-        query = f"UPDATE saved_outfits SET {', '.join(updates)} WHERE outfit_id = ${param_num}"
-        await db.execute(query, *values)
-        
+
         return {"status": "success", "updated_outfit_id": outfit_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Update outfit failed: {str(e)}")
@@ -404,10 +642,8 @@ async def update_outfit(outfit_id: str, req: UpdateOutfitRequest, db=Depends(get
 @router.delete("/wardrobe/item/{item_id}")
 async def delete_wardrobe_item(item_id: int, db=Depends(get_db)):
     try:
-        # Delete embedding first (foreign key)
-        await db.execute("DELETE FROM embeddings WHERE item_id = $1", item_id)
-        # Delete wardrobe item
-        result = await db.execute("DELETE FROM wardrobe_items WHERE item_id = $1", item_id)
+        await queries.delete_wardrobe_item(db, item_id)
+        wardrobe_cache.remove_item(item_id)
         return {"status": "success", "deleted_item_id": item_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Delete failed: {str(e)}")
@@ -428,16 +664,8 @@ async def update_wardrobe_item(item_id: int, req: UpdateWardrobeItemRequest, db=
         }
 
         # Update category and metadata
-        await db.execute(
-            """
-            UPDATE wardrobe_items
-            SET category = $1, metadata = $2
-            WHERE item_id = $3
-            """,
-            req.category,
-            json.dumps(metadata),
-            item_id,
-        )
+        await queries.update_wardrobe_item(db, item_id, req.category, metadata)
+        wardrobe_cache.update_item(item_id, req.category, metadata)
 
         return {"status": "success", "item_id": item_id}
     except Exception as e:
@@ -448,10 +676,8 @@ async def update_wardrobe_item(item_id: int, req: UpdateWardrobeItemRequest, db=
 @router.delete("/wardrobe/clear-all")
 async def clear_all_wardrobe_items(db=Depends(get_db)):
     try:
-        # Delete all embeddings first (foreign key constraint)
-        await db.execute("DELETE FROM embeddings")
-        # Delete all wardrobe items
-        await db.execute("DELETE FROM wardrobe_items")
+        await queries.delete_all_wardrobe_items(db)
+        wardrobe_cache.clear()
         return {"status": "success", "message": "All wardrobe items cleared"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Clear failed: {str(e)}")
@@ -478,15 +704,7 @@ async def upload_document(file: UploadFile = File(...), db=Depends(get_db)):
             "s3_uri": s3_uri
         }
 
-        await db.execute(
-            """
-            INSERT INTO documents (document_id, s3_uri, metadata)
-            VALUES ($1, $2, $3::jsonb)
-            """,
-            document_id,
-            s3_uri,
-            json.dumps(metadata)
-        )
+        await queries.insert_document(db, document_id, s3_uri, metadata)
 
         return {"status": "success", "document_id": document_id, "s3_uri": s3_uri}
 
@@ -505,16 +723,7 @@ async def rate_outfit(outfit_id: str, req: RateOutfitRequest, db=Depends(get_db)
     rating_id = str(uuid4())
 
     try:
-        await db.execute(
-            """
-            INSERT INTO outfit_ratings (rating_id, outfit_id, rating, notes)
-            VALUES ($1, $2, $3, $4)
-            """,
-            rating_id,
-            outfit_id,
-            req.rating,
-            req.notes,
-        )
+        await queries.insert_outfit_rating(db, rating_id, outfit_id, req.rating, req.notes)
 
         return {
             "status": "success",
@@ -533,15 +742,7 @@ async def rate_outfit(outfit_id: str, req: RateOutfitRequest, db=Depends(get_db)
 @router.get("/outfits/{outfit_id}/ratings")
 async def get_outfit_ratings(outfit_id: str, db=Depends(get_db)):
     try:
-        rows = await db.fetch(
-            """
-            SELECT rating_id, rating, notes, created_at
-            FROM outfit_ratings
-            WHERE outfit_id = $1
-            ORDER BY created_at DESC
-            """,
-            outfit_id
-        )
+        rows = await queries.outfit_ratings(db, outfit_id)
 
         return {
             "outfit_id": outfit_id,
@@ -3,56 +3,239 @@ Classification Engine (using precomputed .npy embeddings)
 =========================================================
 """
 
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
 import numpy as np
-from typing import Dict
+from typing import Dict, Optional
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import LabelEncoder
 
+from RecommendationFiles.reference_store import (
+    DEFAULT_EMBEDDING_PATH,
+    DEFAULT_LABEL_PATH,
+    open_reference_store,
+)
+
+# Bump when the artifact layout or training procedure changes; part of the key
+CLASSIFIER_ARTIFACT_VERSION = 2
+
+# Bytes hashed at a time, so hashing a memory-mapped file stays out of RAM
+_HASH_CHUNK = 64 << 20
+
+
+def training_data_hash(X: np.ndarray, y: np.ndarray, **params) -> str:
+    """Hash of the training arrays, training parameters and artifact version."""
+    digest = hashlib.blake2b(digest_size=16)
+    header = {"version": CLASSIFIER_ARTIFACT_VERSION, "params": params}
+    for name, array in (("X", X), ("y", y)):
+        header[name] = [str(array.dtype), list(array.shape)]
+    digest.update(json.dumps(header, sort_keys=True).encode())
+    for array in (X, y):
+        if array.dtype == object:
+            # Pickled labels: hash their text, not the object pointers
+            array = array.astype(str)
+        flat = np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+        for start in range(0, len(flat), _HASH_CHUNK):
+            digest.update(flat[start:start + _HASH_CHUNK])
+    return digest.hexdigest()
+
+
+def _file_stats(*paths: str) -> Dict[str, list]:
+    stats = {}
+    for path in paths:
+        stat = os.stat(path)
+        stats[os.path.abspath(path)] = [stat.st_size, stat.st_mtime_ns]
+    return stats
+
+
+def cached_training_data_hash(
+    embedding_path: str, label_path: str, X: np.ndarray, y: np.ndarray, **params
+) -> str:
+    """
+    training_data_hash, memoized in "<embeddings>.classifier-hash.json" against
+    the files' size and mtime, so unchanged inputs are not re-read on startup.
+    """
+    stem, _ = os.path.splitext(embedding_path)
+    memo_path = f"{stem}.classifier-hash.json"
+    key = {
+        "version": CLASSIFIER_ARTIFACT_VERSION,
+        "params": params,
+        "files": _file_stats(embedding_path, label_path),
+    }
+    try:
+        with open(memo_path) as f:
+            memo = json.load(f)
+        if memo.get("key") == key:
+            return memo["hash"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    data_hash = training_data_hash(X, y, **params)
+    try:
+        tmp_path = f"{memo_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"key": key, "hash": data_hash}, f)
+        os.replace(tmp_path, memo_path)
+    except OSError:
+        pass  # read-only checkout: hash again next time
+    return data_hash
+
+
+def default_artifact_dir(embedding_path: str, data_hash: str) -> str:
+    """Trained classifiers are kept next to the embeddings, one directory per data hash."""
+    stem, _ = os.path.splitext(embedding_path)
+    return f"{stem}.classifier-{data_hash[:16]}"
+
 
 class ClassificationEngine:
     def __init__(
         self,
-        embedding_path: str = "ComputerVisionFiles/fashion_mnist_resnet50_embeddings.npy",
-        label_path: str = "ComputerVisionFiles/fashion_mnist_labels.npy",
+        embedding_path: str = DEFAULT_EMBEDDING_PATH,
+        label_path: str = DEFAULT_LABEL_PATH,
+        artifact_dir: Optional[str] = None,
+        max_iter: int = 3000,
     ):
         """
-        Loads all embeddings and labels into memory, and trains the classifier once.
+        Maps the embeddings and labels (shared with other workers through the
+        reference store), then loads the classifier trained on exactly this
+        data, training and saving it only if no such artifact exists yet.
+
+        artifact_dir defaults to "<embeddings>.classifier-<data hash>" next to
+        the embedding file, so changed inputs get a new artifact.
         """
 
         # -----------------------------------------------------------
         # Load training data from .npy files provided by the user
         # -----------------------------------------------------------
         try:
-            self.X = np.load(embedding_path)  # shape: (N, D)
-            self.y_raw = np.load(label_path)  # shape: (N,)
+            store = open_reference_store(embedding_path, label_path)
         except FileNotFoundError:
             raise RuntimeError(
                 f"Could not find embeddings or label files at: "
                 f"{embedding_path}, {label_path}"
             )
+        except ValueError as e:
+            raise RuntimeError(f"Embedding count does not match label count. {e}")
 
-        if self.X.shape[0] != self.y_raw.shape[0]:
-            raise RuntimeError(
-                "Embedding count does not match label count. "
-                f"{self.X.shape[0]} embeddings vs {self.y_raw.shape[0]} labels."
-            )
+        self.X = store.embeddings  # shape: (N, D), read-only memory map
+        self.y_raw = store.labels  # shape: (N,)
 
-        # -----------------------------------------------------------
-        # Encode labels
-        # -----------------------------------------------------------
-        self.label_encoder = LabelEncoder()
-        self.y = self.label_encoder.fit_transform(self.y_raw)
+        self.data_hash = cached_training_data_hash(
+            embedding_path, label_path, self.X, self.y_raw, max_iter=max_iter
+        )
+        self.artifact_dir = artifact_dir or default_artifact_dir(embedding_path, self.data_hash)
 
         # -----------------------------------------------------------
-        # Train classifier (Logistic Regression)
+        # Load the trained linear head, or train it once and save it
         # -----------------------------------------------------------
-        self.model = LogisticRegression(max_iter=3000)
-        self.model.fit(self.X, self.y)
+        if self._load_artifact():
+            print(f"Loaded classifier from {self.artifact_dir}")
+        else:
+            self._train(max_iter)
+            self._save_artifact()
+            print(f"Trained classifier saved to {self.artifact_dir}")
 
         print("ClassificationEngine initialized.")
         print(f"Loaded {self.X.shape[0]} embeddings.")
         print(f"Classes: {self.label_encoder.classes_.tolist()}")
 
+    # ---------------------------------------------------------------------
+    # TRAIN / PERSIST THE CLASSIFIER
+    # ---------------------------------------------------------------------
+    def _training_labels(self) -> np.ndarray:
+        """
+        The labels as trained on. Pickled (object) labels are trained as text,
+        so the classes can be saved without pickles and load with the same
+        dtype; other labels keep their own dtype (e.g. int64 indices).
+        """
+        if self.y_raw.dtype == object:
+            return self.y_raw.astype(str)
+        return self.y_raw
+
+    def _train(self, max_iter: int):
+        # Encode labels
+        self.label_encoder = LabelEncoder()
+        self.y = self.label_encoder.fit_transform(self._training_labels())
+
+        # Train classifier (Logistic Regression)
+        self.model = LogisticRegression(max_iter=max_iter)
+        self.model.fit(self.X, self.y)
+
+        # Plain linear head: logits = X @ weights.T + bias
+        self.weights = np.ascontiguousarray(self.model.coef_, dtype=np.float32)
+        self.bias = np.ascontiguousarray(self.model.intercept_, dtype=np.float32)
+
+    def _save_artifact(self):
+        """Write weights, bias, classes and a manifest (no pickles), atomically."""
+        parent = os.path.dirname(os.path.abspath(self.artifact_dir))
+        tmp_dir = None
+        try:
+            tmp_dir = tempfile.mkdtemp(prefix=".classifier-", dir=parent)
+            np.save(os.path.join(tmp_dir, "weights.npy"), self.weights)
+            np.save(os.path.join(tmp_dir, "bias.npy"), self.bias)
+            # Never an object array (see _training_labels), so no pickle
+            np.save(os.path.join(tmp_dir, "classes.npy"), self.label_encoder.classes_)
+            manifest = {
+                "format": "class_engine.logistic_regression",
+                "version": CLASSIFIER_ARTIFACT_VERSION,
+                "data_hash": self.data_hash,
+                "n_samples": int(self.X.shape[0]),
+                "n_features": int(self.weights.shape[1]),
+            }
+            with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+                json.dump(manifest, f, indent=2)
+            os.rename(tmp_dir, self.artifact_dir)
+        except OSError as e:
+            # Already saved by a concurrent worker, or a read-only checkout
+            print(f"Could not save classifier to {self.artifact_dir}: {e}")
+            if tmp_dir is not None:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _load_artifact(self) -> bool:
+        try:
+            with open(os.path.join(self.artifact_dir, "manifest.json")) as f:
+                manifest = json.load(f)
+            if manifest.get("version") != CLASSIFIER_ARTIFACT_VERSION or \
+                    manifest.get("data_hash") != self.data_hash:
+                return False
+            self.weights = np.load(os.path.join(self.artifact_dir, "weights.npy"))
+            self.bias = np.load(os.path.join(self.artifact_dir, "bias.npy"))
+            classes = np.load(os.path.join(self.artifact_dir, "classes.npy"))
+        except (OSError, ValueError):
+            return False
+
+        self.label_encoder = LabelEncoder()
+        self.label_encoder.classes_ = classes
+        try:
+            self.y = self.label_encoder.transform(self._training_labels())
+        except ValueError:
+            # Classes from a different label set
+            return False
+
+        # Equivalent fitted sklearn model, for callers that use it directly
+        self.model = LogisticRegression()
+        self.model.coef_ = self.weights
+        self.model.intercept_ = self.bias
+        self.model.classes_ = np.arange(len(classes))
+        self.model.n_features_in_ = self.weights.shape[1]
+        return True
+
+    def _probabilities(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities from the linear head (one matmul)."""
+        logits = np.asarray(X, dtype=np.float32) @ self.weights.T + self.bias
+        if logits.shape[1] == 1:
+            # Binary logistic regression stores only the positive-class row
+            positive = 1.0 / (1.0 + np.exp(-logits[:, 0]))
+            return np.stack([1.0 - positive, positive], axis=1)
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=1, keepdims=True)
+        return logits
+
 
     # ---------------------------------------------------------------------
     # PREDICT A LABEL FOR A NEW EMBEDDING
@@ -73,16 +256,52 @@ class ClassificationEngine:
             confidence  → model confidence in that prediction
         """
 
-        if embedding.ndim == 1:
-            embedding = embedding.reshape(1, -1)  # shape → (1, D)
+        result = self.predict_batch(np.asarray(embedding).reshape(1, -1))
 
-        y_pred = self.model.predict(embedding)
-        y_proba = self.model.predict_proba(embedding)[0]
+        return {
+            "label": result["labels"][0],
+            "confidence": float(result["confidences"][0]),
+        }
 
-        label = self.label_encoder.inverse_transform(y_pred)[0]
-        confidence = float(np.max(y_proba))
+    # ---------------------------------------------------------------------
+    # PREDICT LABELS FOR MANY EMBEDDINGS AT ONCE
+    # ---------------------------------------------------------------------
+    def predict_batch(self, embeddings: np.ndarray, top_k: int = 1) -> Dict:
+        """
+        Predicts class labels for N embeddings with one logits matmul and a
+        vectorized softmax.
 
-        return {
-            "label": label,
-            "confidence": confidence,
+        Parameters
+        ----------
+        embeddings : np.ndarray
+            Vectors of shape (N, D)
+        top_k : int
+            Also return the k most likely classes per item when k > 1
+
+        Returns
+        -------
+        Dict containing:
+            labels       → (N,) predicted class labels
+            confidences  → (N,) model confidence in each prediction
+            top_k        → only when top_k > 1: {"labels": (N, k), "confidences": (N, k)},
+                           most likely first
+        """
+        y_proba = self._probabilities(embeddings)
+        classes = self.label_encoder.classes_
+        rows = np.arange(len(y_proba))[:, None]
+
+        k = min(max(top_k, 1), y_proba.shape[1])
+        if k == 1:
+            top = np.argmax(y_proba, axis=1)[:, None]
+        else:
+            top = np.argpartition(-y_proba, k - 1, axis=1)[:, :k]
+            top = np.take_along_axis(top, np.argsort(-y_proba[rows, top], axis=1), axis=1)
+        top_proba = y_proba[rows, top]
+
+        result = {
+            "labels": classes[top[:, 0]],
+            "confidences": top_proba[:, 0],
         }
+        if top_k > 1:
+            result["top_k"] = {"labels": classes[top], "confidences": top_proba}
+        return result
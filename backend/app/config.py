@@ -26,6 +26,15 @@ class Settings(BaseSettings):
     DB_PASSWORD: str
     DB_NAME:str
 
+    # Connection pool (per worker process). Keep max size * workers below
+    # the server's max_connections
+    DB_POOL_MIN_SIZE: int = 2
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_ACQUIRE_TIMEOUT: float = 10.0
+    DB_POOL_MAX_INACTIVE_LIFETIME: float = 300.0
+    # Prepared statements cached per connection (see database/queries.py)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
     # AWS
     AWS_REGION: str
     AWS_ACCESS_KEY_ID: str
@@ -35,6 +44,58 @@ class Settings(BaseSettings):
     S3_BUCKET_DOCUMENTS: str
     S3_BUCKET_IMAGES: str
 
+    # Presigned URLs are reused until this many seconds before they expire
+    PRESIGNED_URL_CACHE_SIZE: int = 10000
+    PRESIGNED_URL_CACHE_MARGIN_SECONDS: float = 600.0
+    # Retry a failed bucket region lookup after this long
+    S3_REGION_RETRY_SECONDS: float = 300.0
+
+    # /wardrobe/items page size (default and maximum limit)
+    WARDROBE_PAGE_SIZE: int = 100
+    WARDROBE_MAX_PAGE_SIZE: int = 500
+
+    # Max files accepted by the bulk endpoints (e.g. /predict/batch)
+    BATCH_MAX_FILES: int = 64
+
+    # Outfit generation
+    WARDROBE_CACHE_TTL_SECONDS: float = 300.0
+
+    # Embedding inference micro-batching
+    EMBEDDING_BATCH_MAX_SIZE: int = 16
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 10.0
+    EMBEDDING_QUEUE_MAX_SIZE: int = 256
+
+    # Load models in the background at startup ("/ready" turns 200 when done);
+    # when disabled they load on first use
+    MODEL_WARMUP: bool = True
+
+    # ResNet50 inference backend: eager, channels_last, torchscript, compile or int8.
+    # Non-eager backends fall back to eager if their embeddings' cosine
+    # similarity to fp32 on held-out calibration images drops below the minimum.
+    EMBEDDING_INFERENCE_BACKEND: str = "eager"
+    EMBEDDING_MIN_AGREEMENT: float = 0.99
+    # Real sample images for calibration and the agreement check; non-eager
+    # backends fall back to eager without at least 8 of them
+    EMBEDDING_CALIBRATION_DIR: str = ""
+    TORCH_INTRA_OP_THREADS: int = 0  # 0 keeps torch's default
+
+    # Content-hash embedding cache (empty dir disables the disk tier)
+    EMBEDDING_CACHE_SIZE: int = 1024
+    EMBEDDING_CACHE_DIR: str = ""
+
+    # Nearest-neighbour classification against the precomputed embeddings
+    REFERENCE_EMBEDDINGS_PATH: str = "ComputerVisionFiles/fashion_mnist_resnet50_embeddings.npy"
+    REFERENCE_LABELS_PATH: str = "ComputerVisionFiles/fashion_mnist_labels.npy"
+    REFERENCE_CLASSES_PATH: str = "ComputerVisionFiles/fashion_mnist_classes.txt"  # name per label index
+    REFERENCE_EMBEDDINGS_DTYPE: str = "float32"  # float32 or float16
+    CLASSIFY_KNN_K: int = 1
+
+    # Executor pools for blocking work called from async handlers
+    IO_EXECUTOR_WORKERS: int = 16
+    CPU_EXECUTOR_WORKERS: int = 4
+    INFERENCE_EXECUTOR_KIND: str = "thread"  # thread or process
+    INFERENCE_EXECUTOR_WORKERS: int = 1
+
     class Config:
         env_file = str(ENV_FILE_PATH)
         env_file_encoding = "utf-8"
@@ -1,5 +1,8 @@
+import time
+
 import asyncpg
 from backend.app.config import settings
+from backend.app.metrics import DB_POOL_ACQUIRE_TIME, DB_POOL_CONNECTIONS, DB_POOL_WAITING
 from pgvector.asyncpg import register_vector
 import logging
 
@@ -24,24 +27,51 @@ async def connect_to_db():
     try:
         _db_pool = await asyncpg.create_pool(
             dsn=settings.DATABASE_URL,
-            min_size=1,
-            max_size=5,
+            min_size=settings.DB_POOL_MIN_SIZE,
+            max_size=settings.DB_POOL_MAX_SIZE,
+            max_inactive_connection_lifetime=settings.DB_POOL_MAX_INACTIVE_LIFETIME,
+            statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
             timeout=10,
             init=_init_connection
         )
-        logger.info("PostgreSQL pool initialized successfully.")
+        logger.info(
+            f"PostgreSQL pool initialized successfully "
+            f"(min {settings.DB_POOL_MIN_SIZE}, max {settings.DB_POOL_MAX_SIZE} connections)."
+        )
     except Exception as e:
         logger.error(f"❌ Failed to initialize DB pool: {e}")
         raise
 
+    _record_pool_size()
     return _db_pool
 
 
+async def close_db():
+    """Close the pool (application shutdown)."""
+    global _db_pool
+
+    if _db_pool is not None:
+        pool, _db_pool = _db_pool, None
+        await pool.close()
+        DB_POOL_CONNECTIONS.labels(state="idle").set(0)
+        DB_POOL_CONNECTIONS.labels(state="in_use").set(0)
+
+
 async def _init_connection(conn):
-    """Registers pgvector for every fresh connection."""
+    """
+    Registers pgvector for every fresh connection. Runs once per physical
+    connection; the codec stays registered for the connection's lifetime.
+    """
     await register_vector(conn)
 
 
+def _record_pool_size():
+    if _db_pool is not None:
+        idle = _db_pool.get_idle_size()
+        DB_POOL_CONNECTIONS.labels(state="idle").set(idle)
+        DB_POOL_CONNECTIONS.labels(state="in_use").set(_db_pool.get_size() - idle)
+
+
 async def get_db():
     """
     FastAPI dependency.
@@ -51,6 +81,17 @@ async def get_db():
     if _db_pool is None:
         await connect_to_db()   # safety net, runs instantly after startup
 
-    async with _db_pool.acquire() as conn:
-        await register_vector(conn)  # safe no-op
+    start = time.perf_counter()
+    DB_POOL_WAITING.inc()
+    try:
+        conn = await _db_pool.acquire(timeout=settings.DB_POOL_ACQUIRE_TIMEOUT)
+    finally:
+        DB_POOL_WAITING.dec()
+    DB_POOL_ACQUIRE_TIME.observe(time.perf_counter() - start)
+    _record_pool_size()
+
+    try:
         yield conn
+    finally:
+        await _db_pool.release(conn)
+        _record_pool_size()
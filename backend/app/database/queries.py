@@ -0,0 +1,224 @@
+"""
+Data-access layer: every SQL statement the API sends, by name.
+
+asyncpg prepares each distinct query text once per pooled connection and
+reuses the server-side prepared statement from its per-connection cache
+(DB_STATEMENT_CACHE_SIZE entries) on later calls, so Postgres parses and
+plans a query once per connection instead of once per request. That only
+works if the text is stable, so statements are fixed constants here, and
+the two queries with optional clauses (list_wardrobe_items,
+update_saved_outfit) build their clauses in a fixed order, giving a small,
+bounded set of texts.
+
+Functions take the connection from get_db as their first argument and
+return asyncpg records (or the status string for writes).
+"""
+
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Wardrobe items
+
+INSERT_WARDROBE_ITEM_WITH_EMBEDDING = """
+    WITH item AS (
+        INSERT INTO wardrobe_items (image_url, category)
+        VALUES ($1, $2)
+        RETURNING item_id
+    ), embedding AS (
+        INSERT INTO embeddings (item_id, embedding)
+        SELECT item_id, $3::vector FROM item
+    )
+    SELECT item_id FROM item
+"""
+
+INSERT_WARDROBE_ITEMS = """
+    INSERT INTO wardrobe_items (image_url, category)
+    SELECT * FROM unnest($1::text[], $2::text[])
+    RETURNING item_id, image_url
+"""
+
+INSERT_EMBEDDING = """
+    INSERT INTO embeddings (item_id, embedding)
+    VALUES ($1, $2)
+"""
+
+SELECT_ALL_WARDROBE_ITEMS = """
+    SELECT item_id, image_url, category, metadata
+    FROM wardrobe_items
+"""
+
+UPDATE_WARDROBE_ITEM = """
+    UPDATE wardrobe_items
+    SET category = $1, metadata = $2
+    WHERE item_id = $3
+"""
+
+DELETE_EMBEDDING = "DELETE FROM embeddings WHERE item_id = $1"
+DELETE_WARDROBE_ITEM = "DELETE FROM wardrobe_items WHERE item_id = $1"
+DELETE_ALL_EMBEDDINGS = "DELETE FROM embeddings"
+DELETE_ALL_WARDROBE_ITEMS = "DELETE FROM wardrobe_items"
+
+# Saved outfits and ratings
+
+INSERT_SAVED_OUTFIT = """
+    INSERT INTO saved_outfits (outfit_id, items, occasion, season, name)
+    VALUES ($1, $2, $3, $4, $5)
+"""
+
+SELECT_SAVED_OUTFITS = """
+    SELECT outfit_id, items, occasion, season, name, created_at
+    FROM saved_outfits
+    ORDER BY created_at DESC
+"""
+
+DELETE_SAVED_OUTFIT = "DELETE FROM saved_outfits WHERE outfit_id = $1"
+
+# Columns update_saved_outfit may set, in the order they appear in the query
+SAVED_OUTFIT_COLUMNS = ("name", "occasion", "season", "items")
+
+INSERT_OUTFIT_RATING = """
+    INSERT INTO outfit_ratings (rating_id, outfit_id, rating, notes)
+    VALUES ($1, $2, $3, $4)
+"""
+
+SELECT_OUTFIT_RATINGS = """
+    SELECT rating_id, rating, notes, created_at
+    FROM outfit_ratings
+    WHERE outfit_id = $1
+    ORDER BY created_at DESC
+"""
+
+# Documents
+
+INSERT_DOCUMENT = """
+    INSERT INTO documents (document_id, s3_uri, metadata)
+    VALUES ($1, $2, $3::jsonb)
+"""
+
+
+async def insert_wardrobe_item_with_embedding(db, image_url: str, category: str, embedding) -> int:
+    """Insert an item and its embedding in one atomic round trip; returns item_id."""
+    return await db.fetchval(INSERT_WARDROBE_ITEM_WITH_EMBEDDING, image_url, category, embedding)
+
+
+async def insert_wardrobe_items(db, image_urls: List[str], categories: List[str]):
+    """Bulk-insert items; returns (item_id, image_url) records."""
+    return await db.fetch(INSERT_WARDROBE_ITEMS, image_urls, categories)
+
+
+async def insert_embeddings(db, rows: Sequence[Tuple[int, list]]):
+    """Bulk-insert (item_id, embedding) rows."""
+    await db.executemany(INSERT_EMBEDDING, rows)
+
+
+async def list_wardrobe_items(
+    db,
+    columns: Sequence[str],
+    limit: int,
+    after_item_id: Optional[int] = None,
+    category: Optional[str] = None,
+    metadata_contains: Optional[Dict] = None,
+    metadata_any: Optional[Dict[str, List[str]]] = None,
+):
+    """
+    Up to limit items with item_id < after_item_id, newest first. columns
+    must come from a fixed whitelist (they are interpolated). Metadata
+    filters are one JSONB containment test, which a GIN index can serve.
+    metadata_any keeps items whose metadata list under each key has at
+    least one of the given values.
+    """
+    conditions, args = [], []
+    if after_item_id is not None:
+        args.append(after_item_id)
+        conditions.append(f"item_id < ${len(args)}")
+    if category is not None:
+        args.append(category)
+        conditions.append(f"category = ${len(args)}")
+    if metadata_contains:
+        args.append(json.dumps(metadata_contains))
+        conditions.append(f"metadata @> ${len(args)}::jsonb")
+    for key, values in (metadata_any or {}).items():
+        args.extend([key, list(values)])
+        conditions.append(f"metadata -> ${len(args) - 1} ?| ${len(args)}::text[]")
+    args.append(limit)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return await db.fetch(
+        f"""
+        SELECT {', '.join(columns)}
+        FROM wardrobe_items
+        {where}
+        ORDER BY item_id DESC
+        LIMIT ${len(args)}
+        """,
+        *args,
+    )
+
+
+async def all_wardrobe_items(db):
+    return await db.fetch(SELECT_ALL_WARDROBE_ITEMS)
+
+
+async def update_wardrobe_item(db, item_id: int, category: str, metadata: Dict) -> str:
+    return await db.execute(UPDATE_WARDROBE_ITEM, category, json.dumps(metadata), item_id)
+
+
+async def delete_wardrobe_item(db, item_id: int) -> str:
+    # Delete embedding first (foreign key)
+    await db.execute(DELETE_EMBEDDING, item_id)
+    return await db.execute(DELETE_WARDROBE_ITEM, item_id)
+
+
+async def delete_all_wardrobe_items(db):
+    # Delete all embeddings first (foreign key constraint)
+    await db.execute(DELETE_ALL_EMBEDDINGS)
+    await db.execute(DELETE_ALL_WARDROBE_ITEMS)
+
+
+async def insert_saved_outfit(db, outfit_id: str, items: List[int], occasion: str, season: str, name: str):
+    await db.execute(INSERT_SAVED_OUTFIT, outfit_id, items, occasion, season, name)
+
+
+async def saved_outfits(db):
+    return await db.fetch(SELECT_SAVED_OUTFITS)
+
+
+async def delete_saved_outfit(db, outfit_id: str):
+    await db.execute(DELETE_SAVED_OUTFIT, outfit_id)
+
+
+async def update_saved_outfit(db, outfit_id: str, **values) -> bool:
+    """
+    Set the given SAVED_OUTFIT_COLUMNS (None values are skipped).
+    Returns False when there was nothing to update.
+    """
+    unknown = set(values) - set(SAVED_OUTFIT_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown saved outfit columns: {sorted(unknown)}")
+
+    updates, args = [], []
+    for column in SAVED_OUTFIT_COLUMNS:
+        if values.get(column) is not None:
+            args.append(values[column])
+            updates.append(f"{column} = ${len(args)}")
+    if not updates:
+        return False
+
+    # outfit_id is the last parameter
+    args.append(outfit_id)
+    await db.execute(
+        f"UPDATE saved_outfits SET {', '.join(updates)} WHERE outfit_id = ${len(args)}", *args
+    )
+    return True
+
+
+async def insert_outfit_rating(db, rating_id: str, outfit_id: str, rating: int, notes: Optional[str]):
+    await db.execute(INSERT_OUTFIT_RATING, rating_id, outfit_id, rating, notes)
+
+
+async def outfit_ratings(db, outfit_id: str):
+    return await db.fetch(SELECT_OUTFIT_RATINGS, outfit_id)
+
+
+async def insert_document(db, document_id: str, s3_uri: str, metadata: Dict):
+    await db.execute(INSERT_DOCUMENT, document_id, s3_uri, json.dumps(metadata))
@@ -1,8 +1,42 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 # from prometheus_fastapi_instrumentator import Instrumentator
 from backend.app.api.endpoints import router as api_router
+from backend.app.config import settings
+from backend.app.database.connection import close_db
+from backend.app.services.embedding_service import (
+    get_classification_engine,
+    get_reference_index,
+    embedding_batcher,
+    warm_up_embedding_model,
+)
+from backend.app.services.executors import run_cpu, run_inference, shutdown_executors
+from backend.app.services.warmup import ModelWarmup
+
+
+# Each step loads on the pool that later uses it (with a process inference
+# pool, the embedding model is warmed inside a worker)
+warmup = ModelWarmup({
+    "embedding_model": lambda: run_inference(warm_up_embedding_model),
+    "reference_index": lambda: run_cpu(get_reference_index),
+    "classification_engine": lambda: run_cpu(get_classification_engine),
+})
+
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.MODEL_WARMUP:
+        warmup.start()
+    yield
+    await warmup.stop()
+    await embedding_batcher.close()
+    shutdown_executors(wait=False)
+    await close_db()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Set up Prometheus metrics
 # Instrumentator().instrument(app).expose(app)
@@ -14,3 +48,14 @@ app.include_router(api_router)
 @app.get("/")
 def root():
     return {"status": "ok", "message": "Backend is running"}
+
+
+@app.get("/ready")
+def ready():
+    """Readiness probe: 503 until every model has been loaded."""
+    body = {
+        "status": "ready" if warmup.ready else "loading",
+        "components": warmup.status,
+        "errors": warmup.errors,
+    }
+    return JSONResponse(body, status_code=200 if warmup.ready else 503)
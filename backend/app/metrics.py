@@ -1,21 +1,111 @@
 """
 Custom Prometheus metrics for ML inference, AWS operations, etc.
 """
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 # ML Inference metrics
 ML_INFERENCE_TIME = Histogram(
     "ml_inference_seconds",
     "Time spent on ML inference operations",
-    ["operation"],  # embedding, classification, recommendation
+    ["operation"],  # embedding, classification, bulk_classification, recommendation
     buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
 )
 
+# Embedding cache metrics (hit ratio = hits / all lookups)
+EMBEDDING_CACHE_LOOKUPS = Counter(
+    "embedding_cache_lookups_total",
+    "Content-hash embedding cache lookups",
+    ["result"]  # memory_hit, disk_hit, miss
+)
+
+# Embedding micro-batching metrics
+WARDROBE_UPLOAD_STEP_TIME = Histogram(
+    "wardrobe_upload_step_seconds",
+    "Time spent in each step of a wardrobe upload",
+    ["endpoint", "step"],  # endpoint: single, batch; step: read, decode, s3_upload, embedding,
+                           # s3_upload_and_embedding (batch), db_insert, total
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+)
+
+EMBEDDING_BATCH_SIZE = Histogram(
+    "embedding_batch_size",
+    "Images per batched embedding forward pass",
+    buckets=[1, 2, 4, 8, 16, 32, 64]
+)
+
+EMBEDDING_BATCH_WAIT_TIME = Histogram(
+    "embedding_batch_wait_seconds",
+    "Time an embedding request waits in the queue before its batch runs",
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+)
+
+EMBEDDING_QUEUE_DEPTH = Gauge(
+    "embedding_queue_depth",
+    "Embedding requests waiting to be batched"
+)
+
+MODEL_WARMUP_TIME = Gauge(
+    "model_warmup_seconds",
+    "Time the startup warm-up took to load each component",
+    ["component"]  # embedding_model, reference_index, classification_engine
+)
+
+EMBEDDING_MODEL_AGREEMENT = Gauge(
+    "embedding_model_agreement",
+    "Minimum cosine similarity of an inference backend's embeddings vs fp32 eager",
+    ["backend"]  # channels_last, torchscript, compile, int8
+)
+
+# Executor pool saturation metrics
+EXECUTOR_TASKS_IN_FLIGHT = Gauge(
+    "executor_tasks_in_flight",
+    "Tasks submitted to an executor pool and not yet finished",
+    ["pool"]  # io, inference, cpu
+)
+
+EXECUTOR_WORKERS = Gauge(
+    "executor_workers",
+    "Worker count of each executor pool",
+    ["pool"]
+)
+
+EXECUTOR_QUEUE_WAIT = Histogram(
+    "executor_queue_wait_seconds",
+    "Time a task waits for a free executor worker",
+    ["pool"],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+)
+
+# Database pool metrics
+DB_POOL_ACQUIRE_TIME = Histogram(
+    "db_pool_acquire_seconds",
+    "Time a request waits to acquire a pooled database connection",
+    buckets=[0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+)
+
+DB_POOL_WAITING = Gauge(
+    "db_pool_waiting_requests",
+    "Requests currently waiting for a database connection"
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Open database pool connections",
+    ["state"]  # idle, in_use
+)
+
+# Wardrobe snapshot cache metrics
+WARDROBE_CACHE_LOOKUPS = Counter(
+    "wardrobe_cache_lookups_total",
+    "Wardrobe snapshot lookups for outfit generation",
+    ["result"]  # hit, miss
+)
+
 # AWS S3 metrics
 AWS_S3_CALLS = Counter(
     "aws_s3_calls_total",
     "Total number of AWS S3 API calls",
-    ["operation"]  # upload, get_presigned_url
+    ["operation"]  # upload, delete, get_presigned_url, get_bucket_location
 )
 
 AWS_S3_BYTES = Counter(
@@ -24,6 +114,12 @@ AWS_S3_BYTES = Counter(
     ["direction"]  # upload, download
 )
 
+PRESIGNED_URL_CACHE_LOOKUPS = Counter(
+    "presigned_url_cache_lookups_total",
+    "Presigned URL cache lookups",
+    ["result"]  # hit, miss
+)
+
 AWS_S3_TIME = Histogram(
     "aws_s3_operation_seconds",
     "Time spent on S3 operations",
@@ -17,8 +17,7 @@ ENGINE_PATH = "RecommendationFiles/recommendation_engine.pkl"
 print(f"Loading engine from: {ENGINE_PATH}")
 engine = FashionRecommendationEngine.load(ENGINE_PATH)
 
-embeddings = engine.reduced_embeddings
-n_items = embeddings.shape[0]
+n_items = engine.n_samples
 
 print(f"Engine loaded with {n_items} items.")
 
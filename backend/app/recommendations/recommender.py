@@ -1,160 +1,150 @@
+import os
 import time
 import numpy as np
 import logging
-from typing import List, Dict, Set
-from RecommendationFiles.recommendation_engine import FashionRecommendationEngine
+from functools import cached_property
+from typing import List, Dict, Optional, Set
 from backend.app.metrics import ML_INFERENCE_TIME
+from backend.app.services.executors import run_cpu
+from backend.app.recommendations.snapshot import CategoryPartition, SLOTS, wardrobe_cache
 
 logger = logging.getLogger(__name__)
 
 
+class CandidateMatrix:
+    """
+    Candidates for one outfit slot (bottom, shoes, ...) stacked into a single
+    float64 matrix with precomputed norms, so a slot is filled with one mat-vec
+    product instead of a per-item loop. Scores use the per-item scan's formula
+    (including its 1e-8 epsilon), so thresholds and ties pick the same items.
+    """
+
+    def __init__(self, item_ids: List[int], embeddings: np.ndarray, norms: Optional[np.ndarray] = None):
+        self.item_ids = list(item_ids)
+        self.id_array = np.asarray(self.item_ids)
+        self.embeddings = np.asarray(embeddings, dtype=np.float64)
+        self.norms = np.linalg.norm(self.embeddings, axis=1) if norms is None else norms
+        self.used: Set[int] = set()
+        self.used_mask = np.zeros(len(self.item_ids), dtype=bool)
+
+    @classmethod
+    def from_partition(cls, partition: CategoryPartition, item_ids: List[int]):
+        """Rows of a snapshot partition for the given (filtered) items, in order."""
+        rows = [partition.positions[item_id] for item_id in item_ids]
+        return cls(item_ids, partition.embeddings[rows], partition.norms[rows])
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def __bool__(self) -> bool:
+        return bool(self.item_ids)
+
+    def mark_used(self, item_id: int):
+        """Track an item for variety so later outfits prefer other items."""
+        self.used.add(item_id)
+        self.used_mask |= self.id_array == item_id
+
+    def similarities(self, outfit_emb: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every candidate against the outfit embedding."""
+        query = np.asarray(outfit_emb, dtype=np.float64)
+        if not self.item_ids:
+            return np.zeros(0)
+        return (self.embeddings @ query) / (self.norms * np.linalg.norm(query) + 1e-8)
+
+    def best_match(self, outfit_emb: np.ndarray, threshold: float) -> tuple:
+        """
+        Find best matching item that hasn't been used yet.
+        Falls back to reusing items once every candidate has been used.
+        Ties resolve to the earliest candidate, like a first-wins scan.
+        """
+        if not self.item_ids:
+            return None, 0
+
+        sims = self.similarities(outfit_emb)
+        # A match must beat the initial best score of 0 and clear the threshold
+        eligible = (sims > 0) & (sims >= threshold)
+
+        candidates = eligible & ~self.used_mask
+        if not candidates.any() and len(self.used) >= len(self.item_ids):
+            # All items used: allow reuse for variety in later outfits
+            candidates = eligible
+
+        if not candidates.any():
+            return None, 0
+
+        pos = int(np.argmax(np.where(candidates, sims, -np.inf)))
+        return self.item_ids[pos], float(sims[pos])
+
+
 class OutfitRecommender:
     def __init__(
         self,
         engine_pkl_path: str = "RecommendationFiles/recommendation_engine.pkl",
+        cache=None,
     ):
-        # Load FAISS index + embeddings from the pre-trained recommendation engine
-        self.engine = FashionRecommendationEngine.load(engine_pkl_path)
-        logger.info(f"Loaded recommendation engine from {engine_pkl_path}")
+        self.engine_pkl_path = engine_pkl_path
+        # Per-process wardrobe snapshot, patched by the wardrobe endpoints
+        self.wardrobe_cache = cache if cache is not None else wardrobe_cache
+
+    @cached_property
+    def engine(self):
+        """
+        The pre-trained recommendation engine (FAISS index + embeddings),
+        loaded on first access (startup warm-up) rather than at import.
+        Prefers the memory-mapped artifact directory saved next to the pickle
+        (e.g. RecommendationFiles/recommendation_engine/), which loads without
+        unpickling and shares pages between workers.
+        """
+        from RecommendationFiles.recommendation_engine import FashionRecommendationEngine
+
+        artifact_dir = os.path.splitext(self.engine_pkl_path)[0]
+        engine_path = artifact_dir if os.path.isdir(artifact_dir) else self.engine_pkl_path
+        engine = FashionRecommendationEngine.load(engine_path)
+        logger.info(f"Loaded recommendation engine from {engine_path}")
+        return engine
 
     async def recommend_outfits(self, occasion: str, season: str, db, k: int = 10):
         """
-        Build outfit recommendations using the ML recommendation engine.
-        Uses embeddings to find visually compatible items.
+        Build outfit recommendations from wardrobe item embeddings.
+        Uses embedding similarity to find visually compatible items.
         """
         start_time = time.time()
-        # Get all wardrobe items WITH their embeddings
-        wardrobe = await db.fetch(
-            """
-            SELECT w.item_id, w.category, w.metadata, e.embedding
-            FROM wardrobe_items w
-            INNER JOIN embeddings e ON e.item_id = w.item_id
-            """
-        )
-        
-        logger.info(f"[RECOMMENDER] Found {len(wardrobe) if wardrobe else 0} items with embeddings")
+        # Get all wardrobe items WITH their embeddings (cached per process)
+        snapshot = await self.wardrobe_cache.get(db)
+        wardrobe = snapshot.items
+
+        logger.info(f"[RECOMMENDER] Found {len(wardrobe)} items with embeddings")
 
         if not wardrobe:
             logger.warning("[RECOMMENDER] No wardrobe items with embeddings found!")
             ML_INFERENCE_TIME.labels(operation="recommendation").observe(time.time() - start_time)
             return []
 
-        def extract_list(meta, key):
-            if not meta:
-                return []
-            if isinstance(meta, str):
-                try:
-                    import json
-                    meta = json.loads(meta)
-                except:
-                    return []
-            v = meta.get(key, [])
-            if isinstance(v, str):
-                return [v.lower().strip()]
-            return [x.lower().strip() for x in v] if v else []
-
-        def is_any_occasion(occasions: List[str]) -> bool:
-            """Check if item can be used for any occasion"""
-            for occ in occasions:
-                if "any" in occ and "occasion" in occ:
-                    return True
-            return False
-        
-        def is_all_season(seasons: List[str]) -> bool:
-            """Check if item can be used for any season"""
-            for s in seasons:
-                # Match "all-season", "all season", "all seasons", "any season"
-                if ("all" in s or "any" in s) and "season" in s:
-                    return True
-            return False
-
-        # Filter items by occasion and season
-        filtered = []
-        for row in wardrobe:
-            meta = row["metadata"]
-            item_occasions = extract_list(meta, "occasions")
-            item_seasons = extract_list(meta, "season")
-            
-            # Log what we're checking
-            logger.debug(f"[RECOMMENDER] Item {row['item_id']}: occasions={item_occasions}, seasons={item_seasons}")
-
-            # Item matches if:
-            # 1. Selected occasion matches item's occasions, OR
-            # 2. Item is marked "any occasion", OR
-            # 3. Item has no occasions set (flexible)
-            occasion_match = (
-                occasion.lower() in item_occasions or 
-                is_any_occasion(item_occasions) or
-                not item_occasions
-            )
-            
-            # Same logic for seasons
-            season_match = (
-                season.lower() in item_seasons or 
-                is_all_season(item_seasons) or
-                not item_seasons
-            )
-
-            if occasion_match and season_match:
-                filtered.append(row)
-                logger.debug(f"[RECOMMENDER] ✓ Item {row['item_id']} passed filter")
-            else:
-                logger.debug(f"[RECOMMENDER] ✗ Item {row['item_id']} filtered out (occasion_match={occasion_match}, season_match={season_match})")
+        # Filter items by occasion and season with the snapshot's inverted index
+        filtered = [wardrobe[item_id] for item_id in snapshot.filter(occasion, season)]
 
         logger.info(f"[RECOMMENDER] After occasion/season filter: {len(filtered)} items")
         
         # If no items match filter, use all items
         if not filtered:
             logger.info("[RECOMMENDER] No items match filter, using all items")
-            filtered = list(wardrobe)
+            filtered = list(wardrobe.values())
 
         # Separate items by category
-        tops, bottoms, shoes, dresses, accessories, outerwear = [], [], [], [], [], []
-        item_embeddings = {}
-        
-        # Similarity thresholds - only add if item ACTUALLY matches
-        # Lower than before but still filters bad matches
-        MIN_SIMILARITY_SHOES = 0.30
-        MIN_SIMILARITY_OUTERWEAR = 0.30
-        MIN_SIMILARITY_ACCESSORIES = 0.30
-        
-        for row in filtered:
-            item_id = row["item_id"]
-            cat = (row["category"] or "").lower()
-            embedding = row["embedding"]
-            
-            if embedding is not None:
-                item_embeddings[item_id] = {
-                    "embedding": np.array(embedding),
-                    "category": cat,
-                    "row": row
-                }
-                
-                if cat in ["top", "tops"]:
-                    tops.append(item_id)
-                elif cat in ["bottom", "bottoms"]:
-                    bottoms.append(item_id)
-                elif cat in ["shoe", "shoes"]:
-                    shoes.append(item_id)
-                elif cat in ["dress", "dresses"]:
-                    dresses.append(item_id)
-                elif cat in ["outerwear"]:
-                    outerwear.append(item_id)
-                elif cat in ["accessory", "accessories"]:
-                    accessories.append(item_id)
+        by_slot: Dict[str, List[int]] = {slot: [] for slot in SLOTS}
+        for item in filtered:
+            if item.embedding is not None and item.slot is not None:
+                by_slot[item.slot].append(item.item_id)
 
+        tops, bottoms, shoes = by_slot["top"], by_slot["bottom"], by_slot["shoes"]
+        dresses, outerwear, accessories = by_slot["dress"], by_slot["outerwear"], by_slot["accessory"]
+        item_embeddings = {item_id: wardrobe[item_id].embedding for ids in by_slot.values() for item_id in ids}
+        
         logger.info(f"[RECOMMENDER] Categories - tops:{len(tops)}, bottoms:{len(bottoms)}, shoes:{len(shoes)}, dresses:{len(dresses)}, outerwear:{len(outerwear)}, accessories:{len(accessories)}")
         
         # Debug: Show which items are in each category
         for item_id in bottoms:
-            meta = item_embeddings[item_id]["row"]["metadata"]
-            if isinstance(meta, str):
-                import json
-                try:
-                    meta = json.loads(meta)
-                except:
-                    meta = {}
-            subcategory = meta.get("subcategory", "unknown") if meta else "unknown"
+            subcategory = wardrobe[item_id].metadata.get("subcategory", "unknown")
             logger.info(f"[RECOMMENDER] Bottom item {item_id}: {subcategory}")
 
         if not tops and not bottoms and not dresses:
@@ -162,121 +152,119 @@ class OutfitRecommender:
             ML_INFERENCE_TIME.labels(operation="recommendation").observe(time.time() - start_time)
             return []
 
-        outfits = []
-        
-        # Track used items for VARIETY - don't repeat same items across outfits
-        used_bottoms: Set[int] = set()
-        used_shoes: Set[int] = set()
-        used_outerwear: Set[int] = set()
-        used_accessories: Set[int] = set()
-        
+        # Slice each slot's candidates out of the snapshot's pre-normalized
+        # category matrices. Each matrix also tracks used items for VARIETY -
+        # don't repeat same items across outfits
+        bottom_matrix = CandidateMatrix.from_partition(snapshot.partition("bottom"), bottoms)
+        shoe_matrix = CandidateMatrix.from_partition(snapshot.partition("shoes"), shoes)
+        outerwear_matrix = CandidateMatrix.from_partition(snapshot.partition("outerwear"), outerwear)
+        accessory_matrix = CandidateMatrix.from_partition(snapshot.partition("accessory"), accessories)
+
         # Log available bottoms for debugging
         logger.info(f"[RECOMMENDER] Available bottoms: {bottoms}")
-        
-        def find_best_match(candidate_ids: List[int], outfit_emb: np.ndarray, 
-                           used_set: Set[int], threshold: float) -> tuple:
-            """Find best matching item that hasn't been used yet"""
-            best_id = None
-            best_score = 0
-            
-            # First try to find unused items
-            for item_id in candidate_ids:
-                if item_id in used_set:
-                    continue
-                item_emb = item_embeddings[item_id]["embedding"]
-                similarity = np.dot(outfit_emb, item_emb) / (
-                    np.linalg.norm(outfit_emb) * np.linalg.norm(item_emb) + 1e-8
-                )
-                if similarity > best_score and similarity >= threshold:
-                    best_score = similarity
-                    best_id = item_id
-            
-            # If all items used but we have items, allow reuse for variety in later outfits
-            if best_id is None and len(used_set) >= len(candidate_ids) and candidate_ids:
-                for item_id in candidate_ids:
-                    item_emb = item_embeddings[item_id]["embedding"]
-                    similarity = np.dot(outfit_emb, item_emb) / (
-                        np.linalg.norm(outfit_emb) * np.linalg.norm(item_emb) + 1e-8
-                    )
-                    if similarity > best_score and similarity >= threshold:
-                        best_score = similarity
-                        best_id = item_id
-            
-            return best_id, best_score
-        
-        # Use the recommendation engine to find compatible items
+
+        # Similarity scoring runs on the cpu pool so it doesn't stall the event loop
+        outfits = await run_cpu(
+            self._match_outfits, by_slot, item_embeddings,
+            bottom_matrix, shoe_matrix, outerwear_matrix, accessory_matrix, k
+        )
+        logger.info(f"[RECOMMENDER] Returning {len(outfits)} outfits")
+
+        ML_INFERENCE_TIME.labels(operation="recommendation").observe(time.time() - start_time)
+        return outfits
+
+    def _match_outfits(
+        self,
+        by_slot: Dict[str, List[int]],
+        item_embeddings: Dict[int, np.ndarray],
+        bottom_matrix: CandidateMatrix,
+        shoe_matrix: CandidateMatrix,
+        outerwear_matrix: CandidateMatrix,
+        accessory_matrix: CandidateMatrix,
+        k: int,
+    ) -> List[Dict]:
+        """
+        Pair tops with bottoms (or start from dresses), then add the best
+        matching shoes, outerwear and accessories. Returns the top k outfits.
+        """
+        tops, bottoms, shoes = by_slot["top"], by_slot["bottom"], by_slot["shoes"]
+        dresses, outerwear, accessories = by_slot["dress"], by_slot["outerwear"], by_slot["accessory"]
+
+        # Similarity thresholds - only add if item ACTUALLY matches
+        # Lower than before but still filters bad matches
+        MIN_SIMILARITY_SHOES = 0.30
+        MIN_SIMILARITY_OUTERWEAR = 0.30
+        MIN_SIMILARITY_ACCESSORIES = 0.30
+
+        outfits = []
+
+        # Match wardrobe items against each other by embedding similarity.
+        # The engine's FAISS index covers the Fashion-MNIST catalog, whose ids
+        # don't map onto wardrobe items, so it is not queried here
         if tops and bottoms:
             for top_id in tops[:5]:
-                top_emb = item_embeddings[top_id]["embedding"]
+                top_emb = item_embeddings[top_id]
                 
                 try:
-                    recommendations = self.engine.recommend(
-                        query_embedding=top_emb,
-                        k=20
-                    )
-                    
                     # Find best matching bottom WITH VARIETY - prefer unused bottoms
-                    best_bottom, best_score = find_best_match(
-                        bottoms, top_emb, used_bottoms, threshold=0.0  # No threshold for bottoms, always pick one
+                    best_bottom, best_score = bottom_matrix.best_match(
+                        top_emb, threshold=0.0  # No threshold for bottoms, always pick one
                     )
                     
                     # If no unused bottom found, allow reuse
                     if best_bottom is None and bottoms:
                         best_bottom = bottoms[0]
-                        bottom_emb = item_embeddings[best_bottom]["embedding"]
-                        best_score = np.dot(top_emb, bottom_emb) / (
-                            np.linalg.norm(top_emb) * np.linalg.norm(bottom_emb) + 1e-8
-                        )
+                        best_score = float(bottom_matrix.similarities(top_emb)[0])
                     
-                    logger.info(f"[RECOMMENDER] Top {top_id} paired with bottom {best_bottom} (score: {best_score:.2f}, used_bottoms: {used_bottoms})")
+                    logger.info(f"[RECOMMENDER] Top {top_id} paired with bottom {best_bottom} (score: {best_score:.2f}, used_bottoms: {bottom_matrix.used})")
                     
                     if best_bottom:
                         outfit_items = [top_id, best_bottom]
-                        outfit_emb = (top_emb + item_embeddings[best_bottom]["embedding"]) / 2
+                        outfit_emb = (top_emb + item_embeddings[best_bottom]) / 2
                         total_score = best_score
                         num_matches = 2
-                        used_bottoms.add(best_bottom)  # Track for variety
+                        bottom_matrix.mark_used(best_bottom)  # Track for variety
                         
                         # Add shoes if available AND matches well AND not already overused
                         if shoes:
-                            shoe_id, shoe_score = find_best_match(
-                                shoes, outfit_emb, used_shoes, MIN_SIMILARITY_SHOES
+                            shoe_id, shoe_score = shoe_matrix.best_match(
+                                outfit_emb, MIN_SIMILARITY_SHOES
                             )
                             if shoe_id:
                                 outfit_items.append(shoe_id)
-                                outfit_emb = (outfit_emb + item_embeddings[shoe_id]["embedding"]) / 2
+                                outfit_emb = (outfit_emb + item_embeddings[shoe_id]) / 2
                                 total_score += shoe_score
                                 num_matches += 1
-                                used_shoes.add(shoe_id)
+                                shoe_matrix.mark_used(shoe_id)
                                 logger.info(f"[RECOMMENDER] ✓ Added shoe {shoe_id} (score: {shoe_score:.2f})")
                             else:
                                 logger.info(f"[RECOMMENDER] ✗ No shoe matched threshold {MIN_SIMILARITY_SHOES}")
                         
                         # Add outerwear if available AND matches well
                         if outerwear:
-                            outer_id, outer_score = find_best_match(
-                                outerwear, outfit_emb, used_outerwear, MIN_SIMILARITY_OUTERWEAR
+                            outer_id, outer_score = outerwear_matrix.best_match(
+                                outfit_emb, MIN_SIMILARITY_OUTERWEAR
                             )
                             if outer_id:
                                 outfit_items.append(outer_id)
-                                outfit_emb = (outfit_emb + item_embeddings[outer_id]["embedding"]) / 2
+                                outfit_emb = (outfit_emb + item_embeddings[outer_id]) / 2
                                 total_score += outer_score
                                 num_matches += 1
-                                used_outerwear.add(outer_id)
+                                outerwear_matrix.mark_used(outer_id)
                                 logger.info(f"[RECOMMENDER] ✓ Added outerwear {outer_id} (score: {outer_score:.2f})")
                             else:
                                 logger.info(f"[RECOMMENDER] ✗ No outerwear matched threshold {MIN_SIMILARITY_OUTERWEAR}")
                         
                         # Add accessories if available AND matches well
                         if accessories:
-                            acc_id, acc_score = find_best_match(
-                                accessories, outfit_emb, used_accessories, MIN_SIMILARITY_ACCESSORIES
+                            acc_id, acc_score = accessory_matrix.best_match(
+                                outfit_emb, MIN_SIMILARITY_ACCESSORIES
                             )
                             if acc_id:
                                 outfit_items.append(acc_id)
                                 total_score += acc_score
                                 num_matches += 1
-                                used_accessories.add(acc_id)
+                                accessory_matrix.mark_used(acc_id)
                                 logger.info(f"[RECOMMENDER] ✓ Added accessory {acc_id} (score: {acc_score:.2f})")
                             else:
                                 logger.info(f"[RECOMMENDER] ✗ No accessory matched threshold {MIN_SIMILARITY_ACCESSORIES}")
@@ -293,7 +281,7 @@ class OutfitRecommender:
                         })
                         
                 except Exception as e:
-                    logger.error(f"[RECOMMENDER] Engine error: {e}")
+                    logger.error(f"[RECOMMENDER] Matching error: {e}")
                     outfit_items = [top_id, bottoms[0] if bottoms else None]
                     outfit_items = [x for x in outfit_items if x]
                     if outfit_items:
@@ -302,7 +290,7 @@ class OutfitRecommender:
         # Handle dresses (they don't need bottoms)
         elif dresses:
             for dress_id in dresses[:5]:
-                dress_emb = item_embeddings[dress_id]["embedding"]
+                dress_emb = item_embeddings[dress_id]
                 outfit_items = [dress_id]
                 outfit_emb = dress_emb.copy()
                 total_score = 1.0
@@ -310,38 +298,38 @@ class OutfitRecommender:
                 
                 # Add shoes if matches
                 if shoes:
-                    shoe_id, shoe_score = find_best_match(
-                        shoes, outfit_emb, used_shoes, MIN_SIMILARITY_SHOES
+                    shoe_id, shoe_score = shoe_matrix.best_match(
+                        outfit_emb, MIN_SIMILARITY_SHOES
                     )
                     if shoe_id:
                         outfit_items.append(shoe_id)
-                        outfit_emb = (outfit_emb + item_embeddings[shoe_id]["embedding"]) / 2
+                        outfit_emb = (outfit_emb + item_embeddings[shoe_id]) / 2
                         total_score += shoe_score
                         num_matches += 1
-                        used_shoes.add(shoe_id)
+                        shoe_matrix.mark_used(shoe_id)
                 
                 # Add outerwear if matches
                 if outerwear:
-                    outer_id, outer_score = find_best_match(
-                        outerwear, outfit_emb, used_outerwear, MIN_SIMILARITY_OUTERWEAR
+                    outer_id, outer_score = outerwear_matrix.best_match(
+                        outfit_emb, MIN_SIMILARITY_OUTERWEAR
                     )
                     if outer_id:
                         outfit_items.append(outer_id)
-                        outfit_emb = (outfit_emb + item_embeddings[outer_id]["embedding"]) / 2
+                        outfit_emb = (outfit_emb + item_embeddings[outer_id]) / 2
                         total_score += outer_score
                         num_matches += 1
-                        used_outerwear.add(outer_id)
+                        outerwear_matrix.mark_used(outer_id)
                 
                 # Add accessories if matches
                 if accessories:
-                    acc_id, acc_score = find_best_match(
-                        accessories, outfit_emb, used_accessories, MIN_SIMILARITY_ACCESSORIES
+                    acc_id, acc_score = accessory_matrix.best_match(
+                        outfit_emb, MIN_SIMILARITY_ACCESSORIES
                     )
                     if acc_id:
                         outfit_items.append(acc_id)
                         total_score += acc_score
                         num_matches += 1
-                        used_accessories.add(acc_id)
+                        accessory_matrix.mark_used(acc_id)
                 
                 avg_score = total_score / num_matches
                 
@@ -373,7 +361,4 @@ class OutfitRecommender:
 
         # Sort by score and return top k
         outfits.sort(key=lambda x: x["score"], reverse=True)
-        logger.info(f"[RECOMMENDER] Returning {min(len(outfits), k)} outfits")
-
-        ML_INFERENCE_TIME.labels(operation="recommendation").observe(time.time() - start_time)
         return outfits[:k]
@@ -0,0 +1,285 @@
+"""
+In-process wardrobe snapshot for outfit generation.
+
+Holds every wardrobe item with an embedding, its pre-parsed occasion/season
+lists, an occasion/season inverted index and category-partitioned embedding
+matrices, so repeated /outfits/generate calls skip the DB scan, per-row JSON
+parsing and per-item filtering. Wardrobe endpoints patch the snapshot in
+place when they change data.
+"""
+
+import json
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+import numpy as np
+
+from backend.app.config import settings
+from backend.app.metrics import WARDROBE_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+# Outfit slots and the category spellings that map onto them
+CATEGORY_SLOTS = {
+    "top": "top", "tops": "top",
+    "bottom": "bottom", "bottoms": "bottom",
+    "shoe": "shoes", "shoes": "shoes",
+    "dress": "dress", "dresses": "dress",
+    "outerwear": "outerwear",
+    "accessory": "accessory", "accessories": "accessory",
+}
+SLOTS = ["top", "bottom", "shoes", "dress", "outerwear", "accessory"]
+
+
+def parse_metadata(meta) -> Dict:
+    """Metadata might be None, a dict, or a JSON string."""
+    if not meta:
+        return {}
+    if isinstance(meta, str):
+        try:
+            meta = json.loads(meta)
+        except ValueError:
+            return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def extract_list(meta: Dict, key: str) -> List[str]:
+    """Lowercased, stripped values of a metadata list (or single string) field."""
+    v = meta.get(key, [])
+    if isinstance(v, str):
+        return [v.lower().strip()]
+    return [x.lower().strip() for x in v] if v else []
+
+
+def is_any_occasion(occasions: List[str]) -> bool:
+    """Check if item can be used for any occasion"""
+    for occ in occasions:
+        if "any" in occ and "occasion" in occ:
+            return True
+    return False
+
+
+def is_all_season(seasons: List[str]) -> bool:
+    """Check if item can be used for any season"""
+    for s in seasons:
+        # Match "all-season", "all season", "all seasons", "any season"
+        if ("all" in s or "any" in s) and "season" in s:
+            return True
+    return False
+
+
+class WardrobeItem:
+    """One wardrobe item with its metadata parsed once."""
+
+    def __init__(self, item_id: int, category: Optional[str], metadata, embedding):
+        self.item_id = item_id
+        self.category = (category or "").lower()
+        self.slot = CATEGORY_SLOTS.get(self.category)
+        self.metadata = parse_metadata(metadata)
+        self.occasions = extract_list(self.metadata, "occasions")
+        self.seasons = extract_list(self.metadata, "season")
+        self.embedding = (
+            np.asarray(embedding, dtype=np.float32) if embedding is not None else None
+        )
+
+
+class AttributeIndex:
+    """
+    Inverted index from normalized tokens (occasions or seasons) to item ids.
+
+    Items marked with the wildcard ("any occasion", "all season") or with no
+    values at all match every query, so they live in a single wildcard set.
+    """
+
+    def __init__(self, is_wildcard: Callable[[List[str]], bool]):
+        self.is_wildcard = is_wildcard
+        self.postings: Dict[str, Set[int]] = {}
+        self.wildcard: Set[int] = set()
+
+    def add(self, item_id: int, tokens: List[str]):
+        if not tokens or self.is_wildcard(tokens):
+            self.wildcard.add(item_id)
+        for token in tokens:
+            self.postings.setdefault(token, set()).add(item_id)
+
+    def remove(self, item_id: int, tokens: List[str]):
+        self.wildcard.discard(item_id)
+        for token in tokens:
+            ids = self.postings.get(token)
+            if ids is not None:
+                ids.discard(item_id)
+                if not ids:
+                    del self.postings[token]
+
+    def lookup(self, token: str) -> Set[int]:
+        """Items whose values contain ``token`` exactly, plus wildcard items."""
+        return self.postings.get(token, set()) | self.wildcard
+
+
+class CategoryPartition:
+    """Embeddings (float64) and their L2 norms for every item in one slot."""
+
+    def __init__(self, items: List[WardrobeItem]):
+        self.item_ids = [item.item_id for item in items]
+        self.positions = {item_id: pos for pos, item_id in enumerate(self.item_ids)}
+        if items:
+            self.embeddings = np.vstack([item.embedding for item in items]).astype(np.float64)
+        else:
+            self.embeddings = np.zeros((0, 0), dtype=np.float64)
+        self.norms = np.linalg.norm(self.embeddings, axis=1)
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+
+class WardrobeSnapshot:
+    """All wardrobe items with embeddings, keyed by item_id in ascending order."""
+
+    def __init__(self, items: List[WardrobeItem]):
+        self.items: Dict[int, WardrobeItem] = {
+            item.item_id: item for item in sorted(items, key=lambda item: item.item_id)
+        }
+        self.loaded_at = time.time()
+        self._partitions: Dict[str, CategoryPartition] = {}
+        self.occasion_index = AttributeIndex(is_any_occasion)
+        self.season_index = AttributeIndex(is_all_season)
+        for item in self.items.values():
+            self._index(item)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def partition(self, slot: str) -> CategoryPartition:
+        """Category matrix for a slot, rebuilt lazily after writes touch it."""
+        if slot not in self._partitions:
+            self._partitions[slot] = CategoryPartition([
+                item for item in self.items.values()
+                if item.slot == slot and item.embedding is not None
+            ])
+        return self._partitions[slot]
+
+    def filter(self, occasion: str, season: str) -> List[int]:
+        """
+        Item ids, in ascending order, usable for this occasion and season.
+
+        An item matches if the selected value is one of its values, it is
+        marked "any occasion"/"all season", or it has no values set.
+        """
+        matched = (
+            self.occasion_index.lookup(occasion.lower())
+            & self.season_index.lookup(season.lower())
+        )
+        return sorted(matched)
+
+    def _index(self, item: WardrobeItem):
+        self.occasion_index.add(item.item_id, item.occasions)
+        self.season_index.add(item.item_id, item.seasons)
+
+    def _unindex(self, item: WardrobeItem):
+        self.occasion_index.remove(item.item_id, item.occasions)
+        self.season_index.remove(item.item_id, item.seasons)
+
+    def _invalidate_slot(self, slot: Optional[str]):
+        if slot is not None:
+            self._partitions.pop(slot, None)
+
+    def upsert(self, item: WardrobeItem):
+        old = self.items.get(item.item_id)
+        if old is not None:
+            self._unindex(old)
+            self._invalidate_slot(old.slot)
+        elif self.items and item.item_id < next(reversed(self.items)):
+            # Keep ascending item_id order for out-of-order inserts
+            self.items = dict(sorted({**self.items, item.item_id: item}.items()))
+        self.items[item.item_id] = item
+        self._index(item)
+        self._invalidate_slot(item.slot)
+
+    def update_metadata(self, item_id: int, category: str, metadata):
+        old = self.items.get(item_id)
+        if old is None:
+            return  # Item has no embedding yet, nothing to recommend from
+        self.upsert(WardrobeItem(item_id, category, metadata, old.embedding))
+
+    def remove(self, item_id: int):
+        old = self.items.pop(item_id, None)
+        if old is not None:
+            self._unindex(old)
+            self._invalidate_slot(old.slot)
+
+
+class WardrobeCache:
+    """
+    Per-process wardrobe snapshot.
+
+    Loaded from the DB on first use and patched by the wardrobe endpoints.
+    Snapshots older than ``ttl`` seconds are reloaded so writes made by other
+    worker processes show up eventually.
+    """
+
+    def __init__(self, ttl: float = settings.WARDROBE_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._snapshot: Optional[WardrobeSnapshot] = None
+        # Bumped on every write so a load that raced a write is not installed
+        self._generation = 0
+
+    async def get(self, db) -> WardrobeSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and time.time() - snapshot.loaded_at < self.ttl:
+            WARDROBE_CACHE_LOOKUPS.labels(result="hit").inc()
+            return snapshot
+
+        WARDROBE_CACHE_LOOKUPS.labels(result="miss").inc()
+        generation = self._generation
+        rows = await db.fetch(
+            """
+            SELECT w.item_id, w.category, w.metadata, e.embedding
+            FROM wardrobe_items w
+            INNER JOIN embeddings e ON e.item_id = w.item_id
+            ORDER BY w.item_id
+            """
+        )
+        snapshot = WardrobeSnapshot([
+            WardrobeItem(row["item_id"], row["category"], row["metadata"], row["embedding"])
+            for row in rows
+        ])
+        if generation == self._generation:
+            self._snapshot = snapshot
+        logger.info(f"[WARDROBE CACHE] Loaded snapshot with {len(snapshot)} items")
+        return snapshot
+
+    def _write(self):
+        self._generation += 1
+        return self._snapshot
+
+    def upsert_item(self, item_id: int, category: str, embedding, metadata=None):
+        """Called after /wardrobe/upload stores an item and its embedding."""
+        snapshot = self._write()
+        if snapshot is not None:
+            snapshot.upsert(WardrobeItem(item_id, category, metadata, embedding))
+
+    def update_item(self, item_id: int, category: str, metadata):
+        """Called after PATCH /wardrobe/item/{id} changes category or metadata."""
+        snapshot = self._write()
+        if snapshot is not None:
+            snapshot.update_metadata(item_id, category, metadata)
+
+    def remove_item(self, item_id: int):
+        """Called after DELETE /wardrobe/item/{id}."""
+        snapshot = self._write()
+        if snapshot is not None:
+            snapshot.remove(item_id)
+
+    def clear(self):
+        """Called after /wardrobe/clear-all; the wardrobe is known to be empty."""
+        self._write()
+        self._snapshot = WardrobeSnapshot([])
+
+    def invalidate(self):
+        """Drop the snapshot so the next request reloads from the DB."""
+        self._write()
+        self._snapshot = None
+
+
+wardrobe_cache = WardrobeCache()
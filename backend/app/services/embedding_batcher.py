@@ -0,0 +1,138 @@
+"""
+Dynamic micro-batching for embedding inference.
+
+Async handlers submit one image each. A collector task groups queued requests
+into batches of up to ``max_batch_size`` images, waiting at most
+``max_wait_ms`` after the first one, runs a single batched forward pass on the
+inference executor and resolves each caller's future. The event loop is
+never blocked by the model, and concurrent uploads share forward passes.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+
+from backend.app.config import settings
+from backend.app.metrics import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_BATCH_WAIT_TIME,
+    EMBEDDING_QUEUE_DEPTH,
+)
+from backend.app.services.executors import BoundedExecutor, inference_executor
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Asyncio front end that batches single-image embedding requests."""
+
+    def __init__(
+        self,
+        embed_batch: Callable[[Sequence[Any]], np.ndarray],
+        max_batch_size: int = settings.EMBEDDING_BATCH_MAX_SIZE,
+        max_wait_ms: float = settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+        max_queue_size: int = settings.EMBEDDING_QUEUE_MAX_SIZE,
+        executor: BoundedExecutor = inference_executor,
+    ):
+        self.embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.executor = executor
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._in_flight: List[List[tuple]] = []
+
+    def _ensure_started(self):
+        """Start the collector on the running loop (again after a loop change)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._collector is None or self._collector.done():
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            # One batch per inference worker at a time; requests arriving while
+            # all workers are busy accumulate into the next batch
+            self._slots = asyncio.Semaphore(self.executor.max_workers)
+            self._collector = loop.create_task(self._collect())
+
+    async def embed(self, image) -> np.ndarray:
+        """Queue one image and wait for its embedding from the next batch."""
+        self._ensure_started()
+        future = self._loop.create_future()
+        # Blocks when the queue is full, pushing back on bursts
+        await self._queue.put((image, future, time.perf_counter()))
+        EMBEDDING_QUEUE_DEPTH.set(self._queue.qsize())
+        return await future
+
+    async def _next_batch(self) -> List[tuple]:
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        EMBEDDING_QUEUE_DEPTH.set(self._queue.qsize())
+        return batch
+
+    async def _collect(self):
+        while True:
+            await self._slots.acquire()
+            batch = await self._next_batch()
+            # Callers that gave up (e.g. client disconnected) don't need a result
+            batch = [entry for entry in batch if not entry[1].done()]
+            if not batch:
+                self._slots.release()
+                continue
+            task = self._loop.create_task(self._run(batch))
+            task.add_done_callback(lambda _: self._slots.release())
+
+    async def _run(self, batch: List[tuple]):
+        started = time.perf_counter()
+        for _, _, enqueued_at in batch:
+            EMBEDDING_BATCH_WAIT_TIME.observe(started - enqueued_at)
+        EMBEDDING_BATCH_SIZE.observe(len(batch))
+
+        images = [image for image, _, _ in batch]
+        self._in_flight.append(batch)
+        try:
+            vectors = await self.executor.run(self.embed_batch, images)
+        except Exception as e:
+            logger.error(f"[EMBEDDING BATCH] Batch of {len(batch)} failed: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._in_flight.remove(batch)
+
+        for (_, future, _), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    async def close(self):
+        """Stop the collector and fail requests that have not been answered."""
+        pending = [entry for batch in self._in_flight for entry in batch]
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Embedding batcher closed"))
+        EMBEDDING_QUEUE_DEPTH.set(0)
@@ -0,0 +1,106 @@
+"""
+Content-hash cache for image embeddings.
+
+Keys are a hash of the decoded pixels plus the embedding model version, so
+the same photo sent to /predict and then /wardrobe/upload (or re-uploaded
+after a failure) skips ResNet50. Two tiers:
+- an in-memory LRU of recent vectors
+- an optional directory of .npy files that survives restarts and is shared
+  by all workers on the host (EMBEDDING_CACHE_DIR; empty disables it)
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from backend.app.config import settings
+from backend.app.metrics import EMBEDDING_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+
+def image_cache_key(image: Image.Image, model_version: str) -> str:
+    """Hash of the decoded image (mode, size, pixels) and the model version."""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{model_version}|{image.mode}|{image.size[0]}x{image.size[1]}|".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """Thread-safe two-tier (memory LRU + disk) embedding cache."""
+
+    def __init__(
+        self,
+        max_entries: int = settings.EMBEDDING_CACHE_SIZE,
+        directory: Optional[str] = settings.EMBEDDING_CACHE_DIR or None,
+    ):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        # Shard by prefix so no single directory grows huge
+        return os.path.join(self.directory, key[:2], f"{key}.npy")
+
+    def _remember(self, key: str, vector: np.ndarray):
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+        if vector is not None:
+            EMBEDDING_CACHE_LOOKUPS.labels(result="memory_hit").inc()
+            return vector
+
+        if self.directory:
+            try:
+                vector = np.load(self._path(key))
+            except FileNotFoundError:
+                vector = None
+            except (OSError, ValueError) as e:
+                logger.warning(f"[EMBEDDING CACHE] Unreadable entry {key}: {e}")
+                vector = None
+            if vector is not None:
+                vector.flags.writeable = False
+                self._remember(key, vector)
+                EMBEDDING_CACHE_LOOKUPS.labels(result="disk_hit").inc()
+                return vector
+
+        EMBEDDING_CACHE_LOOKUPS.labels(result="miss").inc()
+        return None
+
+    def put(self, key: str, vector: np.ndarray):
+        vector = np.array(vector, dtype=np.float32)
+        vector.flags.writeable = False
+        self._remember(key, vector)
+
+        if self.directory:
+            path = self._path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Write then rename so concurrent readers never see a partial file
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, vector)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"[EMBEDDING CACHE] Failed to persist {key}: {e}")
+
+    def clear(self):
+        """Drop the in-memory tier (the disk tier is left alone)."""
+        with self._lock:
+            self._entries.clear()
@@ -5,73 +5,188 @@ Embedding service for:
 - Running pgvector similarity search against wardrobe_items in PostgreSQL
 """
 
+import asyncio
+import threading
 import time
+from typing import Dict, List, Optional, Tuple
+
 import numpy as np
-import torch
-import torch.nn as nn
-from torchvision import models, transforms
 from PIL import Image
 
+from RecommendationFiles.reference_store import ReferenceStore, open_reference_store
+from backend.app.config import settings
 from backend.app.database.connection import get_db  # <-- required for pgvector search
 from backend.app.metrics import ML_INFERENCE_TIME
+from backend.app.services.embedding_batcher import EmbeddingBatcher
+from backend.app.services.embedding_cache import EmbeddingCache, image_cache_key
+from backend.app.services.executors import run_cpu, run_io
+from backend.app.services.image_preprocessing import ImagePreprocessor
+from backend.app.services.reference_index import ReferenceIndex
+
+# torch/torchvision are imported on first use, so the API (and its tests) can
+# start without loading the ML stack. The model is loaded by the startup
+# warm-up (see backend.app.services.warmup) or by the first embedding request.
 
 
 # 1. IMAGE PREPROCESSING FOR RESNET50
+# Batched resize + normalization into reused per-thread buffers
+# (see backend.app.services.image_preprocessing)
 
-preprocess = transforms.Compose([
-    transforms.Resize((224, 224)),
-    transforms.ToTensor(),
-    transforms.Normalize(
-        mean=[0.485, 0.456, 0.406],
-        std=[0.229, 0.224, 0.225]
-    )
-])
+image_preprocessor = ImagePreprocessor()
 
 
 # 2. LOAD RESNET50 EMBEDDING MODEL
 
-resnet = models.resnet50(pretrained=True)
-resnet.eval()
+# Part of every embedding cache key; bump when weights or preprocessing change
+EMBEDDING_MODEL_VERSION = "resnet50-imagenet1k-v1-224"
 
-embedding_model = nn.Sequential(*list(resnet.children())[:-1])
+embedding_model = None  # fp32 baseline
+inference_model = None  # what actually runs (see inference_backends)
+INFERENCE_BACKEND = None
+_model_lock = threading.Lock()
 
 
-def compute_embedding(image: Image.Image) -> np.ndarray:
+def load_embedding_model():
+    """Load ResNet50 and build the configured inference backend, once."""
+    global embedding_model, inference_model, INFERENCE_BACKEND
+    if inference_model is None:
+        with _model_lock:
+            if inference_model is None:
+                import torch.nn as nn
+                from torchvision import models
+
+                from backend.app.services.inference_backends import (
+                    calibration_batch,
+                    configure_threads,
+                    select_inference_model,
+                )
+
+                resnet = models.resnet50(pretrained=True)
+                resnet.eval()
+                baseline = nn.Sequential(*list(resnet.children())[:-1]).eval()
+
+                configure_threads(settings.TORCH_INTRA_OP_THREADS)
+                backend = settings.EMBEDDING_INFERENCE_BACKEND
+                model, INFERENCE_BACKEND = select_inference_model(
+                    baseline,
+                    backend,
+                    calibration_batch(settings.EMBEDDING_CALIBRATION_DIR)
+                    if backend != "eager" else None,
+                    settings.EMBEDDING_MIN_AGREEMENT,
+                )
+                embedding_model = baseline
+                inference_model = model
+    return inference_model
+
+
+def warm_up_embedding_model():
+    """Load the model and run one dummy image through it, so the first request is not slow."""
+    import torch
+
+    model = load_embedding_model()
+    with torch.inference_mode():
+        model(torch.zeros(1, 3, 224, 224))
+
+
+def embedding_model_version() -> str:
     """
-    Compute a 2048-D ResNet50 embedding for a PIL image.
+    Cache-key version of the configured model. Non-eager backends produce
+    slightly different vectors, so they get their own keys.
+
+    Derived from settings so building a cache key never loads the model in
+    the caller's process (with a process inference pool it only lives in
+    the workers). A backend that fell back to eager still uses its
+    configured key; its vectors are the fp32 reference it was checked
+    against, so they are within EMBEDDING_MIN_AGREEMENT of what it would
+    have produced.
+    """
+    backend = settings.EMBEDDING_INFERENCE_BACKEND
+    if backend == "eager":
+        return EMBEDDING_MODEL_VERSION
+    return f"{EMBEDDING_MODEL_VERSION}-{backend}"
+
+
+embedding_cache = EmbeddingCache()
+
+
+def compute_embeddings(images: List[Image.Image]) -> np.ndarray:
     """
+    Compute 2048-D ResNet50 embeddings for several PIL images in one forward pass.
+    """
+    import torch
+
+    model = load_embedding_model()
     start = time.time()
-    tensor = preprocess(image).unsqueeze(0)
+    batch = image_preprocessor(images)
 
-    with torch.no_grad():
-        vec = embedding_model(tensor).squeeze().numpy()
+    with torch.inference_mode():
+        vecs = model(batch).reshape(len(images), -1).float().numpy()
 
     ML_INFERENCE_TIME.labels(operation="embedding").observe(time.time() - start)
+    return vecs  # shape (n_images, 2048)
+
+
+def _cache_lookup(image: Image.Image) -> Tuple[str, Optional[np.ndarray]]:
+    key = image_cache_key(image, embedding_model_version())
+    return key, embedding_cache.get(key)
+
+
+def compute_embedding(image: Image.Image) -> np.ndarray:
+    """
+    Compute a 2048-D ResNet50 embedding for a PIL image.
+    Images seen before are served from the embedding cache.
+    """
+    key, vec = _cache_lookup(image)
+    if vec is None:
+        vec = compute_embeddings([image])[0]
+        embedding_cache.put(key, vec)
     return vec  # shape (2048,)
 
 
+# Shared queue that batches concurrent requests from async handlers
+embedding_batcher = EmbeddingBatcher(compute_embeddings)
+
+
+async def compute_embedding_async(image: Image.Image) -> np.ndarray:
+    """
+    compute_embedding for async handlers: cache hits return immediately,
+    misses are batched with concurrent requests and run off the event loop.
+    """
+    key, vec = await run_cpu(_cache_lookup, image)
+    if vec is None:
+        vec = await embedding_batcher.embed(image)
+        await run_io(embedding_cache.put, key, vec)
+    return vec
+
+
 # 3. LOAD PRECOMPUTED EMBEDDINGS (Numpy Files)
-# Lazy loading to support testing without data files
+# Lazy loading to support testing without data files. The files are
+# memory-mapped through the shared reference store, so every worker on the
+# host shares one normalized copy.
+
+REFERENCE_INDEX = None
+_reference_lock = threading.Lock()
+
 
-WARDROBE_EMB = None
-WARDROBE_LABELS = None
+def _load_wardrobe_data() -> ReferenceStore:
+    """Open the precomputed wardrobe embeddings. Raises if unavailable."""
+    return open_reference_store(
+        settings.REFERENCE_EMBEDDINGS_PATH, settings.REFERENCE_LABELS_PATH
+    )
 
 
-def _load_wardrobe_data():
-    """Load wardrobe embeddings lazily. Returns (embeddings, labels) or raises if unavailable."""
-    global WARDROBE_EMB, WARDROBE_LABELS
-    if WARDROBE_EMB is None:
-        WARDROBE_EMB = np.load(
-            "ComputerVisionFiles/fashion_mnist_resnet50_embeddings.npy",
-            allow_pickle=True
-        )
-        WARDROBE_LABELS = np.load(
-            "ComputerVisionFiles/fashion_mnist_labels.npy",
-            allow_pickle=True
-        )
-        assert WARDROBE_EMB.shape[0] == len(WARDROBE_LABELS), \
-            "Mismatch: number of embeddings != number of labels"
-    return WARDROBE_EMB, WARDROBE_LABELS
+def get_reference_index() -> ReferenceIndex:
+    """Map the normalized precomputed embeddings once, on first use."""
+    global REFERENCE_INDEX
+    if REFERENCE_INDEX is None:
+        with _reference_lock:
+            if REFERENCE_INDEX is None:
+                store = _load_wardrobe_data()
+                dtype = settings.REFERENCE_EMBEDDINGS_DTYPE
+                REFERENCE_INDEX = ReferenceIndex(
+                    store.unit(dtype), store.labels, dtype=dtype, normalized=True
+                )
+    return REFERENCE_INDEX
 
 
 # 4. COSINE SIMILARITY (NumPy)
@@ -84,18 +199,16 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
     return np.dot(b_norm, a_norm)  # returns similarity scores array
 
 
-def find_nearest_neighbor(embedding: np.ndarray):
+def find_nearest_neighbor(embedding: np.ndarray, k: int = settings.CLASSIFY_KNN_K):
     """
     Classify an embedding by nearest precomputed wardrobe vector.
+    With k > 1, the k nearest vectors vote (weighted by similarity).
     Returns:
         - label (str/number)
         - confidence (similarity score)
         - index (nearest vector index)
     """
-    emb, labels = _load_wardrobe_data()
-    sims = cosine_similarity(embedding, emb)
-    idx = int(np.argmax(sims))
-    return labels[idx], float(sims[idx]), idx
+    return get_reference_index().classify(embedding, k)
 
 
 # 5. MAIN API: CLASSIFY IMAGE USING PRECOMPUTED EMBEDDINGS
@@ -116,6 +229,103 @@ def classify_image(image: Image.Image):
     }
 
 
+async def classify_image_async(image: Image.Image):
+    """
+    classify_image for async handlers, using the batched embedding queue.
+    """
+    start = time.time()
+    emb = await compute_embedding_async(image)
+    label, confidence, idx = await run_cpu(find_nearest_neighbor, emb)
+    ML_INFERENCE_TIME.labels(operation="classification").observe(time.time() - start)
+
+    return {
+        "embedding": emb,
+        "label": str(label),
+        "confidence": confidence,
+        "nearest_index": idx
+    }
+
+
+# 5b. BULK CLASSIFICATION (wardrobe imports)
+# The trained ClassificationEngine head labels many images with one matmul
+
+_classification_engine = None
+_classification_lock = threading.Lock()
+
+
+def get_classification_engine():
+    """The ClassificationEngine (loaded from its persisted artifact), on first use."""
+    global _classification_engine
+    if _classification_engine is None:
+        with _classification_lock:
+            if _classification_engine is None:
+                from backend.app.classification.class_engine import ClassificationEngine
+
+                _classification_engine = ClassificationEngine(
+                    settings.REFERENCE_EMBEDDINGS_PATH, settings.REFERENCE_LABELS_PATH
+                )
+    return _classification_engine
+
+
+_class_names = None
+
+
+def get_class_names() -> List[str]:
+    """Class names by label index (one per line of REFERENCE_CLASSES_PATH), read once."""
+    global _class_names
+    if _class_names is None:
+        with open(settings.REFERENCE_CLASSES_PATH, encoding="utf-8") as f:
+            _class_names = [line.strip() for line in f if line.strip()]
+    return _class_names
+
+
+def class_name(label) -> str:
+    """The class name for a classifier label; index labels ("3") are looked up in get_class_names()."""
+    label = str(label)
+    names = get_class_names()
+    if label.isdigit() and int(label) < len(names):
+        return names[int(label)]
+    return label
+
+
+def classify_embeddings(embeddings: np.ndarray, top_k: int = 1) -> List[Dict]:
+    """
+    Label N embeddings with a single predict_batch call.
+    Returns one {"label", "confidence"[, "top_k"]} dict per embedding.
+    """
+    start = time.time()
+    result = get_classification_engine().predict_batch(embeddings, top_k=top_k)
+
+    items = []
+    for i in range(len(embeddings)):
+        item = {
+            "label": str(result["labels"][i]),
+            "confidence": float(result["confidences"][i]),
+        }
+        if "top_k" in result:
+            item["top_k"] = [
+                {"label": str(label), "confidence": float(confidence)}
+                for label, confidence in zip(result["top_k"]["labels"][i], result["top_k"]["confidences"][i])
+            ]
+        items.append(item)
+
+    ML_INFERENCE_TIME.labels(operation="bulk_classification").observe(time.time() - start)
+    return items
+
+
+async def classify_images_async(images: List[Image.Image], top_k: int = 1) -> List[Dict]:
+    """
+    Classify many images: embeddings go through the batching queue together,
+    then one batched prediction runs on the cpu pool. Each result also
+    carries its image's embedding.
+    """
+    embeddings = await asyncio.gather(*(compute_embedding_async(image) for image in images))
+    results = await run_cpu(classify_embeddings, np.stack(embeddings), top_k)
+    for result, embedding in zip(results, embeddings):
+        result["embedding"] = embedding
+    return results
+
+
 # 6. PGVECTOR SIMILARITY SEARCH (async)
 
 async def find_similar_items(vector, conn, limit=10):
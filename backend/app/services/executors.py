@@ -0,0 +1,108 @@
+"""
+Executor pools for blocking work called from async handlers.
+
+- io: threads for boto3/S3 calls, which spend their time waiting on the network
+- inference: torch forward passes; a bounded thread pool, or a process pool
+  (each worker process loads its own copy of the model)
+- cpu: threads for numpy-heavy scoring and image decoding, which release the GIL
+
+Every pool reports in-flight tasks, worker count and queue wait, so
+saturation is visible as executor_tasks_in_flight / executor_workers.
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from backend.app.config import settings
+from backend.app.metrics import EXECUTOR_QUEUE_WAIT, EXECUTOR_TASKS_IN_FLIGHT, EXECUTOR_WORKERS
+
+
+def _timed_call(fn: Callable, args: Tuple, kwargs: dict) -> Tuple[float, Any]:
+    """Run fn in the worker and report when it started (wall clock, valid across processes)."""
+    started = time.time()
+    return started, fn(*args, **kwargs)
+
+
+class BoundedExecutor:
+    """A named thread or process pool with saturation metrics."""
+
+    def __init__(self, name: str, max_workers: int, kind: str = "thread"):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.name = name
+        self.max_workers = max_workers
+        self.kind = kind
+        # Created on first use (and again after shutdown), so importing this
+        # module starts no threads or processes
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        EXECUTOR_WORKERS.labels(pool=name).set(max_workers)
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "thread":
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix=f"{self.name}-pool"
+                    )
+                else:
+                    # spawn: forking a process that already runs torch threads can deadlock
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+            return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the pool without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        in_flight = EXECUTOR_TASKS_IN_FLIGHT.labels(pool=self.name)
+        in_flight.inc()
+        submitted = time.time()
+        try:
+            started, result = await loop.run_in_executor(
+                self._get_executor(), functools.partial(_timed_call, fn, args, kwargs)
+            )
+        finally:
+            in_flight.dec()
+        EXECUTOR_QUEUE_WAIT.labels(pool=self.name).observe(max(started - submitted, 0.0))
+        return result
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers; the next run() starts a fresh pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+io_executor = BoundedExecutor("io", settings.IO_EXECUTOR_WORKERS)
+inference_executor = BoundedExecutor(
+    "inference", settings.INFERENCE_EXECUTOR_WORKERS, kind=settings.INFERENCE_EXECUTOR_KIND
+)
+cpu_executor = BoundedExecutor("cpu", settings.CPU_EXECUTOR_WORKERS)
+
+
+async def run_io(fn: Callable, *args, **kwargs):
+    """Run a blocking boto3/network call on the io pool."""
+    return await io_executor.run(fn, *args, **kwargs)
+
+
+async def run_inference(fn: Callable, *args, **kwargs):
+    """Run a torch inference call on the inference pool."""
+    return await inference_executor.run(fn, *args, **kwargs)
+
+
+async def run_cpu(fn: Callable, *args, **kwargs):
+    """Run numpy-heavy scoring or image decoding on the cpu pool."""
+    return await cpu_executor.run(fn, *args, **kwargs)
+
+
+def shutdown_executors(wait: bool = True):
+    """Stop every pool (application shutdown)."""
+    for executor in (io_executor, inference_executor, cpu_executor):
+        executor.shutdown(wait=wait)
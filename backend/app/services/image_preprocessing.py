@@ -0,0 +1,155 @@
+"""
+Image decode and ResNet50 preprocessing.
+
+- decode_image: JPEGs are decoded in draft mode, letting libjpeg scale by
+  1/2, 1/4 or 1/8 during the DCT while keeping both sides >= the model
+  input, so a 12 MP phone photo decodes at ~500x380 instead of 4032x3024.
+- preprocess_images: resize to 224x224 (bilinear, as torchvision's Resize)
+  and normalize a whole batch at once. Normalization is folded into one
+  multiply-add per channel on the uint8 pixels, in place on a float32 NCHW
+  array. Matches transforms.Compose([Resize, ToTensor, Normalize]).
+- ImagePreprocessor: the same, writing into per-thread preallocated
+  buffers so steady-state batches allocate nothing.
+
+Run as a module for a microbenchmark against the torchvision path:
+    python -m backend.app.services.image_preprocessing [image ...]
+"""
+
+import io
+import sys
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+from PIL import Image
+
+INPUT_SIZE = 224
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+# x / 255 then (x - mean) / std, as a single x * scale + bias per channel
+_SCALE = (1.0 / (255.0 * IMAGENET_STD)).reshape(1, 3, 1, 1)
+_BIAS = (-IMAGENET_MEAN / IMAGENET_STD).reshape(1, 3, 1, 1)
+
+
+def decode_image(contents: bytes, min_size: int = INPUT_SIZE) -> Image.Image:
+    """Decode image bytes to RGB, using reduced-size JPEG decoding when possible."""
+    image = Image.open(io.BytesIO(contents))
+    if image.format == "JPEG":
+        # Only ever scales down while both sides stay >= min_size
+        image.draft("RGB", (min_size, min_size))
+    return image.convert("RGB")
+
+
+def _resize(image: Image.Image) -> np.ndarray:
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    if image.size != (INPUT_SIZE, INPUT_SIZE):
+        image = image.resize((INPUT_SIZE, INPUT_SIZE), Image.BILINEAR)
+    return np.asarray(image)
+
+
+def preprocess_images(
+    images: List[Image.Image],
+    pixels: Optional[np.ndarray] = None,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Resize and normalize images into an (N, 3, 224, 224) float32 array.
+
+    Args:
+        images: PIL images of any size
+        pixels: Optional (>= N, 224, 224, 3) uint8 scratch buffer
+        out: Optional (>= N, 3, 224, 224) float32 output buffer
+    """
+    n = len(images)
+    if pixels is None:
+        pixels = np.empty((n, INPUT_SIZE, INPUT_SIZE, 3), dtype=np.uint8)
+    if out is None:
+        out = np.empty((n, 3, INPUT_SIZE, INPUT_SIZE), dtype=np.float32)
+    pixels, out = pixels[:n], out[:n]
+
+    for i, image in enumerate(images):
+        pixels[i] = _resize(image)
+
+    np.multiply(pixels.transpose(0, 3, 1, 2), _SCALE, out=out)
+    out += _BIAS
+    return out
+
+
+class ImagePreprocessor:
+    """
+    preprocess_images with per-thread buffers that grow to the largest
+    batch seen and are reused afterwards. The returned tensor is a view of
+    the calling thread's buffer, valid until that thread's next call.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _buffers(self, n: int):
+        local = self._local
+        if getattr(local, "capacity", 0) < n:
+            local.pixels = np.empty((n, INPUT_SIZE, INPUT_SIZE, 3), dtype=np.uint8)
+            local.out = np.empty((n, 3, INPUT_SIZE, INPUT_SIZE), dtype=np.float32)
+            local.capacity = n
+        return local.pixels, local.out
+
+    def __call__(self, images: List[Image.Image]):
+        import torch
+
+        pixels, out = self._buffers(len(images))
+        return torch.from_numpy(preprocess_images(images, pixels, out))
+
+
+def _torchvision_pipeline(contents_list: List[bytes]):
+    """The previous path: full decode, then per-image torchvision transforms."""
+    import torch
+    from torchvision import transforms
+
+    preprocess = transforms.Compose([
+        transforms.Resize((INPUT_SIZE, INPUT_SIZE)),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=IMAGENET_MEAN.tolist(), std=IMAGENET_STD.tolist()),
+    ])
+    images = [Image.open(io.BytesIO(contents)).convert("RGB") for contents in contents_list]
+    return torch.stack([preprocess(image) for image in images])
+
+
+def _synthetic_jpeg(width: int = 4032, height: int = 3024) -> bytes:
+    """A 12 MP JPEG with gradients and fine texture, roughly like a phone photo."""
+    y, x = np.mgrid[0:height, 0:width]
+    rgb = np.stack([x * 200 // width, y * 200 // height, (x + y) * 200 // (width + height)], axis=-1)
+    rgb = rgb + np.random.default_rng(0).integers(0, 56, size=rgb.shape)
+    buffer = io.BytesIO()
+    Image.fromarray(rgb.astype(np.uint8)).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        batch = [open(path, "rb").read() for path in sys.argv[1:]]
+    else:
+        batch = [_synthetic_jpeg()] * 4
+    preprocessor = ImagePreprocessor()
+
+    def timed(fn, runs=3):
+        fn()
+        start = time.perf_counter()
+        for _ in range(runs):
+            result = fn()
+        return (time.perf_counter() - start) / (runs * len(batch)), result
+
+    old_time, old = timed(lambda: _torchvision_pipeline(batch))
+    # Results are views of the preprocessor's reused buffer, so keep copies
+    new_time, new = timed(lambda: preprocessor([decode_image(contents) for contents in batch]))
+    new = new.clone()
+    full_time, full = timed(lambda: preprocessor([Image.open(io.BytesIO(c)).convert("RGB") for c in batch]))
+
+    print(f"torchvision (full decode): {old_time * 1000:7.1f} ms/image")
+    print(f"full decode + batched:     {full_time * 1000:7.1f} ms/image "
+          f"(max abs diff {float((full - old).abs().max()):.2e})")
+    print(f"draft decode + batched:    {new_time * 1000:7.1f} ms/image "
+          f"(max abs diff {float((new - old).abs().max()):.3f}, "
+          f"mean {float((new - old).abs().mean()):.4f})")
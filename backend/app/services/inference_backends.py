@@ -0,0 +1,226 @@
+"""
+Selectable CPU inference backends for the ResNet50 embedder.
+
+- eager:         the fp32 nn.Sequential as built (baseline)
+- channels_last: fp32 with NHWC activations (faster oneDNN convolutions)
+- torchscript:   traced, frozen and optimized for inference (channels_last)
+- compile:       torch.compile (channels_last); first call compiles
+- int8:          static post-training int8 quantization (FX graph mode,
+                 x86 backend), calibrated on sample images
+
+Non-eager backends need real sample images (EMBEDDING_CALIBRATION_DIR).
+They are built (and int8 is calibrated) on part of them and checked
+against the fp32 baseline on the held-out rest: if the minimum cosine
+similarity of their embeddings falls below a threshold, or there are no
+real images to check on, the embedder falls back to eager, so faster
+inference never silently degrades classification and recommendations.
+
+Run as a module to compare every backend's latency and agreement:
+    python -m backend.app.services.inference_backends [image ...]
+"""
+
+import copy
+import glob
+import logging
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+from backend.app.metrics import EMBEDDING_MODEL_AGREEMENT
+from backend.app.services.image_preprocessing import decode_image, preprocess_images
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_BACKENDS = ("eager", "channels_last", "torchscript", "compile", "int8")
+
+# Images used for int8 calibration and the agreement check
+CALIBRATION_LIMIT = 32
+# Fewer real images than this and non-eager backends are not used
+MIN_CALIBRATION_IMAGES = 8
+# Share of the images held out of building/calibration for the agreement check
+HOLDOUT_FRACTION = 0.25
+
+
+class _ChannelsLast(nn.Module):
+    """Feed NHWC inputs to a model whose weights are already channels_last."""
+
+    def __init__(self, model: nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, batch: torch.Tensor) -> torch.Tensor:
+        return self.model(batch.contiguous(memory_format=torch.channels_last))
+
+
+def configure_threads(intra_op_threads: int):
+    """Set torch's intra-op thread count (0 keeps the default)."""
+    if intra_op_threads > 0:
+        torch.set_num_threads(intra_op_threads)
+
+
+def calibration_batch(directory: Optional[str] = None, limit: int = CALIBRATION_LIMIT) -> Optional[torch.Tensor]:
+    """Preprocessed sample images from directory, or None if there are none."""
+    paths = []
+    if directory:
+        for pattern in ("*.jpg", "*.jpeg", "*.png", "*.webp"):
+            paths.extend(glob.glob(os.path.join(directory, pattern)))
+    if not paths:
+        return None
+
+    images = []
+    for path in sorted(paths)[:limit]:
+        with open(path, "rb") as f:
+            images.append(decode_image(f.read()))
+    return torch.from_numpy(preprocess_images(images))
+
+
+def synthetic_batch(n: int = 8) -> torch.Tensor:
+    """A fixed random batch, for benchmarking only (meaningless for calibration)."""
+    generator = torch.Generator().manual_seed(0)
+    return torch.randn(n, 3, 224, 224, generator=generator)
+
+
+def _quantize_int8(model: nn.Module, inputs: torch.Tensor) -> nn.Module:
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    torch.backends.quantized.engine = "x86"
+    prepared = prepare_fx(copy.deepcopy(model), get_default_qconfig_mapping("x86"), (inputs[:1],))
+    with torch.inference_mode():
+        for start in range(0, len(inputs), 8):
+            prepared(inputs[start:start + 8])
+    return convert_fx(prepared)
+
+
+def build_inference_model(model: nn.Module, backend: str, inputs: torch.Tensor) -> nn.Module:
+    """
+    Build the given backend from an eval-mode fp32 model (left untouched).
+    inputs are used for tracing, calibration and warm-up.
+    """
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend}")
+    if backend == "eager":
+        return model
+    if backend == "int8":
+        return _quantize_int8(model, inputs)
+
+    nhwc = _ChannelsLast(copy.deepcopy(model).to(memory_format=torch.channels_last)).eval()
+    if backend == "channels_last":
+        return nhwc
+
+    with torch.inference_mode():
+        if backend == "torchscript":
+            traced = torch.jit.freeze(torch.jit.trace(nhwc, inputs[:1]).eval())
+            built = torch.jit.optimize_for_inference(traced)
+        else:
+            built = torch.compile(nhwc, dynamic=True)
+        built(inputs[:2])  # warm-up: run the optimization passes / compile now
+    return built
+
+
+def embedding_agreement(
+    reference: nn.Module, candidate: nn.Module, inputs: torch.Tensor
+) -> Dict[str, float]:
+    """Min and mean cosine similarity of candidate embeddings vs the reference."""
+    with torch.inference_mode():
+        expected = reference(inputs).reshape(len(inputs), -1)
+        actual = candidate(inputs).reshape(len(inputs), -1)
+    cosine = F.cosine_similarity(actual.float(), expected.float(), dim=1)
+    return {"min": float(cosine.min()), "mean": float(cosine.mean())}
+
+
+def select_inference_model(
+    model: nn.Module, backend: str, images: Optional[torch.Tensor], min_agreement: float
+) -> Tuple[nn.Module, str]:
+    """
+    Build backend from real sample images, falling back to the eager model
+    if there are fewer than MIN_CALIBRATION_IMAGES of them, it fails to
+    build, or its embeddings agree with eager less than min_agreement (min
+    cosine) on the held-out images.
+
+    Returns:
+        (model to run, backend actually used)
+    """
+    if backend == "eager":
+        return model, backend
+
+    if images is None or len(images) < MIN_CALIBRATION_IMAGES:
+        logger.warning(
+            f"[INFERENCE] {backend} backend needs at least {MIN_CALIBRATION_IMAGES} real images "
+            f"in EMBEDDING_CALIBRATION_DIR to calibrate and check against; using eager"
+        )
+        return model, "eager"
+
+    # Calibrate on one part, check agreement on images the backend has not seen
+    n_holdout = max(2, int(len(images) * HOLDOUT_FRACTION))
+    calibration, holdout = images[:-n_holdout], images[-n_holdout:]
+    try:
+        candidate = build_inference_model(model, backend, calibration)
+        agreement = embedding_agreement(model, candidate, holdout)
+    except Exception as e:
+        logger.warning(f"[INFERENCE] {backend} backend unavailable, using eager: {e}")
+        return model, "eager"
+
+    EMBEDDING_MODEL_AGREEMENT.labels(backend=backend).set(agreement["min"])
+    if agreement["min"] < min_agreement:
+        logger.warning(
+            f"[INFERENCE] {backend} agreement {agreement['min']:.4f} < {min_agreement}, "
+            f"using eager"
+        )
+        return model, "eager"
+
+    logger.info(
+        f"[INFERENCE] Using {backend} backend "
+        f"(cosine vs fp32: min {agreement['min']:.4f}, mean {agreement['mean']:.4f})"
+    )
+    return candidate, backend
+
+
+def benchmark_backends(
+    model: nn.Module, inputs: torch.Tensor, backends: List[str] = INFERENCE_BACKENDS, runs: int = 5
+) -> List[Dict]:
+    """Per-image latency and agreement with eager for each backend."""
+    results = []
+    for backend in backends:
+        candidate = build_inference_model(model, backend, inputs)
+        with torch.inference_mode():
+            candidate(inputs)
+            start = time.perf_counter()
+            for _ in range(runs):
+                candidate(inputs)
+            elapsed = (time.perf_counter() - start) / (runs * len(inputs))
+        results.append({
+            "backend": backend,
+            "ms_per_image": elapsed * 1000,
+            **embedding_agreement(model, candidate, inputs),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    from backend.app.config import settings
+    from backend.app.services import embedding_service
+
+    configure_threads(settings.TORCH_INTRA_OP_THREADS)
+    embedding_service.load_embedding_model()
+    embedding_model = embedding_service.embedding_model
+    if len(sys.argv) > 1:
+        images = []
+        for path in sys.argv[1:]:
+            with open(path, "rb") as f:
+                images.append(decode_image(f.read()))
+        batch = torch.from_numpy(preprocess_images(images))
+    else:
+        batch = calibration_batch(settings.EMBEDDING_CALIBRATION_DIR)
+        if batch is None:
+            print("No EMBEDDING_CALIBRATION_DIR images: benchmarking on a synthetic batch (int8 calibrated on noise)")
+            batch = synthetic_batch()
+
+    print(f"{'backend':<14} {'ms/image':>9} {'min cos':>8} {'mean cos':>9}")
+    for row in benchmark_backends(embedding_model, batch):
+        print(f"{row['backend']:<14} {row['ms_per_image']:>9.1f} {row['min']:>8.4f} {row['mean']:>9.4f}")
@@ -0,0 +1,109 @@
+"""
+Exact cosine nearest-neighbour search over the precomputed reference embeddings.
+
+The reference matrix is L2-normalized once (or arrives already normalized
+from the shared reference store) and kept as one contiguous float32 (or
+float16) array, so each query is a single matrix-vector product instead of
+re-normalizing the whole matrix.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from RecommendationFiles.reference_store import UNIT_DTYPES, normalize_rows
+
+# Rows converted to float32 at a time when the matrix is stored as float16
+_CHUNK_ROWS = 4096
+
+
+class ReferenceIndex:
+    """Pre-normalized reference embeddings with their labels."""
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        labels: np.ndarray,
+        dtype: str = "float32",
+        normalized: bool = False,
+    ):
+        """
+        Args:
+            embeddings: (N, D) reference embeddings. A writable float32 array
+                is normalized in place instead of copied.
+            labels: (N,) label of each reference embedding
+            dtype: Storage dtype, "float32" or "float16" (half the memory,
+                scores accurate to ~1e-3)
+            normalized: Rows are already unit length (e.g. a memory-mapped
+                ReferenceStore.unit matrix); used as-is when dtype matches
+        """
+        if dtype not in UNIT_DTYPES:
+            raise ValueError(f"Unknown reference embedding dtype: {dtype}")
+        if len(embeddings) != len(labels):
+            raise ValueError(
+                f"Mismatch: {len(embeddings)} embeddings vs {len(labels)} labels"
+            )
+
+        self.labels = np.asarray(labels)
+
+        unit = np.asarray(embeddings)
+        if normalized:
+            self.unit = np.ascontiguousarray(unit, dtype=dtype)
+            return
+
+        if unit.dtype != np.float32 or not unit.flags.c_contiguous or not unit.flags.writeable:
+            unit = np.array(unit, dtype=np.float32, order="C")
+        normalize_rows(unit, out=unit)
+
+        self.unit = unit.astype(np.float16) if dtype == "float16" else unit
+
+    def __len__(self) -> int:
+        return len(self.unit)
+
+    def similarities(self, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of one query against every reference row."""
+        query = np.asarray(query, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        query = query / (norm if norm > 0 else 1)
+
+        if self.unit.dtype == np.float32:
+            return self.unit @ query
+
+        sims = np.empty(len(self.unit), dtype=np.float32)
+        for start in range(0, len(self.unit), _CHUNK_ROWS):
+            chunk = self.unit[start:start + _CHUNK_ROWS].astype(np.float32)
+            sims[start:start + len(chunk)] = chunk @ query
+        return sims
+
+    def search(self, query: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k (similarities, indices), most similar first."""
+        sims = self.similarities(query)
+        k = min(k, len(sims))
+        if k == 1:
+            top = np.array([int(np.argmax(sims))])
+        else:
+            top = np.argpartition(-sims, k - 1)[:k]
+            top = top[np.argsort(-sims[top], kind="stable")]
+        return sims[top], top
+
+    def classify(self, query: np.ndarray, k: int = 1) -> Tuple[object, float, int]:
+        """
+        Label a query by its nearest reference embeddings.
+
+        With k > 1 the top-k neighbours vote, weighted by similarity.
+
+        Returns:
+            (label, similarity of the nearest neighbour with that label, its index)
+        """
+        sims, top = self.search(query, k)
+        if k == 1:
+            return self.labels[top[0]], float(sims[0]), int(top[0])
+
+        votes = {}
+        for sim, idx in zip(sims, top):
+            label = self.labels[idx]
+            votes[label] = votes.get(label, 0.0) + max(float(sim), 0.0)
+        winner = max(votes, key=votes.get)
+        # Neighbours are sorted, so the first with the winning label is its nearest
+        pos = next(i for i, idx in enumerate(top) if self.labels[idx] == winner)
+        return self.labels[top[pos]], float(sims[pos]), int(top[pos])
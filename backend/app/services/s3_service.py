@@ -1,8 +1,12 @@
 import boto3
+import threading
 import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from botocore.client import Config
 from backend.app.config import settings
-from backend.app.metrics import AWS_S3_CALLS, AWS_S3_BYTES, AWS_S3_TIME
+from backend.app.metrics import AWS_S3_CALLS, AWS_S3_BYTES, AWS_S3_TIME, PRESIGNED_URL_CACHE_LOOKUPS
+from backend.app.services.executors import run_io
 #print("DEBUG BOTO CREDS:", settings.AWS_ACCESS_KEY_ID, settings.AWS_SECRET_ACCESS_KEY)
 
 # Use Signature Version 4 for presigned URLs (required by modern S3)
@@ -20,7 +24,9 @@ async def upload_file_to_s3(file, bucket: str, key: str) -> str:
     body = file.read()
 
     start = time.time()
-    s3.put_object(
+    # boto3 is blocking; run it on the io pool so the event loop keeps serving
+    await run_io(
+        s3.put_object,
         Bucket=bucket,
         Key=key,
         Body=body,
@@ -33,42 +39,184 @@ async def upload_file_to_s3(file, bucket: str, key: str) -> str:
     return f"s3://{bucket}/{key}"
 
 
+async def delete_files_from_s3(s3_uris: List[str]):
+    """Delete s3://bucket/key objects, one DeleteObjects call per bucket."""
+    keys_by_bucket: Dict[str, List[str]] = {}
+    for s3_uri in s3_uris:
+        parsed = _parse_s3_uri(s3_uri)
+        if parsed is not None:
+            keys_by_bucket.setdefault(parsed[0], []).append(parsed[1])
+
+    for bucket, keys in keys_by_bucket.items():
+        # DeleteObjects takes at most 1000 keys
+        for start in range(0, len(keys), 1000):
+            chunk = keys[start:start + 1000]
+            began = time.time()
+            response = await run_io(
+                s3.delete_objects,
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": key} for key in chunk], "Quiet": True},
+            )
+            AWS_S3_TIME.labels(operation="delete").observe(time.time() - began)
+            AWS_S3_CALLS.labels(operation="delete").inc()
+            errors = response.get("Errors") if isinstance(response, dict) else None
+            if errors:
+                raise RuntimeError(f"Failed to delete {len(errors)} objects from {bucket}: {errors[0]}")
+
+
+class PresignedUrlCache:
+    """
+    Thread-safe LRU of generated presigned URLs. Entries are dropped
+    margin seconds before the URL expires, so callers always receive a URL
+    that stays valid for at least that long.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.PRESIGNED_URL_CACHE_SIZE,
+        margin: float = settings.PRESIGNED_URL_CACHE_MARGIN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.margin = margin
+        self.clock = clock
+        self._entries: "OrderedDict[Tuple[str, str, int], Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, bucket: str, key: str, expiration: int) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get((bucket, key, expiration))
+            if entry is None:
+                return None
+            if entry[1] <= self.clock():
+                del self._entries[(bucket, key, expiration)]
+                return None
+            self._entries.move_to_end((bucket, key, expiration))
+            return entry[0]
+
+    def put(self, bucket: str, key: str, expiration: int, url: str):
+        ttl = expiration - self.margin
+        if ttl <= 0:
+            return  # too short-lived to hand out again
+        with self._lock:
+            self._entries[(bucket, key, expiration)] = (url, self.clock() + ttl)
+            self._entries.move_to_end((bucket, key, expiration))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+presigned_url_cache = PresignedUrlCache()
+
+# bucket -> (region, monotonic time after which to look it up again)
+_bucket_regions: Dict[str, Tuple[str, float]] = {}
+# region -> long-lived client (boto3 clients are thread-safe)
+_regional_clients: Dict[str, Any] = {}
+_region_lock = threading.Lock()
+
+
+def get_bucket_region(bucket: str) -> str:
+    """
+    The bucket's region, looked up once per process. If the lookup fails the
+    configured region is used and the lookup is retried after a while.
+    """
+    now = time.monotonic()
+    with _region_lock:
+        cached = _bucket_regions.get(bucket)
+    if cached is not None and cached[1] > now:
+        return cached[0]
+
+    try:
+        start = time.time()
+        region = s3.get_bucket_location(Bucket=bucket)['LocationConstraint']
+        AWS_S3_TIME.labels(operation="get_bucket_location").observe(time.time() - start)
+        AWS_S3_CALLS.labels(operation="get_bucket_location").inc()
+        # us-east-1 returns None, so handle that
+        region, retry_at = region or 'us-east-1', float("inf")
+    except Exception as e:
+        print(f"Warning: Could not detect region of bucket {bucket}: {e}")
+        region = settings.AWS_REGION
+        retry_at = now + settings.S3_REGION_RETRY_SECONDS
+
+    with _region_lock:
+        _bucket_regions[bucket] = (region, retry_at)
+    return region
+
+
+def get_regional_client(region: str):
+    """One long-lived SigV4 client per region (the default client for AWS_REGION)."""
+    if region == settings.AWS_REGION:
+        return s3
+    with _region_lock:
+        client = _regional_clients.get(region)
+        if client is None:
+            client = boto3.client(
+                "s3",
+                region_name=region,
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                config=Config(signature_version='s3v4')
+            )
+            _regional_clients[region] = client
+    return client
+
+
+def clear_s3_caches():
+    """Forget bucket regions, regional clients and cached URLs (tests, credential rotation)."""
+    with _region_lock:
+        _bucket_regions.clear()
+        _regional_clients.clear()
+    presigned_url_cache.clear()
+
+
+def _parse_s3_uri(s3_uri: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Split s3://bucket/key into (bucket, key), or None if it is not one."""
+    if not s3_uri or not s3_uri.startswith("s3://"):
+        return None
+    parts = s3_uri[len("s3://"):].split("/", 1)
+    if len(parts) != 2:
+        return None
+    return parts[0], parts[1]
+
+
+def cached_presigned_url(s3_uri: str, expiration: int = 3600) -> Optional[str]:
+    """The cached presigned URL for s3_uri, or None on a miss (never calls S3)."""
+    parsed = _parse_s3_uri(s3_uri)
+    if parsed is None:
+        return None
+    url = presigned_url_cache.get(parsed[0], parsed[1], expiration)
+    if url is not None:
+        # misses are counted by the get_presigned_url call that follows
+        PRESIGNED_URL_CACHE_LOOKUPS.labels(result="hit").inc()
+    return url
+
+
 def get_presigned_url(s3_uri: str, expiration: int = 3600) -> str:
     """
     Convert s3://bucket/key to a presigned HTTPS URL that can be accessed publicly.
     expiration: URL validity in seconds (default 1 hour)
+
+    URLs are cached until shortly before they expire, and the bucket region
+    and regional client are resolved once, so repeat calls make no S3 requests.
     """
-    if not s3_uri or not s3_uri.startswith("s3://"):
-        return s3_uri  # Return as-is if not an S3 URI
-    
-    # Parse s3://bucket/key
-    parts = s3_uri.replace("s3://", "").split("/", 1)
-    if len(parts) != 2:
-        return s3_uri  # Invalid format, return as-is
-    
-    bucket = parts[0]
-    key = parts[1]
-    
+    parsed = _parse_s3_uri(s3_uri)
+    if parsed is None:
+        return s3_uri  # Not an S3 URI or invalid format, return as-is
+    bucket, key = parsed
+
+    url = presigned_url_cache.get(bucket, key, expiration)
+    PRESIGNED_URL_CACHE_LOOKUPS.labels(result="miss" if url is None else "hit").inc()
+    if url is not None:
+        return url
+
     try:
-        # Detect the bucket's actual region (bucket might be in different region than configured)
-        try:
-            bucket_region = s3.get_bucket_location(Bucket=bucket)['LocationConstraint']
-            # us-east-1 returns None, so handle that
-            if bucket_region is None:
-                bucket_region = 'us-east-1'
-        except Exception:
-            # If detection fails, use configured region
-            bucket_region = settings.AWS_REGION
-        
-        # Create a client with the correct region for this bucket
-        s3_client = boto3.client(
-            "s3",
-            region_name=bucket_region,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            config=Config(signature_version='s3v4')
-        )
-        
+        # Sign with a client in the bucket's actual region (bucket might be in
+        # a different region than configured)
+        s3_client = get_regional_client(get_bucket_region(bucket))
+
         # Generate presigned URL with the correct region
         start = time.time()
         url = s3_client.generate_presigned_url(
@@ -78,8 +226,10 @@ def get_presigned_url(s3_uri: str, expiration: int = 3600) -> str:
         )
         AWS_S3_TIME.labels(operation="get_presigned_url").observe(time.time() - start)
         AWS_S3_CALLS.labels(operation="get_presigned_url").inc()
-        return url
     except Exception as e:
         # If presigned URL generation fails, return original
         print(f"Warning: Failed to generate presigned URL for {s3_uri}: {e}")
         return s3_uri
+
+    presigned_url_cache.put(bucket, key, expiration, url)
+    return url
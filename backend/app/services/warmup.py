@@ -0,0 +1,74 @@
+"""
+Background model warm-up and readiness tracking.
+
+The API starts serving (and answers "/") before any model is loaded. At
+startup the lifespan hook launches a warm-up task that loads each
+component on its executor pool; "/ready" reports 503 until every
+component has loaded, so load balancers only route traffic to warm
+workers. With MODEL_WARMUP disabled nothing is preloaded, components
+load on first use, and the worker reports ready immediately.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from backend.app.metrics import MODEL_WARMUP_TIME
+
+logger = logging.getLogger(__name__)
+
+PENDING, LOADING, READY, FAILED, LAZY = "pending", "loading", "ready", "failed", "lazy"
+
+
+class ModelWarmup:
+    """Runs named async load steps concurrently and records their status."""
+
+    def __init__(self, steps: Dict[str, Callable[[], Awaitable]]):
+        self.steps = steps
+        self.status: Dict[str, str] = {name: LAZY for name in steps}
+        self.errors: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Launch the warm-up in the background (call from the running loop)."""
+        self.status = {name: PENDING for name in self.steps}
+        self.errors = {}
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        await asyncio.gather(*(self._load(name, step) for name, step in self.steps.items()))
+
+    async def _load(self, name: str, step: Callable[[], Awaitable]):
+        self.status[name] = LOADING
+        start = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            self.status[name] = FAILED
+            self.errors[name] = str(e)
+            logger.error(f"[WARMUP] Failed to load {name}: {e}")
+            return
+        elapsed = time.perf_counter() - start
+        MODEL_WARMUP_TIME.labels(component=name).set(elapsed)
+        self.status[name] = READY
+        logger.info(f"[WARMUP] Loaded {name} in {elapsed:.2f}s")
+
+    @property
+    def ready(self) -> bool:
+        return all(status in (READY, LAZY) for status in self.status.values())
+
+    async def wait(self):
+        """Wait for a started warm-up to finish."""
+        if self._task is not None:
+            await self._task
+
+    async def stop(self):
+        """Cancel a warm-up that is still running (application shutdown)."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
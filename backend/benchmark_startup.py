@@ -0,0 +1,83 @@
+"""
+Startup-time benchmark for the backend.
+
+Each run starts a fresh interpreter and measures:
+- import:     `import backend.app.main` (what every worker spawn, test run
+              and health check pays before serving "/")
+- ready:      time from process start until "/ready" returns 200, i.e. the
+              lifespan warm-up has loaded every model
+- components: per-component warm-up time reported by the warm-up itself
+
+Run from the repository root:
+    python -m backend.benchmark_startup [--runs 3]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Executed in a fresh interpreter per run
+_CHILD = r"""
+import json, os, time
+start = time.perf_counter()
+import backend.app.main as main
+imported = time.perf_counter()
+
+from starlette.testclient import TestClient
+
+ready_at = None
+with TestClient(main.app) as client:
+    while True:
+        response = client.get("/ready")
+        if response.status_code == 200:
+            ready_at = time.perf_counter()
+            break
+        if "loading" not in response.json()["components"].values() and \
+                "pending" not in response.json()["components"].values():
+            break  # a component failed; it will not become ready
+        time.sleep(0.05)
+    body = response.json()
+
+print(json.dumps({
+    "import": imported - start,
+    "ready": None if ready_at is None else ready_at - start,
+    "components": body["components"],
+    "errors": body["errors"],
+}))
+"""
+
+
+def run_once() -> dict:
+    env = {**os.environ, "MODEL_WARMUP": "true"}
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD], capture_output=True, text=True, env=env, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    imports = [run["import"] for run in runs]
+    readies = [run["ready"] for run in runs if run["ready"] is not None]
+
+    print(f"import backend.app.main: median {statistics.median(imports):.2f}s "
+          f"(min {min(imports):.2f}s, {len(imports)} runs)")
+    if readies:
+        print(f"time to /ready:          median {statistics.median(readies):.2f}s "
+              f"(min {min(readies):.2f}s)")
+    else:
+        print("time to /ready:          never ready")
+    for name, status in runs[-1]["components"].items():
+        error = runs[-1]["errors"].get(name)
+        print(f"  {name:<22} {status}" + (f": {error}" if error else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,15 @@ Shared pytest fixtures for backend tests.
 """
 
 import io
+import os
 import pytest
 import numpy as np
 from unittest.mock import AsyncMock, MagicMock, patch
 from PIL import Image
 
+# Models load lazily in tests instead of in the startup warm-up
+os.environ.setdefault("MODEL_WARMUP", "false")
+
 
 # =============================================================================
 # Database Fixtures
@@ -24,6 +28,8 @@ def mock_db_connection():
     mock_conn.fetchval.return_value = 1  # Default item_id
     mock_conn.fetch.return_value = []    # Default empty list
     mock_conn.execute.return_value = "OK"
+    # conn.transaction() is a plain call returning an async context manager
+    mock_conn.transaction = MagicMock()
 
     return mock_conn
 
@@ -152,8 +158,8 @@ def test_client(mock_db_connection, mock_embedding_vector):
     # Create patches for external services
     with patch('backend.app.api.endpoints.upload_file_to_s3', new_callable=AsyncMock) as mock_upload:
         with patch('backend.app.api.endpoints.get_presigned_url') as mock_presigned:
-            with patch('backend.app.api.endpoints.compute_embedding') as mock_embed:
-                with patch('backend.app.api.endpoints.classify_image') as mock_classify:
+            with patch('backend.app.api.endpoints.compute_embedding_async', new_callable=AsyncMock) as mock_embed:
+                with patch('backend.app.api.endpoints.classify_image_async', new_callable=AsyncMock) as mock_classify:
                     with patch('backend.app.api.endpoints.find_similar_items', new_callable=AsyncMock) as mock_similar:
                         # Configure mocks
                         mock_upload.return_value = "s3://test-bucket/wardrobe/test.jpg"
@@ -0,0 +1,42 @@
+"""
+Integration tests for the liveness and readiness endpoints.
+"""
+
+import pytest
+
+
+@pytest.mark.integration
+class TestHealthEndpoints:
+    """Tests for GET / and GET /ready."""
+
+    def test_root_is_live(self, test_client):
+        """Test that the liveness endpoint answers without loading models."""
+        response = test_client.get("/")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ok"
+
+    def test_ready_reports_component_status(self, test_client):
+        """Test that readiness lists every warm-up component."""
+        response = test_client.get("/ready")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert set(data["components"]) == {
+            "embedding_model", "reference_index", "classification_engine"
+        }
+
+    def test_ready_is_503_while_loading(self, test_client):
+        """Test that readiness fails until the warm-up has finished."""
+        from backend.app.main import warmup
+
+        status = warmup.status
+        warmup.status = {**status, "embedding_model": "loading"}
+        try:
+            response = test_client.get("/ready")
+        finally:
+            warmup.status = status
+
+        assert response.status_code == 503
+        assert response.json()["components"]["embedding_model"] == "loading"
@@ -41,3 +41,53 @@ class TestPredictEndpoint:
         # Backend catches HTTPException in outer try/except and returns 500
         assert response.status_code in [400, 500]
         assert "empty" in response.json()["detail"].lower()
+
+
+@pytest.mark.integration
+class TestPredictBatchEndpoint:
+    """Tests for POST /predict/batch endpoint."""
+
+    def test_predict_batch_returns_one_prediction_per_file(
+        self, test_client, sample_image_bytes, mock_embedding_vector
+    ):
+        """Test that every uploaded file gets a label, in upload order."""
+        from unittest.mock import AsyncMock, patch
+
+        results = [
+            {"label": "Dress", "confidence": 0.9, "embedding": mock_embedding_vector,
+             "top_k": [{"label": "Dress", "confidence": 0.9}, {"label": "Coat", "confidence": 0.05}]},
+            {"label": "Bag", "confidence": 0.7, "embedding": mock_embedding_vector,
+             "top_k": [{"label": "Bag", "confidence": 0.7}, {"label": "Sandal", "confidence": 0.2}]},
+        ]
+        with patch('backend.app.api.endpoints.classify_images_async',
+                   new_callable=AsyncMock, return_value=results) as mock_classify:
+            response = test_client.post(
+                "/predict/batch?top_k=2",
+                files=[
+                    ("files", ("a.png", sample_image_bytes, "image/png")),
+                    ("files", ("b.png", sample_image_bytes, "image/png")),
+                ]
+            )
+
+        assert response.status_code == 200
+        predictions = response.json()["predictions"]
+        assert [p["filename"] for p in predictions] == ["a.png", "b.png"]
+        assert [p["predicted_label"] for p in predictions] == ["Dress", "Bag"]
+        assert predictions[1]["top_k"][1] == {"label": "Sandal", "confidence": 0.2}
+        assert len(mock_classify.call_args.args[0]) == 2
+        assert mock_classify.call_args.kwargs["top_k"] == 2
+
+    def test_predict_batch_rejects_too_many_files(self, test_client, sample_image_bytes):
+        """Test that requests above BATCH_MAX_FILES are refused."""
+        from unittest.mock import patch
+
+        with patch('backend.app.api.endpoints.settings.BATCH_MAX_FILES', 1):
+            response = test_client.post(
+                "/predict/batch",
+                files=[
+                    ("files", ("a.png", sample_image_bytes, "image/png")),
+                    ("files", ("b.png", sample_image_bytes, "image/png")),
+                ]
+            )
+
+        assert response.status_code == 400
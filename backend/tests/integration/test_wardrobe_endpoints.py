@@ -26,6 +26,119 @@ class TestWardrobeUpload:
         assert data["item_id"] == 123
         assert "image_url" in data
 
+    def test_upload_wardrobe_item_single_db_round_trip(self, test_client, sample_image_bytes):
+        """Test that the item and its embedding are written by one statement."""
+        test_client.mock_db.fetchval.return_value = 123
+
+        response = test_client.post(
+            "/wardrobe/upload",
+            params={"category": "top"},
+            files={"file": ("test_shirt.png", sample_image_bytes, "image/png")}
+        )
+
+        assert response.status_code == 200
+        test_client.mock_db.fetchval.assert_called_once()
+        test_client.mock_db.execute.assert_not_called()
+        query, image_url, category, vector = test_client.mock_db.fetchval.call_args.args
+        assert "INSERT INTO wardrobe_items" in query and "INSERT INTO embeddings" in query
+        assert (image_url, category) == ("s3://test-bucket/wardrobe/test.jpg", "top")
+        assert len(vector) == 2048
+
+    def test_upload_wardrobe_item_overlaps_s3_and_embedding(self, test_client, sample_image_bytes,
+                                                            mock_embedding_vector):
+        """Test that the S3 put and the embedding are in flight at the same time."""
+        import asyncio
+
+        started = set()
+
+        async def started_too(name):
+            while name not in started:
+                await asyncio.sleep(0)
+
+        # Each only completes if the other starts while it is still pending
+        async def upload(**kwargs):
+            started.add("s3")
+            await asyncio.wait_for(started_too("embedding"), timeout=5)
+            return "s3://test-bucket/wardrobe/test.jpg"
+
+        async def embed(image):
+            started.add("embedding")
+            await asyncio.wait_for(started_too("s3"), timeout=5)
+            return mock_embedding_vector
+
+        test_client.mock_upload.side_effect = upload
+        test_client.mock_embed.side_effect = embed
+
+        response = test_client.post(
+            "/wardrobe/upload",
+            params={"category": "top"},
+            files={"file": ("test_shirt.png", sample_image_bytes, "image/png")}
+        )
+
+        assert response.status_code == 200
+
+    def test_upload_wardrobe_item_records_step_timings(self, test_client, sample_image_bytes):
+        """Test that every upload step feeds the step-time histogram."""
+        from backend.app.metrics import WARDROBE_UPLOAD_STEP_TIME
+
+        def count(step):
+            for metric in WARDROBE_UPLOAD_STEP_TIME.collect():
+                for sample in metric.samples:
+                    if sample.name.endswith("_count") and sample.labels == {"endpoint": "single", "step": step}:
+                        return sample.value
+            return 0
+
+        steps = ("read", "decode", "s3_upload", "embedding", "db_insert", "total")
+        before = {step: count(step) for step in steps}
+
+        response = test_client.post(
+            "/wardrobe/upload",
+            params={"category": "top"},
+            files={"file": ("test_shirt.png", sample_image_bytes, "image/png")}
+        )
+
+        assert response.status_code == 200
+        assert all(count(step) == before[step] + 1 for step in steps)
+
+    @pytest.mark.parametrize("failure", ["embedding", "db_insert"])
+    def test_upload_wardrobe_item_failure_deletes_uploaded_object(self, test_client, sample_image_bytes,
+                                                                  failure):
+        """Test that the S3 object is deleted when the item cannot be stored."""
+        from unittest.mock import AsyncMock, patch
+
+        if failure == "embedding":
+            test_client.mock_embed.side_effect = RuntimeError("model unavailable")
+        else:
+            test_client.mock_db.fetchval.side_effect = RuntimeError("connection lost")
+
+        with patch('backend.app.api.endpoints.delete_files_from_s3', new_callable=AsyncMock) as mock_delete:
+            response = test_client.post(
+                "/wardrobe/upload",
+                params={"category": "top"},
+                files={"file": ("test_shirt.png", sample_image_bytes, "image/png")}
+            )
+
+        assert response.status_code == 500
+        mock_delete.assert_awaited_once_with(["s3://test-bucket/wardrobe/test.jpg"])
+
+    def test_upload_wardrobe_item_s3_failure_deletes_nothing(self, test_client, sample_image_bytes):
+        """Test that a failed S3 put leaves nothing to clean up."""
+        from unittest.mock import AsyncMock, patch
+
+        test_client.mock_upload.side_effect = RuntimeError("throttled")
+
+        with patch('backend.app.api.endpoints.delete_files_from_s3', new_callable=AsyncMock) as mock_delete:
+            response = test_client.post(
+                "/wardrobe/upload",
+                params={"category": "top"},
+                files={"file": ("test_shirt.png", sample_image_bytes, "image/png")}
+            )
+
+        assert response.status_code == 500
+        assert "throttled" in response.json()["detail"]
+        mock_delete.assert_not_called()
+        test_client.mock_db.fetchval.assert_not_called()
+
     def test_upload_wardrobe_item_empty_file_error(self, test_client):
         """Test upload with empty file returns error."""
         response = test_client.post(
@@ -39,6 +152,191 @@ class TestWardrobeUpload:
         assert "empty" in response.json()["detail"].lower()
 
 
+@pytest.mark.integration
+class TestWardrobeUploadBatch:
+    """Tests for POST /wardrobe/upload/batch endpoint."""
+
+    @staticmethod
+    def inserted_rows(test_client):
+        """Make the bulk INSERT return one row per image_url it was given."""
+        async def fetch(query, image_urls, categories):
+            return [{"item_id": 100 + i, "image_url": url} for i, url in enumerate(image_urls)]
+        test_client.mock_db.fetch.side_effect = fetch
+
+    def test_upload_batch_inserts_all_items_in_one_transaction(self, test_client, sample_image_bytes):
+        """Test that every file is stored and embedded with a single bulk insert."""
+        self.inserted_rows(test_client)
+        urls = iter(["s3://bucket/a.png", "s3://bucket/b.png"])
+        test_client.mock_upload.side_effect = lambda **kwargs: next(urls)
+
+        response = test_client.post(
+            "/wardrobe/upload/batch",
+            params={"category": "top"},
+            files=[
+                ("files", ("a.png", sample_image_bytes, "image/png")),
+                ("files", ("b.png", sample_image_bytes, "image/png")),
+            ]
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["uploaded"] == 2 and data["failed"] == 0
+        assert [item["item_id"] for item in data["items"]] == [100, 101]
+        assert [item["filename"] for item in data["items"]] == ["a.png", "b.png"]
+        assert data["items"][1]["image_url"] == "s3://bucket/b.png"
+        assert test_client.mock_db.transaction.call_count == 1
+        assert test_client.mock_db.fetch.call_count == 1
+        embeddings = test_client.mock_db.executemany.call_args.args[1]
+        assert [item_id for item_id, _ in embeddings] == [100, 101]
+        assert test_client.mock_embed.call_count == 2
+        test_client.mock_db.fetchval.assert_not_called()
+
+    def test_upload_batch_reports_per_item_failures(self, test_client, sample_image_bytes):
+        """Test that empty, undecodable and failed-upload files don't fail the rest."""
+        self.inserted_rows(test_client)
+        outcomes = iter(["s3://bucket/ok.png", RuntimeError("throttled")])
+
+        def upload(**kwargs):
+            outcome = next(outcomes)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        test_client.mock_upload.side_effect = upload
+
+        response = test_client.post(
+            "/wardrobe/upload/batch",
+            params={"category": "top"},
+            files=[
+                ("files", ("ok.png", sample_image_bytes, "image/png")),
+                ("files", ("empty.png", b"", "image/png")),
+                ("files", ("text.png", b"not an image", "image/png")),
+                ("files", ("throttled.png", sample_image_bytes, "image/png")),
+            ]
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["uploaded"] == 1 and data["failed"] == 3
+        statuses = [item["status"] for item in data["items"]]
+        assert statuses == ["success", "error", "error", "error"]
+        assert "empty" in data["items"][1]["error"].lower()
+        assert "invalid" in data["items"][2]["error"].lower()
+        assert "throttled" in data["items"][3]["error"]
+
+    def test_upload_batch_without_category_uses_predicted_labels(self, test_client, sample_image_bytes,
+                                                                 mock_embedding_vector):
+        """Test that items are classified in bulk when no category is given."""
+        from unittest.mock import AsyncMock, patch
+
+        self.inserted_rows(test_client)
+        results = [
+            # The engine predicts Fashion-MNIST label indices
+            {"label": "3", "confidence": 0.9, "embedding": mock_embedding_vector},
+            {"label": "8", "confidence": 0.7, "embedding": mock_embedding_vector},
+        ]
+        with patch('backend.app.api.endpoints.classify_images_async',
+                   new_callable=AsyncMock, return_value=results) as mock_classify:
+            response = test_client.post(
+                "/wardrobe/upload/batch",
+                files=[
+                    ("files", ("a.png", sample_image_bytes, "image/png")),
+                    ("files", ("b.png", sample_image_bytes, "image/png")),
+                ]
+            )
+
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert [item["category"] for item in items] == ["Dresses", "Accessories"]
+        assert [item["predicted_label"] for item in items] == ["Dress", "Bag"]
+        assert mock_classify.call_count == 1
+        categories = test_client.mock_db.fetch.call_args.args[2]
+        assert categories == ["Dresses", "Accessories"]
+
+    def test_upload_batch_database_failure_fails_stored_items(self, test_client, sample_image_bytes):
+        """Test that a failed transaction fails every item and deletes its S3 object."""
+        from unittest.mock import AsyncMock, patch
+
+        test_client.mock_db.fetch.side_effect = RuntimeError("connection lost")
+
+        with patch('backend.app.api.endpoints.delete_files_from_s3', new_callable=AsyncMock) as mock_delete:
+            response = test_client.post(
+                "/wardrobe/upload/batch",
+                params={"category": "top"},
+                files=[("files", ("a.png", sample_image_bytes, "image/png"))]
+            )
+
+        assert response.status_code == 200
+        item = response.json()["items"][0]
+        assert item["status"] == "error"
+        assert "connection lost" in item["error"]
+        mock_delete.assert_awaited_once_with(["s3://test-bucket/wardrobe/test.jpg"])
+
+    def test_upload_batch_embedding_failure_deletes_uploaded_objects(self, test_client, sample_image_bytes):
+        """Test that objects uploaded before embedding failed are deleted; nothing is inserted."""
+        from unittest.mock import AsyncMock, patch
+
+        outcomes = iter(["s3://bucket/a.png", RuntimeError("throttled")])
+
+        def upload(**kwargs):
+            outcome = next(outcomes)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        test_client.mock_upload.side_effect = upload
+        test_client.mock_embed.side_effect = RuntimeError("model unavailable")
+
+        with patch('backend.app.api.endpoints.delete_files_from_s3', new_callable=AsyncMock) as mock_delete:
+            response = test_client.post(
+                "/wardrobe/upload/batch",
+                params={"category": "top"},
+                files=[
+                    ("files", ("a.png", sample_image_bytes, "image/png")),
+                    ("files", ("b.png", sample_image_bytes, "image/png")),
+                ]
+            )
+
+        assert response.status_code == 200
+        assert response.json()["failed"] == 2
+        assert "model unavailable" in response.json()["items"][0]["error"]
+        mock_delete.assert_awaited_once_with(["s3://bucket/a.png"])
+        test_client.mock_db.fetch.assert_not_called()
+
+    def test_classifier_labels_map_to_wardrobe_categories(self):
+        """Test that every label index the classifier emits maps to a category outfits can use."""
+        import numpy as np
+
+        from backend.app.api.endpoints import CLASSIFIER_CATEGORIES, UNCLASSIFIED, wardrobe_category
+        from backend.app.recommendations.snapshot import CATEGORY_SLOTS
+        from backend.app.services.embedding_service import get_class_names
+
+        # Labels as classify_embeddings returns them: str() of the int64 class index
+        labels = [str(label) for label in np.arange(10, dtype=np.int64)]
+
+        assert set(get_class_names()) == set(CLASSIFIER_CATEGORIES)
+        assert all(CATEGORY_SLOTS.get(wardrobe_category(label).lower()) for label in labels)
+        assert [wardrobe_category(label) for label in ("0", "1", "3", "8", "9")] == [
+            "Tops", "Bottoms", "Dresses", "Accessories", "Shoes"
+        ]
+        assert wardrobe_category("Dress") == "Dresses"
+        assert wardrobe_category("10") == UNCLASSIFIED
+        assert wardrobe_category("Hat") == UNCLASSIFIED
+
+    def test_upload_batch_rejects_too_many_files(self, test_client, sample_image_bytes):
+        """Test that requests above BATCH_MAX_FILES are refused."""
+        from unittest.mock import patch
+
+        with patch('backend.app.api.endpoints.settings.BATCH_MAX_FILES', 1):
+            response = test_client.post(
+                "/wardrobe/upload/batch",
+                files=[
+                    ("files", ("a.png", sample_image_bytes, "image/png")),
+                    ("files", ("b.png", sample_image_bytes, "image/png")),
+                ]
+            )
+
+        assert response.status_code == 400
+
+
 @pytest.mark.integration
 class TestWardrobeGet:
     """Tests for GET /wardrobe/items endpoint."""
@@ -68,6 +366,82 @@ class TestWardrobeGet:
         assert data["items"] == []
 
 
+    def test_get_wardrobe_items_paginates_with_cursor(self, test_client, sample_wardrobe_items):
+        """Test that a full page returns the cursor for the next one."""
+        test_client.mock_db.fetch.return_value = sample_wardrobe_items
+
+        response = test_client.get("/wardrobe/items", params={"after_item_id": 10, "limit": 1})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["item_id"] for item in data["items"]] == [1]
+        assert data["next_after_item_id"] == 1
+        query, *args = test_client.mock_db.fetch.call_args.args
+        assert "item_id < $1" in query
+        assert args == [10, 2]  # cursor, limit + 1
+
+    def test_get_wardrobe_items_last_page_has_no_cursor(self, test_client, sample_wardrobe_items):
+        """Test that a short page ends pagination."""
+        test_client.mock_db.fetch.return_value = sample_wardrobe_items
+
+        response = test_client.get("/wardrobe/items", params={"limit": 5})
+
+        assert response.json()["next_after_item_id"] is None
+
+    def test_get_wardrobe_items_projects_fields(self, test_client):
+        """Test that only requested fields are selected and nothing is presigned."""
+        test_client.mock_db.fetch.return_value = [{"item_id": 7, "category": "top"}]
+
+        response = test_client.get("/wardrobe/items", params={"fields": "category"})
+
+        assert response.status_code == 200
+        assert response.json()["items"] == [{"category": "top"}]
+        query = test_client.mock_db.fetch.call_args.args[0]
+        assert "SELECT item_id, category" in query
+        assert "metadata" not in query
+        test_client.mock_presigned.assert_not_called()
+
+    def test_get_wardrobe_items_filters_in_sql(self, test_client):
+        """Test that filters become SQL conditions on the column and JSONB metadata."""
+        import json
+
+        test_client.mock_db.fetch.return_value = []
+
+        response = test_client.get(
+            "/wardrobe/items",
+            params={"category": "top", "occasion": "casual", "color": "red"},
+        )
+
+        assert response.status_code == 200
+        query, *args = test_client.mock_db.fetch.call_args.args
+        assert "category = $1" in query
+        assert "metadata @> $2::jsonb" in query
+        assert args[0] == "top"
+        assert json.loads(args[1]) == {"occasions": ["casual"], "colors": ["red"]}
+
+    def test_get_wardrobe_items_repeated_filter_matches_any_value(self, test_client):
+        """Test that a repeated filter keeps items listing any of its values."""
+        test_client.mock_db.fetch.return_value = []
+
+        response = test_client.get(
+            "/wardrobe/items",
+            params={"occasion": "Casual", "season": ["Summer", "All-Season"]},
+        )
+
+        assert response.status_code == 200
+        query, *args = test_client.mock_db.fetch.call_args.args
+        assert "metadata @> $1::jsonb" in query
+        assert "metadata -> $2 ?| $3::text[]" in query
+        assert args[1:3] == ["season", ["Summer", "All-Season"]]
+
+    def test_get_wardrobe_items_rejects_unknown_fields(self, test_client):
+        """Test that unknown projection fields are a client error."""
+        response = test_client.get("/wardrobe/items", params={"fields": "item_id,embedding"})
+
+        assert response.status_code == 400
+        assert "embedding" in response.json()["detail"]
+
+
 @pytest.mark.integration
 class TestWardrobeUpdate:
     """Tests for PATCH /wardrobe/item/{item_id} endpoint."""
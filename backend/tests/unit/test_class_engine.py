@@ -0,0 +1,177 @@
+"""
+Unit tests for the persisted ClassificationEngine.
+"""
+
+import os
+import pytest
+import numpy as np
+from unittest.mock import patch
+
+
+def write_training_data(directory, n_classes=3, seed=0, index_labels=False):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_classes, 16)) * 4
+    labels = rng.integers(0, n_classes, size=300)
+    embeddings = (centers[labels] + rng.standard_normal((300, 16))).astype(np.float32)
+    if index_labels:
+        # Like fashion_mnist_labels.npy: int64 class indices
+        names = labels.astype(np.int64)
+    else:
+        names = np.array(["bag", "dress", "shirt", "shoe"])[:n_classes][labels]
+    embedding_path = os.path.join(directory, "embeddings.npy")
+    label_path = os.path.join(directory, "labels.npy")
+    np.save(embedding_path, embeddings)
+    np.save(label_path, names)
+    return embedding_path, label_path, embeddings
+
+
+@pytest.mark.unit
+class TestClassificationEngine:
+    """Tests for training, persisting and loading the classifier."""
+
+    def test_first_construction_trains_and_saves_artifact(self, tmp_path):
+        """Test that a missing artifact is trained once and written next to the data."""
+        from backend.app.classification.class_engine import ClassificationEngine
+
+        embedding_path, label_path, _ = write_training_data(str(tmp_path))
+
+        engine = ClassificationEngine(embedding_path, label_path)
+
+        assert os.path.basename(engine.artifact_dir).startswith("embeddings.classifier-")
+        assert sorted(os.listdir(engine.artifact_dir)) == [
+            "bias.npy", "classes.npy", "manifest.json", "weights.npy"
+        ]
+        assert engine.weights.shape == (3, 16)
+        assert engine.bias.shape == (3,)
+
+    def test_second_construction_loads_without_training(self, tmp_path):
+        """Test that an artifact for the same data is loaded instead of retrained."""
+        from backend.app.classification.class_engine import ClassificationEngine
+
+        embedding_path, label_path, embeddings = write_training_data(str(tmp_path))
+        trained = ClassificationEngine(embedding_path, label_path)
+
+        with patch("backend.app.classification.class_engine.LogisticRegression.fit") as fit:
+            loaded = ClassificationEngine(embedding_path, label_path)
+
+        fit.assert_not_called()
+        assert loaded.artifact_dir == trained.artifact_dir
+        for embedding in embeddings[:20]:
+            assert loaded.predict(embedding) == trained.predict(embedding)
+
+    def test_object_labels_reload_without_retraining(self, tmp_path):
+        """Test that labels saved as an object array still give a loadable artifact."""
+        from backend.app.classification.class_engine import ClassificationEngine
+
+        embedding_path, label_path, embeddings = write_training_data(str(tmp_path))
+        np.save(label_path, np.load(label_path).astype(object))
+        trained = ClassificationEngine(embedding_path, label_path)
+
+        with patch.object(ClassificationEngine, "_train") as train:
+            loaded = ClassificationEngine(embedding_path, label_path)
+
+        train.assert_not_called()
+        assert loaded.label_encoder.classes_.dtype.kind == "U"
+        assert loaded.predict(embeddings[0]) == trained.predict(embeddings[0])
+
+    @pytest.mark.parametrize("index_labels", [False, True])
+    def test_reloaded_predictions_keep_label_type(self, tmp_path, index_labels):
+        """Test that a reloaded artifact predicts the same labels, with the same type, as training."""
+        from backend.app.classification.class_engine import ClassificationEngine
+
+        # 12 classes, so numeric labels would sort differently as text ("10" < "2")
+        embedding_path, label_path, embeddings = write_training_data(
+            str(tmp_path), n_classes=12 if index_labels else 4, index_labels=index_labels
+        )
+        trained = ClassificationEngine(embedding_path, label_path)
+
+        with patch.object(ClassificationEngine, "_train") as train:
+            loaded = ClassificationEngine(embedding_path, label_path)
+
+        train.assert_not_called()
+        assert loaded.label_encoder.classes_.dtype == trained.label_encoder.classes_.dtype
+        np.testing.assert_array_equal(loaded.y, trained.y)
+        for embedding in embeddings[:20]:
+            expected, actual = trained.predict(embedding), loaded.predict(embedding)
+            assert actual == expected
+            assert type(actual["label"]) is type(expected["label"])
+
+    def test_unchanged_files_skip_rehashing(self, tmp_path):
+        """Test that the data hash is memoized against the files' size and mtime."""
+        from backend.app.classification.class_engine import ClassificationEngine
+
+        embedding_path, label_path, _ = write_training_data(str(tmp_path))
+        first = ClassificationEngine(embedding_path, label_path)
+
+        with patch("backend.app.classification.class_engine.training_data_hash") as rehash:
+            second = ClassificationEngine(embedding_path, label_path)
+
+        rehash.assert_not_called()
+        assert second.data_hash == first.data_hash
+
+    def test_changed_data_retrains_under_new_key(self, tmp_path):
+        """Test that different training data gets a new artifact."""
+        from backend.app.classification.class_engine import ClassificationEngine
+
+        embedding_path, label_path, _ = write_training_data(str(tmp_path), seed=0)
+        first = ClassificationEngine(embedding_path, label_path)
+        write_training_data(str(tmp_path), seed=1)
+
+        second = ClassificationEngine(embedding_path, label_path)
+
+        assert second.data_hash != first.data_hash
+        assert second.artifact_dir != first.artifact_dir
+        assert os.path.isdir(first.artifact_dir) and os.path.isdir(second.artifact_dir)
+
+    @pytest.mark.parametrize("n_classes", [2, 3])
+    def test_matmul_prediction_matches_sklearn(self, tmp_path, n_classes):
+        """Test that the exported weight/bias head reproduces predict_proba."""
+        from backend.app.classification.class_engine import ClassificationEngine
+
+        embedding_path, label_path, embeddings = write_training_data(str(tmp_path), n_classes=n_classes)
+        engine = ClassificationEngine(embedding_path, label_path)
+
+        expected = engine.model.predict_proba(embeddings[:50])
+        labels = engine.label_encoder.inverse_transform(expected.argmax(axis=1))
+
+        for embedding, label, proba in zip(embeddings[:50], labels, expected):
+            result = engine.predict(embedding)
+            assert result["label"] == label
+            assert np.isclose(result["confidence"], proba.max(), atol=1e-5)
+
+
+@pytest.mark.unit
+class TestPredictBatch:
+    """Tests for ClassificationEngine.predict_batch."""
+
+    def test_batch_matches_single_predictions(self, tmp_path):
+        """Test that one batched call gives the same answers as per-item predict."""
+        from backend.app.classification.class_engine import ClassificationEngine
+
+        embedding_path, label_path, embeddings = write_training_data(str(tmp_path))
+        engine = ClassificationEngine(embedding_path, label_path)
+
+        result = engine.predict_batch(embeddings[:40])
+
+        assert result["labels"].shape == (40,)
+        assert "top_k" not in result
+        for embedding, label, confidence in zip(embeddings[:40], result["labels"], result["confidences"]):
+            single = engine.predict(embedding)
+            assert single["label"] == label
+            assert np.isclose(single["confidence"], confidence)
+
+    def test_top_k_is_sorted_and_clipped_to_class_count(self, tmp_path):
+        """Test that top-k classes come most likely first, with the prediction first."""
+        from backend.app.classification.class_engine import ClassificationEngine
+
+        embedding_path, label_path, embeddings = write_training_data(str(tmp_path), n_classes=4)
+        engine = ClassificationEngine(embedding_path, label_path)
+
+        result = engine.predict_batch(embeddings[:10], top_k=10)
+        top = result["top_k"]
+
+        assert top["labels"].shape == (10, 4)
+        assert np.all(np.diff(top["confidences"], axis=1) <= 0)
+        assert np.array_equal(top["labels"][:, 0], result["labels"])
+        assert np.allclose(top["confidences"].sum(axis=1), 1.0, atol=1e-5)
+        assert all(len(set(row)) == 4 for row in top["labels"])
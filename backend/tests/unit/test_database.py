@@ -0,0 +1,149 @@
+"""
+Unit tests for the connection pool dependency and the data-access layer.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+class FakePool:
+    """Stands in for an asyncpg pool with a single connection."""
+
+    def __init__(self):
+        self.conn = AsyncMock()
+        self.in_use = False
+        self.acquire_timeouts = []
+
+    async def acquire(self, timeout=None):
+        self.acquire_timeouts.append(timeout)
+        self.in_use = True
+        return self.conn
+
+    async def release(self, conn):
+        self.in_use = False
+
+    def get_size(self):
+        return 1
+
+    def get_idle_size(self):
+        return 0 if self.in_use else 1
+
+
+@pytest.mark.unit
+class TestConnectionPool:
+    """Tests for connect_to_db and get_db."""
+
+    @pytest.mark.asyncio
+    async def test_pool_is_sized_from_settings(self):
+        """Test that pool sizing and the statement cache come from settings."""
+        from backend.app.database import connection
+
+        with patch.object(connection, "_db_pool", None):
+            with patch("backend.app.database.connection.asyncpg.create_pool",
+                       new_callable=AsyncMock, return_value=FakePool()) as create_pool:
+                with patch.object(connection.settings, "DB_POOL_MAX_SIZE", 17):
+                    await connection.connect_to_db()
+
+        kwargs = create_pool.call_args.kwargs
+        assert kwargs["max_size"] == 17
+        assert kwargs["min_size"] == connection.settings.DB_POOL_MIN_SIZE
+        assert kwargs["statement_cache_size"] == connection.settings.DB_STATEMENT_CACHE_SIZE
+        assert kwargs["init"] is connection._init_connection
+
+    @pytest.mark.asyncio
+    async def test_get_db_does_not_register_vector(self):
+        """Test that acquiring a connection makes no type-introspection round trip."""
+        from backend.app.database import connection
+
+        pool = FakePool()
+        with patch.object(connection, "_db_pool", pool):
+            with patch("backend.app.database.connection.register_vector",
+                       new_callable=AsyncMock) as register:
+                dependency = connection.get_db()
+                conn = await dependency.__anext__()
+                assert conn is pool.conn
+                assert pool.in_use
+                with pytest.raises(StopAsyncIteration):
+                    await dependency.__anext__()
+
+        register.assert_not_called()
+        assert not pool.in_use
+        assert pool.acquire_timeouts == [connection.settings.DB_POOL_ACQUIRE_TIMEOUT]
+
+    @pytest.mark.asyncio
+    async def test_init_registers_vector(self):
+        """Test that pgvector is registered once, when a connection is opened."""
+        from backend.app.database import connection
+
+        conn = MagicMock()
+        with patch("backend.app.database.connection.register_vector",
+                   new_callable=AsyncMock) as register:
+            await connection._init_connection(conn)
+
+        register.assert_awaited_once_with(conn)
+
+    @pytest.mark.asyncio
+    async def test_get_db_records_pool_metrics(self):
+        """Test that acquire time and in-use connections are recorded."""
+        from backend.app.database import connection
+        from backend.app.metrics import DB_POOL_ACQUIRE_TIME, DB_POOL_CONNECTIONS, DB_POOL_WAITING
+
+        def acquire_count():
+            for metric in DB_POOL_ACQUIRE_TIME.collect():
+                for sample in metric.samples:
+                    if sample.name.endswith("_count"):
+                        return sample.value
+
+        before = acquire_count()
+        with patch.object(connection, "_db_pool", FakePool()):
+            dependency = connection.get_db()
+            await dependency.__anext__()
+            assert DB_POOL_CONNECTIONS.labels(state="in_use")._value.get() == 1
+            await dependency.aclose()
+
+        assert acquire_count() == before + 1
+        assert DB_POOL_CONNECTIONS.labels(state="in_use")._value.get() == 0
+        assert DB_POOL_WAITING._value.get() == 0
+
+
+@pytest.mark.unit
+class TestQueries:
+    """Tests for the named statements in backend.app.database.queries."""
+
+    @pytest.mark.asyncio
+    async def test_list_wardrobe_items_text_is_stable(self):
+        """Test that the same filters always produce the same (cacheable) query text."""
+        from backend.app.database import queries
+
+        db = AsyncMock()
+        await queries.list_wardrobe_items(db, ["item_id"], 11, after_item_id=5, metadata_contains={"colors": ["red"]})
+        await queries.list_wardrobe_items(db, ["item_id"], 21, after_item_id=9, metadata_contains={"colors": ["blue"]})
+
+        first, second = db.fetch.call_args_list
+        assert first.args[0] == second.args[0]
+        assert "item_id < $1" in first.args[0] and "metadata @> $2::jsonb" in first.args[0]
+        assert second.args[1:] == (9, '{"colors": ["blue"]}', 21)
+
+    @pytest.mark.asyncio
+    async def test_update_saved_outfit_sets_given_columns_in_fixed_order(self):
+        """Test that columns appear in a fixed order with outfit_id last."""
+        from backend.app.database import queries
+
+        db = AsyncMock()
+        assert await queries.update_saved_outfit(db, "o1", items=[1, 2], name="Work")
+
+        query, *args = db.execute.call_args.args
+        assert query == "UPDATE saved_outfits SET name = $1, items = $2 WHERE outfit_id = $3"
+        assert args == ["Work", [1, 2], "o1"]
+
+    @pytest.mark.asyncio
+    async def test_update_saved_outfit_without_values_is_a_no_op(self):
+        """Test that nothing is sent when no column is given."""
+        from backend.app.database import queries
+
+        db = AsyncMock()
+        assert not await queries.update_saved_outfit(db, "o1", name=None)
+        db.execute.assert_not_called()
+
+        with pytest.raises(ValueError):
+            await queries.update_saved_outfit(db, "o1", created_at="now")
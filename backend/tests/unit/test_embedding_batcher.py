@@ -0,0 +1,71 @@
+"""
+Unit tests for the embedding micro-batching queue.
+"""
+
+import asyncio
+import pytest
+import numpy as np
+
+
+def fake_embed_batch(calls):
+    """Embed each 'image' (an int) as a vector filled with it, recording batch sizes."""
+    def embed_batch(images):
+        calls.append(len(images))
+        return np.stack([np.full(4, image, dtype=np.float32) for image in images])
+    return embed_batch
+
+
+@pytest.mark.unit
+class TestEmbeddingBatcher:
+    """Tests for EmbeddingBatcher."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_a_batch(self):
+        """Test that concurrent requests run in one forward pass and get their own result."""
+        from backend.app.services.embedding_batcher import EmbeddingBatcher
+
+        calls = []
+        batcher = EmbeddingBatcher(fake_embed_batch(calls), max_batch_size=16, max_wait_ms=50)
+
+        results = await asyncio.gather(*(batcher.embed(i) for i in range(8)))
+        await batcher.close()
+
+        assert calls == [8]
+        for i, vector in enumerate(results):
+            assert np.array_equal(vector, np.full(4, i, dtype=np.float32))
+
+    @pytest.mark.asyncio
+    async def test_batches_are_capped_at_max_batch_size(self):
+        """Test that a burst is split into batches of at most max_batch_size."""
+        from backend.app.services.embedding_batcher import EmbeddingBatcher
+
+        calls = []
+        batcher = EmbeddingBatcher(fake_embed_batch(calls), max_batch_size=4, max_wait_ms=50)
+
+        results = await asyncio.gather(*(batcher.embed(i) for i in range(10)))
+        await batcher.close()
+
+        assert max(calls) <= 4
+        assert sum(calls) == 10
+        assert [int(v[0]) for v in results] == list(range(10))
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_reaches_every_caller(self):
+        """Test that a failed forward pass raises in each waiting request."""
+        from backend.app.services.embedding_batcher import EmbeddingBatcher
+
+        def failing_embed_batch(images):
+            raise ValueError("bad image")
+
+        batcher = EmbeddingBatcher(failing_embed_batch, max_wait_ms=10)
+
+        results = await asyncio.gather(
+            batcher.embed(1), batcher.embed(2), return_exceptions=True
+        )
+        # The collector survives and serves later requests
+        batcher.embed_batch = fake_embed_batch([])
+        later = await batcher.embed(3)
+        await batcher.close()
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert later[0] == 3
@@ -0,0 +1,72 @@
+"""
+Unit tests for the content-hash embedding cache.
+"""
+
+import pytest
+import numpy as np
+from PIL import Image
+
+
+@pytest.mark.unit
+class TestImageCacheKey:
+    """Tests for image_cache_key."""
+
+    def test_key_depends_on_pixels_and_model_version(self, sample_pil_image):
+        """Test that identical images share a key and any change alters it."""
+        from backend.app.services.embedding_cache import image_cache_key
+
+        same = Image.new("RGB", (224, 224), color="blue")
+        other = Image.new("RGB", (224, 224), color="red")
+
+        assert image_cache_key(sample_pil_image, "v1") == image_cache_key(same, "v1")
+        assert image_cache_key(sample_pil_image, "v1") != image_cache_key(other, "v1")
+        assert image_cache_key(sample_pil_image, "v1") != image_cache_key(sample_pil_image, "v2")
+
+
+@pytest.mark.unit
+class TestEmbeddingCache:
+    """Tests for EmbeddingCache."""
+
+    def test_memory_tier_evicts_least_recently_used(self, mock_embedding_vector):
+        """Test that the LRU keeps the most recently used entries."""
+        from backend.app.services.embedding_cache import EmbeddingCache
+
+        cache = EmbeddingCache(max_entries=2, directory=None)
+        cache.put("a", mock_embedding_vector)
+        cache.put("b", mock_embedding_vector)
+        cache.get("a")
+        cache.put("c", mock_embedding_vector)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert np.array_equal(cache.get("c"), mock_embedding_vector)
+
+    def test_disk_tier_survives_a_new_cache(self, tmp_path, mock_embedding_vector):
+        """Test that vectors persisted to disk are found by a fresh instance."""
+        from backend.app.services.embedding_cache import EmbeddingCache
+
+        EmbeddingCache(directory=str(tmp_path)).put("abcdef", mock_embedding_vector)
+        fresh = EmbeddingCache(directory=str(tmp_path))
+
+        vector = fresh.get("abcdef")
+
+        assert np.array_equal(vector, mock_embedding_vector)
+        assert not vector.flags.writeable
+        assert fresh.get("missing") is None
+
+    def test_lookups_are_counted(self, mock_embedding_vector):
+        """Test that hits and misses feed the hit-ratio counter."""
+        from backend.app.metrics import EMBEDDING_CACHE_LOOKUPS
+        from backend.app.services.embedding_cache import EmbeddingCache
+
+        def count(result):
+            return EMBEDDING_CACHE_LOOKUPS.labels(result=result)._value.get()
+
+        hits, misses = count("memory_hit"), count("miss")
+        cache = EmbeddingCache(directory=None)
+        cache.get("k")
+        cache.put("k", mock_embedding_vector)
+        cache.get("k")
+
+        assert count("miss") == misses + 1
+        assert count("memory_hit") == hits + 1
@@ -14,7 +14,7 @@ class TestComputeEmbedding:
 
     def test_compute_embedding_returns_2048_dims(self, sample_pil_image, mock_embedding_vector):
         """Test that compute_embedding returns a 2048-D vector."""
-        with patch('backend.app.services.embedding_service.embedding_model') as mock_model:
+        with patch('backend.app.services.embedding_service.inference_model') as mock_model:
             with patch('backend.app.services.embedding_service.ML_INFERENCE_TIME') as mock_time:
                 import torch
 
@@ -31,6 +31,22 @@ class TestComputeEmbedding:
                 assert result.shape == (2048,)
 
 
+    def test_cache_key_does_not_load_model(self, sample_pil_image):
+        """Test that embedding cache keys are built without loading the model."""
+        from backend.app.services import embedding_service
+
+        with patch('backend.app.services.embedding_service.load_embedding_model') as mock_load:
+            with patch.object(embedding_service.settings, 'EMBEDDING_INFERENCE_BACKEND', 'eager'):
+                eager_key, _ = embedding_service._cache_lookup(sample_pil_image)
+                assert embedding_service.embedding_model_version() == embedding_service.EMBEDDING_MODEL_VERSION
+            with patch.object(embedding_service.settings, 'EMBEDDING_INFERENCE_BACKEND', 'int8'):
+                int8_key, _ = embedding_service._cache_lookup(sample_pil_image)
+                assert embedding_service.embedding_model_version().endswith('-int8')
+
+        mock_load.assert_not_called()
+        assert eager_key != int8_key
+
+
 @pytest.mark.unit
 class TestClassifyImage:
     """Tests for classify_image function."""
@@ -58,6 +74,38 @@ class TestClassifyImage:
                     assert result["nearest_index"] == 42
 
 
+@pytest.mark.unit
+class TestClassifyImagesAsync:
+    """Tests for the bulk classify_images_async path."""
+
+    @pytest.mark.asyncio
+    async def test_classifies_all_images_with_one_batch_prediction(self, sample_pil_image, mock_embedding_vector):
+        """Test that N images are labelled by a single predict_batch call."""
+        engine = MagicMock()
+        engine.predict_batch.return_value = {
+            "labels": np.array(["Dress", "Bag", "Coat"]),
+            "confidences": np.array([0.9, 0.8, 0.7]),
+            "top_k": {
+                "labels": np.array([["Dress", "Coat"], ["Bag", "Sandal"], ["Coat", "Dress"]]),
+                "confidences": np.array([[0.9, 0.1], [0.8, 0.2], [0.7, 0.3]]),
+            },
+        }
+        with patch('backend.app.services.embedding_service.compute_embedding_async',
+                   new_callable=AsyncMock, return_value=mock_embedding_vector):
+            with patch('backend.app.services.embedding_service.get_classification_engine', return_value=engine):
+                from backend.app.services.embedding_service import classify_images_async
+
+                results = await classify_images_async([sample_pil_image] * 3, top_k=2)
+
+        engine.predict_batch.assert_called_once()
+        assert engine.predict_batch.call_args.args[0].shape == (3, 2048)
+        assert [r["label"] for r in results] == ["Dress", "Bag", "Coat"]
+        assert results[1]["top_k"] == [
+            {"label": "Bag", "confidence": 0.8}, {"label": "Sandal", "confidence": 0.2}
+        ]
+        assert np.array_equal(results[0]["embedding"], mock_embedding_vector)
+
+
 @pytest.mark.unit
 class TestFindSimilarItems:
     """Tests for find_similar_items function."""
@@ -0,0 +1,72 @@
+"""
+Unit tests for the executor pools.
+"""
+
+import asyncio
+import threading
+import pytest
+
+
+def in_flight(pool: str) -> float:
+    from backend.app.metrics import EXECUTOR_TASKS_IN_FLIGHT
+    return EXECUTOR_TASKS_IN_FLIGHT.labels(pool=pool)._value.get()
+
+
+@pytest.mark.unit
+class TestBoundedExecutor:
+    """Tests for BoundedExecutor."""
+
+    @pytest.mark.asyncio
+    async def test_run_executes_off_the_event_loop(self):
+        """Test that calls run on a pool thread and return their result."""
+        from backend.app.services.executors import BoundedExecutor
+
+        executor = BoundedExecutor("test-run", max_workers=2)
+        loop_thread = threading.get_ident()
+
+        result, thread = await executor.run(lambda x, y=0: (x + y, threading.get_ident()), 2, y=3)
+        executor.shutdown()
+
+        assert result == 5
+        assert thread != loop_thread
+        assert in_flight("test-run") == 0
+
+    @pytest.mark.asyncio
+    async def test_run_propagates_exceptions(self):
+        """Test that exceptions reach the caller and in-flight tasks are released."""
+        from backend.app.services.executors import BoundedExecutor
+
+        def fail():
+            raise ValueError("boom")
+
+        executor = BoundedExecutor("test-fail", max_workers=1)
+        with pytest.raises(ValueError, match="boom"):
+            await executor.run(fail)
+        executor.shutdown()
+
+        assert in_flight("test-fail") == 0
+
+    @pytest.mark.asyncio
+    async def test_in_flight_tracks_saturation(self):
+        """Test that queued and running tasks count as in flight."""
+        from backend.app.services.executors import BoundedExecutor
+
+        executor = BoundedExecutor("test-busy", max_workers=1)
+        release = threading.Event()
+
+        tasks = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        busy = in_flight("test-busy")
+        release.set()
+        await asyncio.gather(*tasks)
+        executor.shutdown()
+
+        assert busy == 3
+        assert in_flight("test-busy") == 0
+
+    def test_unknown_kind_raises_error(self):
+        """Test that an unknown pool kind is rejected."""
+        from backend.app.services.executors import BoundedExecutor
+
+        with pytest.raises(ValueError, match="Unknown executor kind"):
+            BoundedExecutor("test-bad", max_workers=1, kind="fiber")
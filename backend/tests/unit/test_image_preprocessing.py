@@ -0,0 +1,97 @@
+"""
+Unit tests for image decoding and ResNet50 preprocessing.
+"""
+
+import io
+import pytest
+import numpy as np
+from PIL import Image
+
+
+def encode(image: Image.Image, fmt: str) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def textured_image(width: int, height: int, seed: int = 0) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    rgb = np.stack([x * 200 // width, y * 200 // height, (x + y) * 100 // (width + height)], axis=-1)
+    rgb = rgb + rng.integers(0, 56, size=rgb.shape)
+    return Image.fromarray(rgb.astype(np.uint8))
+
+
+@pytest.mark.unit
+class TestDecodeImage:
+    """Tests for decode_image."""
+
+    def test_large_jpeg_is_decoded_at_reduced_size(self):
+        """Test that draft mode shrinks a large JPEG but never below the model input."""
+        from backend.app.services.image_preprocessing import INPUT_SIZE, decode_image
+
+        image = decode_image(encode(textured_image(2000, 1500), "JPEG"))
+
+        assert image.mode == "RGB"
+        assert image.size == (500, 375)
+        assert min(image.size) >= INPUT_SIZE
+
+    def test_png_is_decoded_at_full_size(self):
+        """Test that non-JPEG images are decoded normally."""
+        from backend.app.services.image_preprocessing import decode_image
+
+        image = decode_image(encode(Image.new("RGBA", (640, 480)), "PNG"))
+
+        assert image.mode == "RGB"
+        assert image.size == (640, 480)
+
+
+@pytest.mark.unit
+class TestPreprocessImages:
+    """Tests for preprocess_images and ImagePreprocessor."""
+
+    def test_matches_torchvision_transforms(self):
+        """Test that batched normalization equals Resize + ToTensor + Normalize."""
+        import torch
+        from torchvision import transforms
+        from backend.app.services.image_preprocessing import preprocess_images
+
+        images = [textured_image(300, 200, seed=1), textured_image(224, 224, seed=2)]
+        reference = transforms.Compose([
+            transforms.Resize((224, 224)),
+            transforms.ToTensor(),
+            transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+        ])
+        expected = torch.stack([reference(image) for image in images]).numpy()
+
+        batch = preprocess_images(images)
+
+        assert batch.shape == (2, 3, 224, 224)
+        assert batch.dtype == np.float32
+        np.testing.assert_allclose(batch, expected, atol=1e-5)
+
+    def test_draft_decode_stays_close_to_full_decode(self):
+        """Test that reduced-size decoding barely changes the model input."""
+        from backend.app.services.image_preprocessing import decode_image, preprocess_images
+
+        contents = encode(textured_image(2000, 1500), "JPEG")
+        full = preprocess_images([Image.open(io.BytesIO(contents)).convert("RGB")])
+
+        draft = preprocess_images([decode_image(contents)])
+
+        assert np.abs(draft - full).mean() < 0.02
+
+    def test_buffers_are_reused_per_thread(self, sample_pil_image):
+        """Test that repeated batches write into the same preallocated buffer."""
+        from backend.app.services.image_preprocessing import ImagePreprocessor
+
+        preprocessor = ImagePreprocessor()
+        first = preprocessor([sample_pil_image, sample_pil_image])
+        pointer = first.data_ptr()
+
+        second = preprocessor([sample_pil_image])
+        larger = preprocessor([sample_pil_image] * 3)
+
+        assert second.data_ptr() == pointer
+        assert second.shape == (1, 3, 224, 224)
+        assert larger.shape == (3, 3, 224, 224)
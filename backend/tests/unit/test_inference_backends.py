@@ -0,0 +1,129 @@
+"""
+Unit tests for the ResNet50 inference backends.
+"""
+
+import pytest
+
+
+def small_model():
+    """A small conv net shaped like the headless ResNet (N, C, 1, 1 output)."""
+    import torch
+    import torch.nn as nn
+
+    torch.manual_seed(0)
+    model = nn.Sequential(
+        nn.Conv2d(3, 16, 3, padding=1),
+        nn.BatchNorm2d(16),
+        nn.ReLU(),
+        nn.Conv2d(16, 32, 3, stride=2, padding=1),
+        nn.ReLU(),
+        nn.AdaptiveAvgPool2d(1),
+    )
+    return model.eval()
+
+
+def sample_inputs():
+    import torch
+
+    return torch.rand(8, 3, 32, 32, generator=torch.Generator().manual_seed(1))
+
+
+@pytest.mark.unit
+class TestInferenceBackends:
+    """Tests for building and checking inference backends."""
+
+    @pytest.mark.parametrize("backend,min_cosine", [
+        ("eager", 1.0),
+        ("channels_last", 0.9999),
+        ("torchscript", 0.9999),
+        ("int8", 0.99),
+    ])
+    def test_backend_agrees_with_fp32(self, backend, min_cosine):
+        """Test that each backend's embeddings match the fp32 model."""
+        from backend.app.services.inference_backends import (
+            build_inference_model,
+            embedding_agreement,
+        )
+
+        model, inputs = small_model(), sample_inputs()
+
+        built = build_inference_model(model, backend, inputs)
+        agreement = embedding_agreement(model, built, inputs)
+
+        assert agreement["min"] >= min_cosine - 1e-6
+        assert agreement["mean"] >= agreement["min"]
+
+    def test_low_agreement_falls_back_to_eager(self):
+        """Test that a backend below the agreement threshold is not used."""
+        from backend.app.metrics import EMBEDDING_MODEL_AGREEMENT
+        from backend.app.services.inference_backends import select_inference_model
+
+        model, inputs = small_model(), sample_inputs()
+
+        selected, backend = select_inference_model(model, "int8", inputs, min_agreement=1.01)
+
+        assert backend == "eager"
+        assert selected is model
+        assert EMBEDDING_MODEL_AGREEMENT.labels(backend="int8")._value.get() < 1.01
+
+    def test_selected_backend_is_used_when_it_agrees(self):
+        """Test that an agreeing backend replaces the eager model."""
+        from backend.app.services.inference_backends import select_inference_model
+
+        model, inputs = small_model(), sample_inputs()
+
+        selected, backend = select_inference_model(model, "channels_last", inputs, min_agreement=0.99)
+
+        assert backend == "channels_last"
+        assert selected is not model
+
+    def test_int8_without_real_images_falls_back_to_eager(self):
+        """Test that int8 is never calibrated on synthetic noise."""
+        from unittest.mock import patch
+        from backend.app.services.inference_backends import select_inference_model
+
+        model = small_model()
+        with patch('backend.app.services.inference_backends.build_inference_model') as mock_build:
+            assert select_inference_model(model, "int8", None, min_agreement=0.99) == (model, "eager")
+            assert select_inference_model(model, "int8", sample_inputs()[:4], min_agreement=0.99) == (model, "eager")
+
+        mock_build.assert_not_called()
+
+    def test_agreement_is_checked_on_held_out_images(self):
+        """Test that calibration and the agreement check use disjoint images."""
+        from unittest.mock import patch
+        from backend.app.services.inference_backends import select_inference_model
+
+        model, inputs = small_model(), sample_inputs()
+        with patch('backend.app.services.inference_backends.build_inference_model',
+                   return_value=model) as mock_build:
+            with patch('backend.app.services.inference_backends.embedding_agreement',
+                       return_value={"min": 1.0, "mean": 1.0}) as mock_agreement:
+                select_inference_model(model, "int8", inputs, min_agreement=0.99)
+
+        calibration = mock_build.call_args.args[2]
+        holdout = mock_agreement.call_args.args[2]
+        assert len(calibration) + len(holdout) == len(inputs)
+        assert len(holdout) >= 2
+        assert all(not any((image == seen).all() for seen in calibration) for image in holdout)
+
+    def test_calibration_batch_reads_real_images_only(self, tmp_path):
+        """Test that sample images are loaded from the directory, and None without any."""
+        from PIL import Image
+        from backend.app.services.inference_backends import calibration_batch
+
+        assert calibration_batch("") is None
+        assert calibration_batch(str(tmp_path)) is None
+
+        for i in range(3):
+            Image.new("RGB", (300, 260), (i * 80, 10, 200)).save(tmp_path / f"{i}.jpg")
+        batch = calibration_batch(str(tmp_path))
+
+        assert tuple(batch.shape) == (3, 3, 224, 224)
+
+    def test_unknown_backend_raises_error(self):
+        """Test that an unknown backend name is rejected."""
+        from backend.app.services.inference_backends import build_inference_model
+
+        with pytest.raises(ValueError, match="Unknown inference backend"):
+            build_inference_model(small_model(), "tensorrt", sample_inputs())
@@ -0,0 +1,176 @@
+"""
+Unit tests for the outfit recommender.
+"""
+
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+
+
+def make_recommender():
+    """Build an OutfitRecommender without loading the engine from disk."""
+    from backend.app.recommendations.recommender import OutfitRecommender
+    from backend.app.recommendations.snapshot import WardrobeCache
+
+    recommender = OutfitRecommender.__new__(OutfitRecommender)
+    recommender.engine = MagicMock()
+    recommender.wardrobe_cache = WardrobeCache()
+    return recommender
+
+
+def make_wardrobe(n_per_category=6, dim=32, seed=0):
+    """Random wardrobe rows shaped like the wardrobe_items/embeddings join."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    item_id = 1
+    for category in ["top", "bottom", "shoes", "outerwear", "accessory"]:
+        for _ in range(n_per_category):
+            rows.append({
+                "item_id": item_id,
+                "category": category,
+                "metadata": {"occasions": ["casual"], "season": ["summer"]},
+                "embedding": rng.standard_normal(dim).astype(np.float32),
+            })
+            item_id += 1
+    return rows
+
+
+def reference_best_match(candidate_ids, embeddings, outfit_emb, used_set, threshold):
+    """The original per-item scan, kept here to pin down selection semantics."""
+    def score(item_id):
+        item_emb = embeddings[item_id]
+        return np.dot(outfit_emb, item_emb) / (
+            np.linalg.norm(outfit_emb) * np.linalg.norm(item_emb) + 1e-8
+        )
+
+    best_id, best_score = None, 0
+    for item_id in candidate_ids:
+        if item_id in used_set:
+            continue
+        similarity = score(item_id)
+        if similarity > best_score and similarity >= threshold:
+            best_id, best_score = item_id, similarity
+
+    if best_id is None and len(used_set) >= len(candidate_ids) and candidate_ids:
+        for item_id in candidate_ids:
+            similarity = score(item_id)
+            if similarity > best_score and similarity >= threshold:
+                best_id, best_score = item_id, similarity
+
+    return best_id, best_score
+
+
+@pytest.mark.unit
+class TestCandidateMatrix:
+    """Tests for the vectorized slot matcher."""
+
+    @pytest.mark.parametrize("threshold", [0.0, 0.1, 0.3])
+    def test_best_match_matches_reference_scan(self, threshold):
+        """Test that repeated picks match the original loop, including reuse."""
+        from backend.app.recommendations.recommender import CandidateMatrix
+
+        rng = np.random.default_rng(1)
+        ids = list(range(10, 18))
+        embeddings = {i: rng.standard_normal(16).astype(np.float32) for i in ids}
+        matrix = CandidateMatrix(ids, np.vstack([embeddings[i] for i in ids]))
+
+        used = set()
+        for _ in range(20):
+            query = rng.standard_normal(16).astype(np.float32)
+            expected_id, expected_score = reference_best_match(
+                ids, embeddings, query, used, threshold
+            )
+            best_id, best_score = matrix.best_match(query, threshold)
+
+            assert best_id == expected_id
+            assert np.isclose(best_score, expected_score, atol=1e-5)
+            if best_id is not None:
+                used.add(best_id)
+                matrix.mark_used(best_id)
+
+    @pytest.mark.parametrize("case", ["tie", "threshold", "zero_query", "tiny_norms"])
+    def test_best_match_boundary_cases_match_reference_scan(self, case):
+        """Test ties, exact-threshold scores and degenerate norms against the original loop."""
+        from backend.app.recommendations.recommender import CandidateMatrix
+
+        query = np.array([1.0, 0.0, 0.0, 0.0])
+        threshold = 0.3
+        rows = [[0.2, 1.0, 0.0, 0.0], [0.5, 0.5, 0.0, 0.0], [0.5, 0.5, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0]]
+        if case == "threshold":
+            # Exactly aligned: the epsilon keeps the score just under 1.0
+            threshold = 1.0
+            rows = [[3.0, 0.0, 0.0, 0.0], [0.9, 0.1, 0.0, 0.0]]
+        elif case == "zero_query":
+            query = np.zeros(4)
+        elif case == "tiny_norms":
+            rows = [[1e-9, 0.0, 0.0, 0.0], [1e-3, 1e-3, 0.0, 0.0]]
+
+        ids = list(range(1, len(rows) + 1))
+        embeddings = {i: np.asarray(row) for i, row in zip(ids, rows)}
+        matrix = CandidateMatrix(ids, np.vstack(rows))
+
+        expected_id, expected_score = reference_best_match(ids, embeddings, query, set(), threshold)
+        best_id, best_score = matrix.best_match(query, threshold)
+
+        assert best_id == expected_id
+        assert best_score == pytest.approx(expected_score, abs=1e-12)
+
+    def test_best_match_empty_candidates(self):
+        """Test that an empty slot returns no match."""
+        from backend.app.recommendations.recommender import CandidateMatrix
+
+        matrix = CandidateMatrix([], np.zeros((0, 4), dtype=np.float32))
+
+        assert not matrix
+        assert matrix.best_match(np.ones(4, dtype=np.float32), 0.3) == (None, 0)
+
+
+@pytest.mark.unit
+class TestRecommendOutfits:
+    """Tests for OutfitRecommender.recommend_outfits."""
+
+    @pytest.mark.asyncio
+    async def test_recommend_outfits_builds_full_outfits(self, mock_db_connection):
+        """Test that each top gets a bottom and outfits are sorted by score."""
+        mock_db_connection.fetch.return_value = make_wardrobe()
+
+        outfits = await make_recommender().recommend_outfits("casual", "summer", mock_db_connection)
+
+        assert 0 < len(outfits) <= 5
+        scores = [o["score"] for o in outfits]
+        assert scores == sorted(scores, reverse=True)
+        for outfit in outfits:
+            assert outfit["items"][0] in range(1, 7)   # top
+            assert outfit["items"][1] in range(7, 13)  # bottom
+
+    @pytest.mark.asyncio
+    async def test_recommend_outfits_skips_catalog_search(self, mock_db_connection):
+        """Test that generating outfits doesn't search the catalog index."""
+        mock_db_connection.fetch.return_value = make_wardrobe()
+        recommender = make_recommender()
+
+        await recommender.recommend_outfits("casual", "summer", mock_db_connection)
+
+        recommender.engine.recommend.assert_not_called()
+        recommender.engine.recommend_batch.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_recommend_outfits_empty_wardrobe(self, mock_db_connection):
+        """Test that an empty wardrobe yields no outfits."""
+        mock_db_connection.fetch.return_value = []
+
+        outfits = await make_recommender().recommend_outfits("casual", "summer", mock_db_connection)
+
+        assert outfits == []
+
+    @pytest.mark.asyncio
+    async def test_recommend_outfits_reuses_snapshot(self, mock_db_connection):
+        """Test that repeated calls hit the wardrobe snapshot instead of the DB."""
+        mock_db_connection.fetch.return_value = make_wardrobe()
+        recommender = make_recommender()
+
+        first = await recommender.recommend_outfits("casual", "summer", mock_db_connection)
+        second = await recommender.recommend_outfits("casual", "summer", mock_db_connection)
+
+        assert first == second
+        mock_db_connection.fetch.assert_called_once()
@@ -0,0 +1,101 @@
+"""
+Unit tests for nearest-neighbour classification over reference embeddings.
+"""
+
+import pytest
+import numpy as np
+
+
+def reference_data(n=500, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((n, dim)).astype(np.float32)
+    labels = rng.integers(0, 10, size=n)
+    return embeddings, labels
+
+
+def brute_force_cosine(query, embeddings):
+    """The original per-request computation."""
+    a_norm = query / np.linalg.norm(query)
+    b_norm = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return np.dot(b_norm, a_norm)
+
+
+@pytest.mark.unit
+class TestReferenceIndex:
+    """Tests for ReferenceIndex."""
+
+    @pytest.mark.parametrize("dtype,atol", [("float32", 1e-5), ("float16", 2e-3)])
+    def test_classify_matches_brute_force(self, dtype, atol):
+        """Test that the nearest neighbour and score match the unnormalized scan."""
+        from backend.app.services.reference_index import ReferenceIndex
+
+        embeddings, labels = reference_data()
+        expected = embeddings.copy()
+        index = ReferenceIndex(embeddings, labels, dtype=dtype)
+
+        rng = np.random.default_rng(1)
+        for _ in range(10):
+            query = rng.standard_normal(64).astype(np.float32)
+            sims = brute_force_cosine(query, expected)
+
+            label, confidence, idx = index.classify(query)
+
+            assert np.isclose(confidence, sims.max(), atol=atol)
+            assert np.isclose(sims[idx], sims.max(), atol=atol)
+            assert label == labels[idx]
+
+    def test_search_returns_sorted_top_k(self):
+        """Test that search returns the k most similar rows in order."""
+        from backend.app.services.reference_index import ReferenceIndex
+
+        embeddings, labels = reference_data()
+        query = embeddings[7] + 0.01
+        sims = brute_force_cosine(query, embeddings)
+        index = ReferenceIndex(embeddings.copy(), labels)
+
+        scores, top = index.search(query, k=5)
+
+        assert top[0] == 7
+        assert list(top) == list(np.argsort(-sims)[:5])
+        assert np.all(np.diff(scores) <= 0)
+
+    def test_knn_vote_picks_majority_label(self):
+        """Test that k neighbours outvote a single closer neighbour."""
+        from backend.app.services.reference_index import ReferenceIndex
+
+        query = np.array([1.0, 0.0], dtype=np.float32)
+        embeddings = np.array(
+            [[1.0, 0.0], [0.9, 0.1], [0.9, -0.1], [0.8, 0.2], [-1.0, 0.0]],
+            dtype=np.float32,
+        )
+        labels = np.array(["shirt", "dress", "dress", "dress", "bag"])
+        index = ReferenceIndex(embeddings, labels)
+
+        assert index.classify(query, k=1)[0] == "shirt"
+        label, confidence, idx = index.classify(query, k=4)
+        assert label == "dress"
+        assert idx in (1, 2)
+        assert np.isclose(confidence, 0.9 / np.hypot(0.9, 0.1))
+
+    def test_normalized_input_is_used_without_copy(self):
+        """Test that an already-normalized (e.g. memory-mapped) matrix is not copied."""
+        from RecommendationFiles.reference_store import normalize_rows
+        from backend.app.services.reference_index import ReferenceIndex
+
+        embeddings, labels = reference_data()
+        unit = normalize_rows(embeddings)
+        unit.flags.writeable = False
+
+        index = ReferenceIndex(unit, labels, normalized=True)
+
+        assert index.unit is unit
+        query = embeddings[3]
+        assert index.classify(query)[2] == 3
+
+    def test_mismatched_labels_raise_error(self):
+        """Test that embeddings and labels must line up."""
+        from backend.app.services.reference_index import ReferenceIndex
+
+        embeddings, labels = reference_data()
+        with pytest.raises(ValueError, match="Mismatch"):
+            ReferenceIndex(embeddings, labels[:-1])
@@ -39,10 +39,50 @@ class TestUploadFileToS3:
                         mock_s3_client.put_object.assert_called_once()
 
 
+@pytest.mark.unit
+class TestDeleteFilesFromS3:
+    """Tests for delete_files_from_s3 function."""
+
+    @pytest.mark.asyncio
+    async def test_delete_groups_keys_by_bucket(self, mock_s3_client):
+        """Test that one DeleteObjects call is made per bucket."""
+        mock_s3_client.delete_objects.return_value = {"Deleted": []}
+        with patch('backend.app.services.s3_service.s3', mock_s3_client):
+            from backend.app.services.s3_service import delete_files_from_s3
+
+            await delete_files_from_s3([
+                "s3://images/wardrobe/a.jpg", "s3://images/wardrobe/b.jpg", "s3://docs/x.pdf", "not-s3",
+            ])
+
+        calls = {c.kwargs["Bucket"]: c.kwargs["Delete"]["Objects"] for c in mock_s3_client.delete_objects.call_args_list}
+        assert calls == {
+            "images": [{"Key": "wardrobe/a.jpg"}, {"Key": "wardrobe/b.jpg"}],
+            "docs": [{"Key": "x.pdf"}],
+        }
+
+    @pytest.mark.asyncio
+    async def test_delete_raises_on_per_key_errors(self, mock_s3_client):
+        """Test that keys S3 could not delete are reported."""
+        mock_s3_client.delete_objects.return_value = {"Errors": [{"Key": "a.jpg", "Code": "AccessDenied"}]}
+        with patch('backend.app.services.s3_service.s3', mock_s3_client):
+            from backend.app.services.s3_service import delete_files_from_s3
+
+            with pytest.raises(RuntimeError, match="AccessDenied"):
+                await delete_files_from_s3(["s3://images/a.jpg"])
+
+
 @pytest.mark.unit
 class TestGetPresignedUrl:
     """Tests for get_presigned_url function."""
 
+    @pytest.fixture(autouse=True)
+    def empty_caches(self):
+        from backend.app.services.s3_service import clear_s3_caches
+
+        clear_s3_caches()
+        yield
+        clear_s3_caches()
+
     def test_get_presigned_url_converts_s3_uri(self, mock_s3_client):
         """Test that S3 URI is converted to presigned URL."""
         with patch('backend.app.services.s3_service.s3', mock_s3_client):
@@ -90,3 +130,70 @@ class TestGetPresignedUrl:
         invalid_uri = "s3://bucket-only"
         result = get_presigned_url(invalid_uri)
         assert result == invalid_uri
+
+    def test_warm_cache_makes_no_s3_calls(self, mock_s3_client):
+        """Test that presigning a 500-item wardrobe again costs zero S3 calls."""
+        from backend.app.services.s3_service import get_presigned_url
+
+        uris = [f"s3://my-bucket/wardrobe/{i}.jpg" for i in range(500)]
+        mock_s3_client.generate_presigned_url.side_effect = (
+            lambda op, Params, ExpiresIn: f"https://signed/{Params['Key']}"
+        )
+        with patch('backend.app.services.s3_service.s3', mock_s3_client):
+            with patch('backend.app.services.s3_service.settings.AWS_REGION', "us-east-1"):
+                cold = [get_presigned_url(uri) for uri in uris]
+                mock_s3_client.reset_mock()
+                warm = [get_presigned_url(uri) for uri in uris]
+
+        assert warm == cold
+        assert cold[7] == "https://signed/wardrobe/7.jpg"
+        mock_s3_client.get_bucket_location.assert_not_called()
+        mock_s3_client.generate_presigned_url.assert_not_called()
+
+    def test_region_resolved_once_and_client_reused(self, mock_s3_client):
+        """Test that a bucket in another region gets one lookup and one client."""
+        from backend.app.services.s3_service import get_presigned_url
+
+        mock_s3_client.get_bucket_location.return_value = {"LocationConstraint": "eu-west-1"}
+        with patch('backend.app.services.s3_service.s3', mock_s3_client):
+            with patch('backend.app.services.s3_service.settings.AWS_REGION', "us-east-1"):
+                with patch('backend.app.services.s3_service.boto3') as mock_boto3:
+                    mock_boto3.client.return_value.generate_presigned_url.return_value = "https://eu/x"
+                    for i in range(5):
+                        assert get_presigned_url(f"s3://eu-bucket/{i}.jpg") == "https://eu/x"
+
+        mock_s3_client.get_bucket_location.assert_called_once_with(Bucket="eu-bucket")
+        mock_boto3.client.assert_called_once()
+        assert mock_boto3.client.call_args.kwargs["region_name"] == "eu-west-1"
+        assert mock_boto3.client.return_value.generate_presigned_url.call_count == 5
+
+    def test_cached_url_expires_before_the_url_does(self):
+        """Test that entries are dropped margin seconds before the URL expires."""
+        from backend.app.services.s3_service import PresignedUrlCache
+
+        now = [0.0]
+        cache = PresignedUrlCache(max_entries=2, margin=600, clock=lambda: now[0])
+        cache.put("b", "k", 3600, "https://url")
+
+        now[0] = 2999
+        assert cache.get("b", "k", 3600) == "https://url"
+        assert cache.get("b", "k", 60) is None  # different expiration
+        now[0] = 3000
+        assert cache.get("b", "k", 3600) is None
+
+        cache.put("b", "short", 300, "https://short")  # shorter than the margin
+        assert cache.get("b", "short", 300) is None
+
+    def test_cache_evicts_least_recently_used(self):
+        """Test that the cache stays within max_entries."""
+        from backend.app.services.s3_service import PresignedUrlCache
+
+        cache = PresignedUrlCache(max_entries=2, margin=0)
+        cache.put("b", "1", 3600, "u1")
+        cache.put("b", "2", 3600, "u2")
+        cache.get("b", "1", 3600)
+        cache.put("b", "3", 3600, "u3")
+
+        assert cache.get("b", "1", 3600) == "u1"
+        assert cache.get("b", "2", 3600) is None
+        assert cache.get("b", "3", 3600) == "u3"
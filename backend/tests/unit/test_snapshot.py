@@ -0,0 +1,125 @@
+"""
+Unit tests for the in-process wardrobe snapshot cache.
+"""
+
+import json
+import pytest
+import numpy as np
+
+
+def wardrobe_rows():
+    """Rows shaped like the wardrobe_items/embeddings join."""
+    return [
+        {
+            "item_id": 1,
+            "category": "Tops",
+            "metadata": json.dumps({"occasions": [" Casual "], "season": "Summer"}),
+            "embedding": np.ones(4, dtype=np.float32),
+        },
+        {
+            "item_id": 2,
+            "category": "bottom",
+            "metadata": None,
+            "embedding": np.arange(4, dtype=np.float32),
+        },
+    ]
+
+
+@pytest.mark.unit
+class TestWardrobeCache:
+    """Tests for loading and patching the wardrobe snapshot."""
+
+    @pytest.mark.asyncio
+    async def test_get_parses_metadata_once(self, mock_db_connection):
+        """Test that rows are parsed into slots and lowercased lists."""
+        from backend.app.recommendations.snapshot import WardrobeCache
+
+        mock_db_connection.fetch.return_value = wardrobe_rows()
+        cache = WardrobeCache()
+
+        snapshot = await cache.get(mock_db_connection)
+        again = await cache.get(mock_db_connection)
+
+        assert again is snapshot
+        mock_db_connection.fetch.assert_called_once()
+        assert snapshot.items[1].slot == "top"
+        assert snapshot.items[1].occasions == ["casual"]
+        assert snapshot.items[1].seasons == ["summer"]
+        assert snapshot.items[2].occasions == []
+        assert snapshot.partition("top").item_ids == [1]
+        top = snapshot.partition("top")
+        assert top.embeddings.dtype == np.float64
+        assert np.isclose(top.norms[0], np.linalg.norm(top.embeddings[0]))
+
+    @pytest.mark.asyncio
+    async def test_writes_patch_snapshot(self, mock_db_connection):
+        """Test that upload, patch and delete update the cached partitions."""
+        from backend.app.recommendations.snapshot import WardrobeCache
+
+        mock_db_connection.fetch.return_value = wardrobe_rows()
+        cache = WardrobeCache()
+        snapshot = await cache.get(mock_db_connection)
+        assert snapshot.partition("bottom").item_ids == [2]
+
+        cache.upsert_item(3, "bottoms", [1.0, 0.0, 0.0, 0.0])
+        assert snapshot.partition("bottom").item_ids == [2, 3]
+
+        cache.update_item(2, "shoes", {"occasions": ["formal"]})
+        assert snapshot.partition("bottom").item_ids == [3]
+        assert snapshot.partition("shoes").item_ids == [2]
+        assert snapshot.items[2].occasions == ["formal"]
+
+        cache.remove_item(3)
+        assert snapshot.partition("bottom").item_ids == []
+
+        cache.clear()
+        assert len(await cache.get(mock_db_connection)) == 0
+        mock_db_connection.fetch.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_expired_snapshot_reloads(self, mock_db_connection):
+        """Test that a snapshot older than the TTL is reloaded from the DB."""
+        from backend.app.recommendations.snapshot import WardrobeCache
+
+        mock_db_connection.fetch.return_value = wardrobe_rows()
+        cache = WardrobeCache(ttl=0)
+
+        await cache.get(mock_db_connection)
+        await cache.get(mock_db_connection)
+
+        assert mock_db_connection.fetch.call_count == 2
+
+
+@pytest.mark.unit
+class TestOccasionSeasonIndex:
+    """Tests for the occasion/season inverted index."""
+
+    def make_snapshot(self):
+        from backend.app.recommendations.snapshot import WardrobeItem, WardrobeSnapshot
+
+        emb = np.ones(4, dtype=np.float32)
+        return WardrobeSnapshot([
+            WardrobeItem(4, "top", {"occasions": ["Any Occasion"], "season": ["winter"]}, emb),
+            WardrobeItem(1, "top", {"occasions": ["casual"], "season": ["summer"]}, emb),
+            WardrobeItem(2, "bottom", {"occasions": ["formal"], "season": ["All-Season"]}, emb),
+            WardrobeItem(3, "shoes", {}, emb),
+        ])
+
+    def test_filter_matches_tokens_and_wildcards(self):
+        """Test exact tokens, wildcards and empty lists all match."""
+        snapshot = self.make_snapshot()
+
+        assert snapshot.filter("Casual", "Summer") == [1, 3]
+        assert snapshot.filter("formal", "winter") == [2, 3, 4]
+        assert snapshot.filter("party", "spring") == [3]
+
+    def test_filter_follows_metadata_updates(self):
+        """Test that patching and removing items updates the index."""
+        snapshot = self.make_snapshot()
+
+        snapshot.update_metadata(1, "top", {"occasions": ["party"], "season": ["spring"]})
+        snapshot.remove(3)
+
+        assert snapshot.filter("casual", "summer") == []
+        assert snapshot.filter("party", "spring") == [1]
+        assert "casual" not in snapshot.occasion_index.postings
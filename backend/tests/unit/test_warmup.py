@@ -0,0 +1,90 @@
+"""
+Unit tests for the startup warm-up and readiness tracking.
+"""
+
+import asyncio
+import pytest
+
+
+@pytest.mark.unit
+class TestModelWarmup:
+    """Tests for ModelWarmup."""
+
+    @pytest.mark.asyncio
+    async def test_ready_after_all_steps_load(self):
+        """Test that readiness waits for every step."""
+        from backend.app.services.warmup import ModelWarmup
+
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+
+        async def fast():
+            pass
+
+        warmup = ModelWarmup({"slow": slow, "fast": fast})
+        warmup.start()
+        await asyncio.sleep(0.01)
+
+        assert not warmup.ready
+        assert warmup.status == {"slow": "loading", "fast": "ready"}
+
+        release.set()
+        await warmup.wait()
+
+        assert warmup.ready
+
+    @pytest.mark.asyncio
+    async def test_failed_step_is_reported_and_not_ready(self):
+        """Test that a failing step is recorded without stopping the others."""
+        from backend.app.services.warmup import ModelWarmup
+
+        async def broken():
+            raise FileNotFoundError("weights missing")
+
+        async def fine():
+            pass
+
+        warmup = ModelWarmup({"broken": broken, "fine": fine})
+        warmup.start()
+        await warmup.wait()
+
+        assert not warmup.ready
+        assert warmup.status == {"broken": "failed", "fine": "ready"}
+        assert warmup.errors == {"broken": "weights missing"}
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_running_warmup(self):
+        """Test that shutdown cancels a warm-up that is still loading."""
+        from backend.app.services.warmup import ModelWarmup
+
+        warmup = ModelWarmup({"hang": lambda: asyncio.sleep(60)})
+        warmup.start()
+        await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(warmup.stop(), timeout=1)
+
+        assert not warmup.ready
+
+    def test_lazy_mode_is_ready_without_starting(self):
+        """Test that with warm-up disabled the worker reports ready immediately."""
+        from backend.app.services.warmup import ModelWarmup
+
+        warmup = ModelWarmup({"model": lambda: asyncio.sleep(0)})
+
+        assert warmup.ready
+        assert warmup.status == {"model": "lazy"}
+
+    def test_importing_the_app_does_not_load_the_ml_stack(self):
+        """Test that torch and faiss are only imported when a model is first used."""
+        import subprocess
+        import sys
+
+        code = (
+            "import sys, backend.app.main; "
+            "print(sorted(m for m in ('torch', 'torchvision', 'faiss', 'sklearn') if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+        assert result.stdout.strip().splitlines()[-1] == "[]"
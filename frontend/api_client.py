@@ -5,7 +5,7 @@ Handles all HTTP requests to the backend API endpoints.
 
 import os
 from io import BytesIO
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import requests
 
@@ -86,6 +86,23 @@ class APIClient:
 
         return self._make_request("POST", "/wardrobe/upload", files=files, params=params)
 
+    def upload_wardrobe_items(
+        self,
+        images: List[Tuple[BytesIO, str]],
+        category: Optional[str] = None
+    ) -> Dict[str, Any]:
+        # Upload several (image_file, filename) pairs in one request; without a
+        # category each item is stored under its predicted label.
+        # The response has a status per file
+        files = []
+        for image_file, filename in images:
+            if hasattr(image_file, 'seek'):
+                image_file.seek(0)
+            files.append(("files", (filename, image_file, "image/jpeg")))
+        params = {"category": category} if category else None
+
+        return self._make_request("POST", "/wardrobe/upload/batch", files=files, params=params)
+
     def predict_image(self, image_file: BytesIO, filename: str) -> Dict[str, Any]:
         # Predict/classify an uploaded image
         if hasattr(image_file, 'seek'):
@@ -120,9 +137,41 @@ class APIClient:
         # Retrieve all saved outfits
         return self._make_request("GET", "/outfits/saved")
 
-    def get_wardrobe_items(self) -> Dict[str, Any]:
-        # Retrieve all wardrobe items from database
-        return self._make_request("GET", "/wardrobe/items")
+    def get_wardrobe_items(
+        self,
+        after_item_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        category: Optional[str] = None,
+        occasion: Optional[Union[str, List[str]]] = None,
+        season: Optional[Union[str, List[str]]] = None,
+        color: Optional[Union[str, List[str]]] = None
+    ) -> Dict[str, Any]:
+        # Retrieve one page of wardrobe items (newest first); pass the returned
+        # next_after_item_id as after_item_id to get the following page.
+        # A list for occasion/season/color matches items with any of its values
+        params = {
+            "after_item_id": after_item_id,
+            "limit": limit,
+            "fields": ",".join(fields) if fields else None,
+            "category": category,
+            "occasion": occasion,
+            "season": season,
+            "color": color,
+        }
+        params = {key: value for key, value in params.items() if value is not None}
+        return self._make_request("GET", "/wardrobe/items", params=params)
+
+    def get_all_wardrobe_items(self, **kwargs) -> Dict[str, Any]:
+        # Retrieve every wardrobe item by following the page cursor
+        items = []
+        after_item_id = None
+        while True:
+            page = self.get_wardrobe_items(after_item_id=after_item_id, **kwargs)
+            items.extend(page.get("items", []))
+            after_item_id = page.get("next_after_item_id")
+            if after_item_id is None:
+                return {"items": items}
 
     def health_check(self) -> Dict[str, Any]:
         # Check if backend is running
@@ -1050,15 +1050,24 @@ def get_cached_outfits(occasion: str, season: str):
     return api_client.generate_outfits(occasion=occasion, season=season)
 
 @st.cache_data(ttl=60)  # Cache for 1 minute (shorter TTL for presigned URLs)
-def get_cached_wardrobe_items():
-    # Get wardrobe items from database with caching
+def get_cached_wardrobe_items(after_item_id=None, filters=None):
+    # Get one page of wardrobe items (newest first) from database with caching,
+    # optionally filtered by the backend (see wardrobe_filters)
     # Shorter TTL because presigned URLs expire after 1 hour
     try:
-        return api_client.get_wardrobe_items()
+        return api_client.get_wardrobe_items(after_item_id=after_item_id, **(filters or {}))
     except Exception as e:
         # Re-raise with more context
         raise Exception(f"Failed to fetch wardrobe items: {str(e)}")
 
+@st.cache_data(ttl=60)  # Same TTL as the pages (presigned URLs)
+def get_cached_all_wardrobe_items():
+    # Get every wardrobe item, following the page cursor
+    try:
+        return api_client.get_all_wardrobe_items()
+    except Exception as e:
+        raise Exception(f"Failed to fetch wardrobe items: {str(e)}")
+
 # --- Sidebar ---
 BASE_DIR = Path(__file__).parent
 st.sidebar.image(BASE_DIR / "logo.png")
@@ -1110,6 +1119,12 @@ if "outfit_feedback" not in st.session_state:
     st.session_state.outfit_feedback = {}
 if "items_loaded_from_backend" not in st.session_state:
     st.session_state.items_loaded_from_backend = False
+if "wardrobe_next_cursor" not in st.session_state:
+    # next_after_item_id of the last page loaded; None when everything is loaded
+    st.session_state.wardrobe_next_cursor = None
+if "wardrobe_filter_view" not in st.session_state:
+    # {"filters", "item_ids", "next_cursor"} of the filtered wardrobe pages loaded
+    st.session_state.wardrobe_filter_view = None
 if "editing_item_id" not in st.session_state:
     st.session_state.editing_item_id = None
 if "show_save_success" not in st.session_state:
@@ -1117,42 +1132,92 @@ if "show_save_success" not in st.session_state:
 if "editing_outfit" not in st.session_state:
     st.session_state.editing_outfit = None
 
+def merge_backend_items(backend_items):
+    # Convert backend items to match session state format
+    # Backend items have image_url, but need to keep them as-is
+    # Newly uploaded items will have image_base64 for immediate display
+    for backend_item in backend_items:
+        item_id = backend_item.get("item_id")
+        # Check if item already exists in session state (by item_id)
+        existing_item = None
+        for existing in st.session_state.uploaded_items:
+            if existing.get("item_id") == item_id:
+                existing_item = existing
+                break
+
+        if existing_item:
+            # Update with backend data but preserve image_base64 for display
+            image_base64 = existing_item.get("image_base64")
+            # Update all fields from backend (includes edited metadata)
+            for key, value in backend_item.items():
+                existing_item[key] = value
+            # Restore image_base64 if it existed (for immediate display)
+            if image_base64:
+                existing_item["image_base64"] = image_base64
+        else:
+            # New item from backend - add it
+            st.session_state.uploaded_items.append(backend_item)
+
+
+def load_wardrobe_page(after_item_id=None):
+    # Fetch one page from the backend and remember where the next one starts
+    response = get_cached_wardrobe_items(after_item_id)
+    merge_backend_items(response.get("items", []))
+    st.session_state.wardrobe_next_cursor = response.get("next_after_item_id")
+
+
+def load_all_wardrobe_items():
+    # Outfits reference items by id, so the outfit pages need every item,
+    # not just the pages loaded in My Wardrobe
+    if st.session_state.items_loaded_from_backend and st.session_state.wardrobe_next_cursor is None:
+        return
+    merge_backend_items(get_cached_all_wardrobe_items().get("items", []))
+    st.session_state.wardrobe_next_cursor = None
+    st.session_state.items_loaded_from_backend = True
+
+
+def wardrobe_filters(category, occasion, color, season):
+    # Backend filters for the selected values ("All ..." means no filter).
+    # "Any Occasion" and "All-Season" items match every occasion / season
+    filters = {}
+    if category and category != "All Categories":
+        filters["category"] = category
+    if occasion and occasion != "All Occasions":
+        filters["occasion"] = sorted({occasion, "Any Occasion"})
+    if color and color != "All Colors":
+        filters["color"] = color
+    if season and season != "All Seasons":
+        filters["season"] = sorted({season, "All-Season"})
+    return filters
+
+
+def load_filtered_page(filters, after_item_id=None):
+    # Fetch one page of items matching the filters; the items themselves are
+    # merged into uploaded_items, the view only keeps their ids in order
+    if after_item_id is None:
+        st.session_state.wardrobe_filter_view = {"filters": filters, "item_ids": [], "next_cursor": None}
+    response = get_cached_wardrobe_items(after_item_id, filters)
+    items = response.get("items", [])
+    merge_backend_items(items)
+    view = st.session_state.wardrobe_filter_view
+    view["item_ids"].extend(item.get("item_id") for item in items)
+    view["next_cursor"] = response.get("next_after_item_id")
+
+
+def clear_wardrobe_caches():
+    # Drop cached pages and the filtered view so they are fetched again
+    get_cached_wardrobe_items.clear()
+    get_cached_all_wardrobe_items.clear()
+    st.session_state.wardrobe_filter_view = None
+
+
 # --- My Wardrobe Page ---
 if page == "My Wardrobe":
-    # Load items from backend on first load (only once per session)
+    # Load the first page from backend on first load (only once per session);
+    # further pages load on demand with "Load more items"
     if not st.session_state.items_loaded_from_backend:
         try:
-            response = get_cached_wardrobe_items()
-            backend_items = response.get("items", [])
-
-            
-            # Convert backend items to match session state format
-            # Backend items have image_url, but need to keep them as-is
-            # Newly uploaded items will have image_base64 for immediate display
-            for backend_item in backend_items:
-                item_id = backend_item.get("item_id")
-                # Check if item already exists in session state (by item_id)
-                existing_item = None
-                existing_idx = None
-                for idx, existing in enumerate(st.session_state.uploaded_items):
-                    if existing.get("item_id") == item_id:
-                        existing_item = existing
-                        existing_idx = idx
-                        break
-                
-                if existing_item:
-                    # Update with backend data but preserve image_base64 for display
-                    image_base64 = existing_item.get("image_base64")
-                    # Update all fields from backend (includes edited metadata)
-                    for key, value in backend_item.items():
-                        existing_item[key] = value
-                    # Restore image_base64 if it existed (for immediate display)
-                    if image_base64:
-                        existing_item["image_base64"] = image_base64
-                else:
-                    # New item from backend - add it
-                    st.session_state.uploaded_items.append(backend_item)
-            
+            load_wardrobe_page()
             st.session_state.items_loaded_from_backend = True
         except Exception as e:
             # Show error in sidebar for debugging
@@ -1170,10 +1235,11 @@ if page == "My Wardrobe":
         st.session_state.show_save_success = False
     
     item_count = len(st.session_state.uploaded_items) if st.session_state.uploaded_items else 0
+    more_suffix = " (more to load)" if st.session_state.wardrobe_next_cursor is not None else ""
     if item_count == 1:
-        st.write(f"{item_count} item in your collection")
+        st.write(f"{item_count} item in your collection{more_suffix}")
     else:
-        st.write(f"{item_count} items in your collection")
+        st.write(f"{item_count} items in your collection{more_suffix}")
 
     col_add = st.columns([5, 1])[1]
     with col_add:
@@ -1328,7 +1394,7 @@ if page == "My Wardrobe":
                             st.session_state.uploaded_items.insert(0, item_data)
                             
                             # Clear cache so backend items refresh
-                            get_cached_wardrobe_items.clear()
+                            clear_wardrobe_caches()
                             
                             st.session_state.show_uploader = False
                             st.success(f"Added '{brand or 'New Item'}' to your wardrobe! (ID: {response.get('item_id')})")
@@ -1352,11 +1418,13 @@ if page == "My Wardrobe":
         if "filter_season" not in st.session_state:
             st.session_state.filter_season = "All Seasons"
         
-        # Get unique values for filters
-        all_categories = ["All Categories"] + sorted(list(set([item.get("category", "") for item in st.session_state.uploaded_items if item.get("category")])))
-        all_occasions = ["All Occasions"] + sorted(list(set([occ for item in st.session_state.uploaded_items for occ in item.get("occasions", [])])))
+        # Filter values: the fixed choices of the item form (filters run on the
+        # backend, so they must not depend on the pages loaded); colors are
+        # free text, so they come from the loaded items
+        all_categories = ["All Categories", "Tops", "Bottoms", "Dresses", "Outerwear", "Shoes", "Accessories"]
+        all_occasions = ["All Occasions", "Any Occasion", "Casual", "Formal", "Business", "Athletic", "Party", "Everyday"]
         all_colors = ["All Colors"] + sorted(list(set([color for item in st.session_state.uploaded_items for color in item.get("colors", [])])))
-        all_seasons = ["All Seasons"] + sorted(list(set([season for item in st.session_state.uploaded_items for season in (item.get("season", []) if isinstance(item.get("season"), list) else [item.get("season")] if item.get("season") else [])])))
+        all_seasons = ["All Seasons", "Spring", "Summer", "Fall", "Winter", "All-Season"]
         
         # Filter dropdowns - 2 rows for better alignment at all zoom levels
         filter_row1_col1, filter_row1_col2, filter_row1_col3, filter_row1_col4 = st.columns(4)
@@ -1385,42 +1453,29 @@ if page == "My Wardrobe":
                 index=all_seasons.index(st.session_state.filter_season) if st.session_state.filter_season in all_seasons else 0
             )
         
-        # Filter items - only apply filter if not "All" option
-        filtered_items = st.session_state.uploaded_items.copy()
-        
-        # Category filter
-        filter_cat = str(st.session_state.filter_category).strip() if st.session_state.filter_category else ""
-        if filter_cat and filter_cat != "All Categories":
-            filtered_items = [item for item in filtered_items if item.get("category") == filter_cat]
-        
-        # Occasion filter - include "Any Occasion" items when filtering by specific occasion
-        filter_occ = str(st.session_state.filter_occasion).strip() if st.session_state.filter_occasion else ""
-        if filter_occ and filter_occ != "All Occasions":
-            item_occasions = lambda item: item.get("occasions") or []
-            filtered_items = [item for item in filtered_items if filter_occ in item_occasions(item) or "Any Occasion" in item_occasions(item)]
-        
-        # Color filter - explicitly skip if "All Colors" is selected
-        filter_color = str(st.session_state.filter_color).strip() if st.session_state.filter_color else ""
-        if filter_color and filter_color != "All Colors":
-            # Only filter by color if NOT "All Colors"
-            filtered_items = [item for item in filtered_items if filter_color.lower() in [c.lower() for c in item.get("colors", [])]]
-        # If "All Colors" is selected, don't filter by color (show all items regardless of color)
-        
-        # Season filter
-        filter_season = str(st.session_state.filter_season).strip() if st.session_state.filter_season else ""
-        if filter_season and filter_season != "All Seasons":
-            def item_has_season(item, season):
-                item_seasons = item.get("season")
-                # Handle None, missing key, or empty values
-                if item_seasons is None:
-                    return False
-                if isinstance(item_seasons, str):
-                    item_seasons = [item_seasons] if item_seasons else []
-                if not isinstance(item_seasons, list):
-                    return False
-                # Include "All-Season" items when filtering by any specific season
-                return season in item_seasons or "All-Season" in item_seasons
-            filtered_items = [item for item in filtered_items if item_has_season(item, filter_season)]
+        # With a filter selected, the backend returns the matching items a page
+        # at a time; otherwise show the pages loaded so far
+        filters = wardrobe_filters(
+            st.session_state.filter_category,
+            st.session_state.filter_occasion,
+            st.session_state.filter_color,
+            st.session_state.filter_season,
+        )
+        if filters:
+            view = st.session_state.wardrobe_filter_view
+            if view is None or view["filters"] != filters:
+                try:
+                    load_filtered_page(filters)
+                except Exception as e:
+                    st.session_state.wardrobe_filter_view = {"filters": filters, "item_ids": [], "next_cursor": None}
+                    st.error(f"Could not filter items: {str(e)}")
+            view = st.session_state.wardrobe_filter_view
+            items_by_id = {item.get("item_id"): item for item in st.session_state.uploaded_items}
+            filtered_items = [items_by_id[item_id] for item_id in view["item_ids"] if item_id in items_by_id]
+            next_cursor = view["next_cursor"]
+        else:
+            filtered_items = st.session_state.uploaded_items.copy()
+            next_cursor = st.session_state.wardrobe_next_cursor
         
         # Display filtered items in card layout using st.columns for grid
         if filtered_items:
@@ -1571,7 +1626,7 @@ if page == "My Wardrobe":
                                             )
 
                                             # Clear cache and force reload from backend on next run
-                                            get_cached_wardrobe_items.clear()
+                                            clear_wardrobe_caches()
                                             st.session_state.items_loaded_from_backend = False
                                             st.session_state.show_save_success = True
                                         st.rerun()
@@ -1588,7 +1643,7 @@ if page == "My Wardrobe":
                                         api_client.delete_wardrobe_item(item_id)
                                         # Remove from session state
                                         st.session_state.uploaded_items = [it for it in st.session_state.uploaded_items if it.get('item_id') != item_id]
-                                        get_cached_wardrobe_items.clear()
+                                        clear_wardrobe_caches()
                                         st.success("Item deleted!")
                                         st.rerun()
                                     except Exception as e:
@@ -1596,11 +1651,28 @@ if page == "My Wardrobe":
         else:
             st.info("No items match the selected filters.")
 
+        # Older (matching) items load a page at a time
+        if next_cursor is not None:
+            if st.button("Load more items", use_container_width=True, key="load_more_items"):
+                try:
+                    if filters:
+                        load_filtered_page(filters, next_cursor)
+                    else:
+                        load_wardrobe_page(next_cursor)
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Could not load more items: {str(e)}")
+
 # --- Outfit Builder Page ---
 elif page == "Outfit Builder":
     st.subheader("Outfit Builder")
     st.write("Create an outfit by selecting an occasion and season and we will auto-generate one for you!")
 
+    try:
+        load_all_wardrobe_items()
+    except Exception as e:
+        st.sidebar.warning(f"⚠️ Could not load items from backend: {str(e)}")
+
     if len(st.session_state.uploaded_items) == 0:
         st.info("Upload some items in 'My Wardrobe' first!")
     else:
@@ -1789,6 +1861,12 @@ elif page == "Outfit Builder":
 # --- Saved Outfits Page ---
 elif page == "Saved Outfits":
     st.subheader("Saved Outfits")
+
+    # Saved outfits may reference any item, not just the pages loaded so far
+    try:
+        load_all_wardrobe_items()
+    except Exception as e:
+        st.sidebar.warning(f"⚠️ Could not load items from backend: {str(e)}")
     
     # Edit Outfit Dialog
     @st.dialog("Edit Outfit", width="large")
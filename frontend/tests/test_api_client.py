@@ -153,6 +153,17 @@ class TestAPIClientMethods:
         # We verify the call was made correctly
         mock_request.assert_called_once()
 
+    def test_upload_wardrobe_items(self, client, mock_request):
+        """upload_wardrobe_items sends every file to the batch endpoint."""
+        images = [(BytesIO(b"one"), "a.jpg"), (BytesIO(b"two"), "b.jpg")]
+        client.upload_wardrobe_items(images, category="Tops")
+
+        call_args = mock_request.call_args
+        assert call_args[0][:2] == ("POST", "/wardrobe/upload/batch")
+        assert [name for name, _ in call_args[1]["files"]] == ["files", "files"]
+        assert [spec[0] for _, spec in call_args[1]["files"]] == ["a.jpg", "b.jpg"]
+        assert call_args[1]["params"] == {"category": "Tops"}
+
     def test_predict_image(self, client, mock_request):
         """predict_image calls correct endpoint."""
         image_file = BytesIO(b"fake image data")
@@ -188,7 +199,34 @@ class TestAPIClientMethods:
     def test_get_wardrobe_items(self, client, mock_request):
         """get_wardrobe_items calls correct endpoint."""
         client.get_wardrobe_items()
-        mock_request.assert_called_once_with("GET", "/wardrobe/items")
+        mock_request.assert_called_once_with("GET", "/wardrobe/items", params={})
+
+    def test_get_wardrobe_items_page_and_filters(self, client, mock_request):
+        """get_wardrobe_items sends only the cursor, projection and filters given."""
+        client.get_wardrobe_items(after_item_id=40, limit=20, fields=["item_id", "image_url"], season="Summer")
+        mock_request.assert_called_once_with(
+            "GET", "/wardrobe/items",
+            params={"after_item_id": 40, "limit": 20, "fields": "item_id,image_url", "season": "Summer"}
+        )
+
+    def test_get_wardrobe_items_any_of_several_values(self, client, mock_request):
+        """get_wardrobe_items passes a list filter through as repeated values."""
+        client.get_wardrobe_items(season=["Summer", "All-Season"])
+        mock_request.assert_called_once_with(
+            "GET", "/wardrobe/items", params={"season": ["Summer", "All-Season"]}
+        )
+
+    def test_get_all_wardrobe_items_follows_cursor(self, client, mock_request):
+        """get_all_wardrobe_items requests pages until the cursor runs out."""
+        mock_request.side_effect = [
+            {"items": [{"item_id": 3}, {"item_id": 2}], "next_after_item_id": 2},
+            {"items": [{"item_id": 1}], "next_after_item_id": None},
+        ]
+
+        result = client.get_all_wardrobe_items()
+
+        assert [item["item_id"] for item in result["items"]] == [3, 2, 1]
+        assert mock_request.call_args_list[1].kwargs["params"] == {"after_item_id": 2}
 
     def test_health_check(self, client, mock_request):
         """health_check calls root endpoint."""